@@ -1,38 +1,292 @@
 # analysis/correlation_analyzer.py
+import asyncio
+from collections import deque
+
+import numpy as np
 import pandas as pd
 
+from data_fetcher.resampler import can_resample, resample_ohlcv, timeframe_ms
+from utils.metrics import get_metrics
+
+REFERENCE_SYMBOL = 'BTC/USDT'
+# زۆرترین مۆم کە ئیکسچەینجەکان لە یەک داواکاریدا دەیدەن (هەمان PAGE_LIMIT ی ExchangeHandler)
+MAX_FETCH_BARS = 1000
+
+
+def _close_series(df):
+    """ستوونی 'close' بە indexی timestamp دەگەڕێنێتەوە بۆ ڕێکخستنی زنجیرەکان بەپێی کات."""
+    if df is None or df.empty:
+        return None
+    return pd.Series(df['close'].to_numpy(dtype=float), index=df['timestamp'])
+
+
+def correlation_vector(prices, reference):
+    """
+    پەیوەندی هەموو ستوونەکانی prices لەگەڵ reference بە یەک کرداری NumPy حیساب دەکات.
+    تەنها ئەو ڕیزانە بەکاردێن کە هەردوو بەهاکە بوونیان هەیە (وەک Series.corr).
+
+    :param prices: arrayی (کات، دراو).
+    :param reference: arrayی (کات,).
+    :return: arrayی پەیوەندییەکان (NaN ئەگەر کەمتر لە دوو خاڵی هاوبەش هەبێت).
+    """
+    prices = np.asarray(prices, dtype=float)
+    reference = np.broadcast_to(np.asarray(reference, dtype=float)[:, None], prices.shape)
+    mask = ~np.isnan(prices) & ~np.isnan(reference)
+    count = mask.sum(axis=0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x_mean = np.where(mask, prices, 0).sum(axis=0) / count
+        y_mean = np.where(mask, reference, 0).sum(axis=0) / count
+        dx = np.where(mask, prices - x_mean, 0)
+        dy = np.where(mask, reference - y_mean, 0)
+        correlation = (dx * dy).sum(axis=0) / np.sqrt((dx * dx).sum(axis=0) * (dy * dy).sum(axis=0))
+    return np.where(count >= 2, correlation, np.nan)
+
+
+class RollingCorrelation:
+    """
+    پەیوەندی جوڵاو (rolling) لەسەر دوایین `window` خاڵ، کە بە O(1) نوێ دەکرێتەوە
+    کاتێک مۆمێکی ڕۆژانەی نوێ دێت.
+    """
+
+    def __init__(self, window=30):
+        self.window = window
+        self.points = deque()
+        self.last_timestamp = None
+        self._sums = [0.0] * 5 # sx, sy, sxx, syy, sxy
+        self._updates = 0
+
+    def update(self, timestamp, x, y):
+        """خاڵێکی نوێ زیاد دەکات و پەیوەندی ئێستا دەگەڕێنێتەوە."""
+        if self.last_timestamp is not None and timestamp <= self.last_timestamp:
+            return self.value
+        self.last_timestamp = timestamp
+        self.points.append((x, y))
+        self._add(x, y, 1)
+        if len(self.points) > self.window:
+            old_x, old_y = self.points.popleft()
+            self._add(old_x, old_y, -1)
+
+        # بۆ ڕێگری لە کەڵەکەبوونی هەڵەی float، جارێک لە هەر window نوێکردنەوەدا سەرلەنوێ کۆ دەکرێتەوە
+        self._updates += 1
+        if self._updates % self.window == 0:
+            self._sums = [0.0] * 5
+            for px, py in self.points:
+                self._add(px, py, 1)
+        return self.value
+
+    def _add(self, x, y, sign):
+        sums = self._sums
+        sums[0] += sign * x
+        sums[1] += sign * y
+        sums[2] += sign * x * x
+        sums[3] += sign * y * y
+        sums[4] += sign * x * y
+
+    @property
+    def value(self):
+        n = len(self.points)
+        if n < 2:
+            return None
+        sx, sy, sxx, syy, sxy = self._sums
+        variance = (n * sxx - sx * sx) * (n * syy - sy * sy)
+        if variance <= 0:
+            return None
+        return (n * sxy - sx * sy) / np.sqrt(variance)
+
+
 class CorrelationAnalyzer:
     def __init__(self, exchange_handler):
         self.exchange_handler = exchange_handler
+        self.metrics = get_metrics()
+        # زنجیرەی BTC کە لە نێوان هەموو دراوەکانی یەک سکاندا بەکاردێت
+        self._reference = {}
+        self.rolling_correlations = {}
+
+    def get_btc_reference(self, timeframe='1d', lookback_period=30, refresh=False, frames=None):
+        """
+        زنجیرەی نرخی داخستنی BTC دەگەڕێنێتەوە و بۆ بەکارهێنانی دواتر هەڵیدەگرێت.
+        ئەگەر BTC لە frames دا بێت (بۆ نموونە لە resample_frames)، داواکاری نوێ ناکرێت.
+        """
+        key = (timeframe, lookback_period)
+        reuse = not refresh and key in self._reference
+        from_frames = not reuse and frames is not None and REFERENCE_SYMBOL in frames
+        self.metrics.cache('btc_reference', hits=int(reuse or from_frames), misses=int(not (reuse or from_frames)))
+        if from_frames:
+            self._reference[key] = _close_series(frames[REFERENCE_SYMBOL])
+        elif not reuse:
+            btc_df = self.exchange_handler.fetch_ohlcv_data(REFERENCE_SYMBOL, timeframe, limit=lookback_period)
+            self._reference[key] = _close_series(btc_df)
+        return self._reference[key]
+
+    def resample_frames(self, base_frames, base_timeframe, timeframe='1d', lookback_period=30):
+        """
+        مۆمەکانی timeframe لە مۆمە هێنراوەکانی base_timeframe دروست دەکات (بەبێ داواکاری نوێ).
+        تەنها ئەو دراوانە دەگەڕێنرێنەوە کە مێژووی بەشیان هەیە بۆ lookback_period مۆم؛
+        ئەوانی تر لە get_btc_correlations وەک پێشوو ڕاستەوخۆ دەهێنرێن.
+
+        :return: dictی {symbol: DataFrame}.
+        """
+        if not can_resample(base_timeframe, timeframe):
+            return {}
+        frames = {}
+        for symbol, df in (base_frames or {}).items():
+            resampled = resample_ohlcv(df, base_timeframe, timeframe)
+            if resampled is not None and len(resampled) >= lookback_period:
+                frames[symbol] = resampled.tail(lookback_period).reset_index(drop=True)
+        return frames
+
+    @staticmethod
+    def history_limit(base_timeframe, minimum=200, timeframe='1d', lookback_period=30, maximum=MAX_FETCH_BARS):
+        """
+        ژمارەی مۆمی base_timeframe کە لە یەک داواکاریدا بەسە بۆ resampleکردنی lookback_period مۆمی
+        timeframe (lookback × مۆمی هەر ڕۆژێک + 1، بەهۆی یەکەم مۆمی ناتەواو). ئەگەر لە maximum زیاتر
+        بێت یان resample نەکرێت، minimum دەگەڕێنرێتەوە و مۆمی ڕۆژانە جیا دەهێنرێت.
+        """
+        if not can_resample(base_timeframe, timeframe):
+            return minimum
+        needed = lookback_period * (timeframe_ms(timeframe) // timeframe_ms(base_timeframe)) + 1
+        return max(minimum, needed) if needed <= maximum else minimum
+
+    @staticmethod
+    def covers(base_timeframe, bars, timeframe='1d', lookback_period=30):
+        """ئایا bars مۆمی base_timeframe بەسە بۆ resampleکردنی lookback_period مۆمی timeframe."""
+        if not can_resample(base_timeframe, timeframe):
+            return False
+        return bars >= lookback_period * (timeframe_ms(timeframe) // timeframe_ms(base_timeframe)) + 1
+
+    async def daily_frame_async(self, symbol, base_timeframe, base_frame=None, semaphore=None,
+                                timeframe='1d', lookback_period=30):
+        """
+        مۆمەکانی timeframe ی یەک دراو بۆ شیکاری پەیوەندی: لە base_frame (resample) ئەگەر مێژووی بەس
+        هەبێت، ئەگەرنا بە داواکاری جیا.
+        """
+        if base_frame is not None:
+            daily = self.resample_frames({symbol: base_frame}, base_timeframe, timeframe, lookback_period).get(symbol)
+            if daily is not None:
+                return daily
+        async with semaphore or asyncio.Semaphore(1):
+            return await self.exchange_handler.fetch_ohlcv_data_async(symbol, timeframe, limit=lookback_period)
+
+    def correlation_from_frames(self, symbol, reference_frame, frame):
+        """پەیوەندی یەک دراو لەگەڵ BTC لە مۆمە ئامادەکراوەکان (بۆ سکانی دراو بە دراو)."""
+        if symbol == REFERENCE_SYMBOL:
+            return 1.0
+        reference = _close_series(reference_frame)
+        if reference is None or frame is None:
+            return None
+        try:
+            return self._correlate([symbol], reference, {symbol: frame})[symbol]
+        except Exception as e:
+            print(f"❌ هەڵە لە شیکاری پەیوەندی بۆ {symbol}: {e}")
+            return None
 
     def get_btc_correlation(self, symbol, timeframe='1d', lookback_period=30):
         """
         پەیوەندی (correlation) نێوان نرخى داخستنى دراوێک و Bitcoin حیساب دەکات.
         ئەنجامێک لە -1 (پەیوەندی پێچەوانە) بۆ +1 (پەیوەندی ڕاستەوانە) دەگەڕێنێتەوە.
         """
-        if symbol == 'BTC/USDT':
+        if symbol == REFERENCE_SYMBOL:
             return 1.0 # Bitcoin لەگەڵ خۆی correlationی 1.0 ی هەیە
 
+        return self.get_btc_correlations([symbol], timeframe, lookback_period, refresh_reference=False).get(symbol)
+
+    def get_btc_correlations(self, symbols, timeframe='1d', lookback_period=30, frames=None, refresh_reference=True):
+        """
+        پەیوەندی هەموو دراوەکان لەگەڵ BTC بە یەکجار حیساب دەکات. داتای BTC تەنها یەکجار دەهێنرێت
+        و زنجیرەکان بەپێی timestamp ڕێکدەخرێن، نەک بەپێی شوێن.
+
+        :param frames: dictی {symbol: DataFrame} ئەگەر داتاکە پێشتر هێنرابێت.
+        :return: dictی {symbol: correlation یان None}.
+        """
+        frames = dict(frames or {})
         try:
-            # هێنانی داتای Bitcoin
-            btc_df = self.exchange_handler.fetch_ohlcv_data('BTC/USDT', timeframe, limit=lookback_period)
-            if btc_df is None or btc_df.empty:
+            reference = self.get_btc_reference(timeframe, lookback_period, refresh=refresh_reference, frames=frames)
+            if reference is None:
                 print("⚠️ نەتوانرا داتای BTC بهێنرێت بۆ شیکاری پەیوەندی.")
-                return None
+                return {symbol: (1.0 if symbol == REFERENCE_SYMBOL else None) for symbol in symbols}
+
+            for symbol in symbols:
+                if symbol != REFERENCE_SYMBOL and symbol not in frames:
+                    frames[symbol] = self.exchange_handler.fetch_ohlcv_data(symbol, timeframe, limit=lookback_period)
+            return self._correlate(symbols, reference, frames)
 
-            # هێنانی داتای دراوی ئامانج
-            symbol_df = self.exchange_handler.fetch_ohlcv_data(symbol, timeframe, limit=lookback_period)
-            if symbol_df is None or symbol_df.empty:
-                return None
+        except Exception as e:
+            print(f"❌ هەڵە لە شیکاری پەیوەندی: {e}")
+            return {symbol: None for symbol in symbols}
+
+    async def get_btc_correlations_async(self, symbols, timeframe='1d', lookback_period=30, concurrency=10, frames=None):
+        """
+        وەشانی async ی get_btc_correlations: داتای BTC و هەموو ئەو دراوانەی لە frames دا نین
+        بە هاوکاتی دەهێنێت.
+        """
+        frames = dict(frames or {})
+        semaphore = asyncio.Semaphore(concurrency)
 
-            # تەنها ستوونی 'close' هەڵدەگرین
-            btc_prices = btc_df['close']
-            symbol_prices = symbol_df['close']
+        async def fetch(symbol):
+            if symbol in frames:
+                return frames[symbol]
+            async with semaphore:
+                return await self.exchange_handler.fetch_ohlcv_data_async(symbol, timeframe, limit=lookback_period)
 
-            # حیسابکردنی correlation
-            correlation = btc_prices.corr(symbol_prices)
-            return round(correlation, 2)
+        try:
+            to_fetch = [symbol for symbol in symbols if symbol != REFERENCE_SYMBOL]
+            results = await asyncio.gather(fetch(REFERENCE_SYMBOL), *(fetch(symbol) for symbol in to_fetch))
+            reference = _close_series(results[0])
+            self._reference[(timeframe, lookback_period)] = reference
+            if reference is None:
+                print("⚠️ نەتوانرا داتای BTC بهێنرێت بۆ شیکاری پەیوەندی.")
+                return {symbol: (1.0 if symbol == REFERENCE_SYMBOL else None) for symbol in symbols}
+            return self._correlate(symbols, reference, dict(zip(to_fetch, results[1:])))
 
         except Exception as e:
-            print(f"❌ هەڵە لە شیکاری پەیوەندی بۆ {symbol}: {e}")
-            return None
\ No newline at end of file
+            print(f"❌ هەڵە لە شیکاری پەیوەندی: {e}")
+            return {symbol: None for symbol in symbols}
+
+    def _aligned_prices(self, symbols, reference, frames):
+        """هەموو زنجیرەکان لەسەر هەمان indexی کاتی BTC ڕێکدەخات."""
+        columns = {}
+        for symbol in symbols:
+            series = _close_series(frames.get(symbol))
+            if series is not None:
+                columns[symbol] = series
+        prices = pd.DataFrame(columns).reindex(reference.index)
+        return prices
+
+    def _correlate(self, symbols, reference, frames):
+        prices = self._aligned_prices([s for s in symbols if s != REFERENCE_SYMBOL], reference, frames)
+        correlations = dict(zip(prices.columns, correlation_vector(prices.to_numpy(), reference.to_numpy())))
+
+        results = {}
+        for symbol in symbols:
+            if symbol == REFERENCE_SYMBOL:
+                results[symbol] = 1.0
+                continue
+            correlation = correlations.get(symbol)
+            results[symbol] = None if correlation is None or np.isnan(correlation) else round(float(correlation), 2)
+        return results
+
+    def get_correlation_matrix(self, symbols, timeframe='1d', lookback_period=30, frames=None):
+        """
+        ماتریکسی NxN ی پەیوەندی نێوان هەموو دراوەکان (BTC لەگەڵیدا) بە یەک کردار دەگەڕێنێتەوە.
+        """
+        frames = dict(frames or {})
+        reference = self.get_btc_reference(timeframe, lookback_period)
+        if reference is None:
+            return None
+        for symbol in symbols:
+            if symbol != REFERENCE_SYMBOL and symbol not in frames:
+                frames[symbol] = self.exchange_handler.fetch_ohlcv_data(symbol, timeframe, limit=lookback_period)
+
+        prices = self._aligned_prices([s for s in symbols if s != REFERENCE_SYMBOL], reference, frames)
+        prices.insert(0, REFERENCE_SYMBOL, reference)
+        return prices.corr()
+
+    def update_rolling_correlation(self, symbol, timestamp, close, btc_close, window=30):
+        """
+        کاتێک مۆمێکی ڕۆژانەی نوێ دادەخرێت، پەیوەندی جوڵاوی دراوەکە بە O(1) نوێ دەکاتەوە.
+        """
+        if symbol not in self.rolling_correlations:
+            self.rolling_correlations[symbol] = RollingCorrelation(window)
+        value = self.rolling_correlations[symbol].update(timestamp, close, btc_close)
+        return None if value is None else round(float(value), 2)
@@ -1,71 +1,248 @@
 # analysis/fundamental_analyzer.py
-from pycoingecko import CoinGeckoAPI
+import json
+import os
+import threading
+import time
+
+from utils.atomic_file import atomic_write
+from utils.config_loader import load_config
+from utils.metrics import get_metrics
+
+# ماوەی دروستی کاشەکان بە چرکە
+COIN_LIST_TTL = 24 * 3600      # لیستی دراوەکان زۆر بە دەگمەن دەگۆڕێت
+COIN_LIST_RETRY_TTL = 5 * 60   # دوای هەڵە، پێش هەوڵدانەوە بۆ هێنانی لیستەکە
+MARKET_DATA_TTL = 6 * 3600     # ڕیزبەندی بازاڕ
+DEVELOPER_DATA_TTL = 7 * 24 * 3600 # خاڵی پەرەپێدان هەفتانە نوێ دەکرێتەوە
+MARKETS_PAGE_SIZE = 250        # زۆرترین ژمارەی دراو لە یەک داواکاری /coins/markets
+
+# کاشی هاوبەش لە نێوان هەموو FundamentalAnalyzerەکانی یەک پرۆسەدا (داشبۆرد، سکانەر، باکتێستەر)
+_shared_cache = {'coin_list': None, 'symbol_index': None, 'loaded_at': 0, 'coins': None}
+_shared_lock = threading.RLock()
+# ئەو IDیانەی ئێستا threadێکی تر داتاکەیان دەهێنێت؛ چاوەڕوانکەران بە _fetched ئاگادار دەکرێنەوە
+_in_flight = {'market': set(), 'developer': set()}
+_fetched = threading.Condition(_shared_lock)
+# داواکارییەکانی CoinGecko یەک لە دوای یەک دەنێردرێن (دوورکەوتنەوە لە 429) بەبێ ڕاگرتنی گەڕانی symbol→id
+_fetch_lock = threading.Lock()
+
+
+def build_symbol_index(coin_list):
+    """
+    indexی symbol→id لە یەک گەڕاندا دروست دەکات، بە هەمان ئەولەویەتی گەڕانی کۆن:
+    یەکەم دراوێک کە IDکەی یەکسانی symbol بێت (یان bitcoin/ethereum بۆ btc/eth)،
+    ئەگەرنا یەکەم دراو کە هەمان symbolی هەیە.
+    """
+    preferred, first_match = {}, {}
+    special_ids = {'btc': 'bitcoin', 'eth': 'ethereum'}
+    for coin in coin_list:
+        # هەندێک جار 'symbol' لەوانەیە None بێت
+        symbol = coin.get('symbol')
+        if not symbol:
+            continue
+        first_match.setdefault(symbol, coin['id'])
+        if symbol not in preferred and (coin['id'] == symbol or special_ids.get(symbol) == coin['id']):
+            preferred[symbol] = coin['id']
+    return dict(first_match, **preferred)
+
 
 class FundamentalAnalyzer:
     def __init__(self):
-        self.cg = CoinGeckoAPI()
-        # دروستکردنی لیستێکی کاش بۆ خێراکردنەوە، بۆ ئەوەی دووبارە داوای لیستی دراوەکان نەکەینەوە
-        try:
-            self.coin_list = self.cg.get_coins_list(include_platform=False)
-        except Exception as e:
-            print(f"❌ هەڵە لە کاتی هێنانی لیستی دراوەکان لە CoinGecko: {e}")
-            self.coin_list = []
+        cache_dir = load_config().get('DATA_STORE', 'CACHE_DIR', fallback='cache')
+        self.coin_list_path = os.path.join(cache_dir, 'coingecko_coins.json')
+        self.coin_data_path = os.path.join(cache_dir, 'coingecko_fundamentals.json')
+        self._cg = None
+        self.metrics = get_metrics()
+
+    @property
+    def cg(self):
+        # کلاینتی CoinGecko تەنها کاتێک دروست دەکرێت کە کاشەکان بەس نەبن
+        if self._cg is None:
+            from pycoingecko import CoinGeckoAPI
+            self._cg = self.metrics.instrument(CoinGeckoAPI(), 'coingecko', ('get_',))
+        return self._cg
+
+    @cg.setter
+    def cg(self, client):
+        self._cg = client
+
+    # --- لیستی دراوەکان ---
+
+    @property
+    def coin_list(self):
+        self._ensure_coin_index()
+        return _shared_cache['coin_list'] or []
+
+    def _ensure_coin_index(self):
+        """
+        لیستی دراوەکان تەنها کاتێک دەهێنرێت کە یەکەمجار پێویست بێت و کاشەکە کۆن بووبێت.
+        لیستەکە لەسەر دیسک هەڵدەگیرێت بۆ ئەوەی ڕیستارت داواکاری نوێ نەکات.
+        """
+        with _shared_lock:
+            if _shared_cache['symbol_index'] is not None and time.time() - _shared_cache['loaded_at'] < COIN_LIST_TTL:
+                return
+
+            coin_list, loaded_at = None, 0
+            cached = self._read_json(self.coin_list_path)
+            if cached and time.time() - cached.get('fetched_at', 0) < COIN_LIST_TTL:
+                coin_list, loaded_at = cached['coins'], cached['fetched_at']
+            else:
+                try:
+                    coin_list, loaded_at = self.cg.get_coins_list(include_platform=False), time.time()
+                    self._write_json(self.coin_list_path, {'fetched_at': loaded_at, 'coins': coin_list})
+                except Exception as e:
+                    print(f"❌ هەڵە لە کاتی هێنانی لیستی دراوەکان لە CoinGecko: {e}")
+                    # لیستی کۆن (یان بەتاڵ) باشترە لە هیچ؛ loaded_at وا دادەنرێت کە تەنها دوای
+                    # COIN_LIST_RETRY_TTL هەوڵ بدرێتەوە، نەک لە هەر _get_coingecko_id ێکدا
+                    coin_list = cached['coins'] if cached else None
+                    loaded_at = time.time() - COIN_LIST_TTL + COIN_LIST_RETRY_TTL
+
+            _shared_cache['coin_list'] = coin_list or []
+            _shared_cache['symbol_index'] = build_symbol_index(coin_list or [])
+            _shared_cache['loaded_at'] = loaded_at
 
     def _get_coingecko_id(self, symbol):
         """
         ناوی دراوێک (بۆ نموونە 'BTC') دەگۆڕێت بۆ IDی CoinGecko (بۆ نموونە 'bitcoin').
         """
-        if not self.coin_list:
-            return None
-            
-        target_symbol = symbol.lower()
-        for coin in self.coin_list:
-            # هەندێک جار 'symbol' لەوانەیە None بێت، بۆیە پشکنینی بۆ دەکەین
-            if coin.get('symbol') == target_symbol:
-                # هەندێک ID یەکسانن بەڵام بۆ تۆکنی جیاوازن، باشترین هەڵدەبژێرین
-                if coin['id'] == target_symbol:
-                    return coin['id'] # ئەگەر ID و symbol یەکسان بوون، ئەوە باشترینە
-                if target_symbol == 'btc' and coin['id'] == 'bitcoin':
-                    return 'bitcoin'
-                if target_symbol == 'eth' and coin['id'] == 'ethereum':
-                    return 'ethereum'
-
-        # ئەگەر ڕێگای یەکەم شکستی هێنا، بەدوای یەکەم گونجاودا بگەڕێ
-        for coin in self.coin_list:
-            if coin.get('symbol') == target_symbol:
-                return coin['id']
-                
-        return None
+        self._ensure_coin_index()
+        return _shared_cache['symbol_index'].get(symbol.lower())
+
+    # --- داتای بنەڕەتی ---
+
+    def _coin_cache(self):
+        with _shared_lock:
+            if _shared_cache['coins'] is None:
+                _shared_cache['coins'] = self._read_json(self.coin_data_path) or {}
+            return _shared_cache['coins']
+
     def get_fundamental_data(self, symbol):
         """
         داتای بنەڕەتی و چالاکیی پەرەپێدان بۆ دراوێک دەهێنێت.
         """
-        coin_id = self._get_coingecko_id(symbol)
-        if not coin_id:
-            #print(f"   -  फंडामेंटल: IDی {symbol} لە CoinGecko نەدۆزرایەوە.")
-            return None
-        
+        return self.get_fundamental_data_batch([symbol]).get(symbol)
+
+    def get_fundamental_data_batch(self, symbols):
+        """
+        داتای بنەڕەتی بۆ چەند دراوێک بە یەکجار دەهێنێت.
+        ڕیزبەندی بازاڕ بۆ تا 250 دراو لە یەک داواکاری /coins/markets دەهێنرێت و خاڵی پەرەپێدان
+        تەنها بۆ ئەو دراوانە داوا دەکرێت کە لە کاشدا نین یان کۆن بوون.
+
+        :return: dictی {symbol: fundamental_data یان None}.
+        """
+        ids = {symbol: self._get_coingecko_id(symbol) for symbol in symbols}
+        coin_ids = sorted({coin_id for coin_id in ids.values() if coin_id})
+        now = time.time()
+
+        # لە ژێر lockدا تەنها IDە کۆنەکان دیاری دەکرێن و وەک "لە هێناندا" نیشانە دەکرێن
+        with _shared_lock:
+            cache = self._coin_cache()
+            stale_market = [c for c in coin_ids if now - cache.get(c, {}).get('market_fetched_at', 0) >= MARKET_DATA_TTL]
+            stale_developer = [c for c in coin_ids if now - cache.get(c, {}).get('developer_fetched_at', 0) >= DEVELOPER_DATA_TTL]
+            self.metrics.cache('coingecko_market', hits=len(coin_ids) - len(stale_market), misses=len(stale_market))
+            self.metrics.cache('coingecko_developer', hits=len(coin_ids) - len(stale_developer), misses=len(stale_developer))
+
+            fetch_market = [c for c in stale_market if c not in _in_flight['market']]
+            fetch_developer = [c for c in stale_developer if c not in _in_flight['developer']]
+            _in_flight['market'].update(fetch_market)
+            _in_flight['developer'].update(fetch_developer)
+
+        # هێنان لە تۆڕ بەبێ _shared_lock
+        market_updates, developer_updates = {}, {}
         try:
-            data = self.cg.get_coin_by_id(
-                id=coin_id,
-                localization='false',
-                tickers='false',
-                market_data='true',
-                community_data='false', # بۆ خێراکردنەوە
-                developer_data='true'
-            )
-
-            fundamental_data = {
-                'market_cap_rank': data.get('market_cap_rank'),
-                'developer_score': data.get('developer_score', 0),
-                'github_stars': data.get('developer_data', {}).get('stars', 0),
+            if fetch_market or fetch_developer:
+                with _fetch_lock:
+                    market_updates = self._refresh_market_data(fetch_market, now)
+                    developer_updates = self._refresh_developer_data(fetch_developer, now)
+        finally:
+            with _fetched:
+                cache = self._coin_cache()
+                for coin_id, fields in list(market_updates.items()) + list(developer_updates.items()):
+                    cache.setdefault(coin_id, {}).update(fields)
+                if market_updates or developer_updates:
+                    self._write_json(self.coin_data_path, cache)
+                _in_flight['market'].difference_update(fetch_market)
+                _in_flight['developer'].difference_update(fetch_developer)
+                _fetched.notify_all()
+
+        with _fetched:
+            # ئەو IDیانەی threadێکی تر دەیانهێنێت، چاوەڕێی تەواوبوونیان دەکرێت
+            _fetched.wait_for(lambda: not any(c in _in_flight['market'] for c in stale_market)
+                              and not any(c in _in_flight['developer'] for c in stale_developer))
+
+            cache = self._coin_cache()
+            results = {}
+            for symbol, coin_id in ids.items():
+                entry = cache.get(coin_id) if coin_id else None
+                if not entry or 'market_cap_rank' not in entry or 'developer_score' not in entry:
+                    results[symbol] = None
+                    continue
+                results[symbol] = {
+                    'market_cap_rank': entry['market_cap_rank'],
+                    'developer_score': entry['developer_score'],
+                    'github_stars': entry['github_stars'],
+                }
+            return results
+
+    def _refresh_market_data(self, coin_ids, now):
+        """ڕیزبەندی بازاڕ دەهێنێت؛ :return: dictی {coin_id: خانە نوێکان} بۆ تێکەڵکردن لە کاشدا."""
+        updates = {}
+        for start in range(0, len(coin_ids), MARKETS_PAGE_SIZE):
+            chunk = coin_ids[start:start + MARKETS_PAGE_SIZE]
+            try:
+                markets = self.cg.get_coins_markets(vs_currency='usd', ids=chunk, per_page=MARKETS_PAGE_SIZE)
+            except Exception as e:
+                self._report_error(', '.join(chunk), e)
+                # داتای کۆن (ئەگەر هەبێت) بەکاردێت
+                continue
+            for market in markets:
+                updates[market['id']] = {'market_cap_rank': market.get('market_cap_rank'), 'market_fetched_at': now}
+        return updates
+
+    def _refresh_developer_data(self, coin_ids, now):
+        """خاڵی پەرەپێدان دەهێنێت؛ :return: dictی {coin_id: خانە نوێکان} بۆ تێکەڵکردن لە کاشدا."""
+        updates = {}
+        for coin_id in coin_ids:
+            try:
+                data = self.cg.get_coin_by_id(
+                    id=coin_id,
+                    localization='false',
+                    tickers='false',
+                    market_data='false',
+                    community_data='false', # بۆ خێراکردنەوە
+                    developer_data='true'
+                )
+            except Exception as e:
+                self._report_error(coin_id, e)
+                if '429' in str(e):
+                    break # بەردەوامبوون تەنها سنوورەکە خراپتر دەکات
+                continue
+            updates[coin_id] = {
+                'developer_score': data.get('developer_score') or 0,
+                'github_stars': (data.get('developer_data') or {}).get('stars', 0),
+                'developer_fetched_at': now,
             }
-            return fundamental_data
+        return updates
 
-        except Exception as e:
-            # APIی بێبەرامبەری CoinGecko سنووری داواکاری هەیە (rate limit)
-            if '429' in str(e):
-                 print(f"⚠️ سنووری بەکارهێنانی CoinGecko API تێپەڕیوە بۆ {symbol}. تکایە چەند خولەکێک چاوەڕێ بکە.")
-            else:
-                 print(f"❌ هەڵە لە هێنانی داتای بنەڕەتی بۆ {symbol} لە CoinGecko: {e}")
-            return None
\ No newline at end of file
+    def _report_error(self, target, e):
+        # APIی بێبەرامبەری CoinGecko سنووری داواکاری هەیە (rate limit)
+        if '429' in str(e):
+             print(f"⚠️ سنووری بەکارهێنانی CoinGecko API تێپەڕیوە بۆ {target}. تکایە چەند خولەکێک چاوەڕێ بکە.")
+        else:
+             print(f"❌ هەڵە لە هێنانی داتای بنەڕەتی بۆ {target} لە CoinGecko: {e}")
+
+    @staticmethod
+    def _read_json(path):
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _write_json(path, data):
+        try:
+            with atomic_write(path) as f:
+                json.dump(data, f)
+        except OSError as e:
+            print(f"⚠️ نەتوانرا کاشی CoinGecko پاشەکەوت بکرێت: {e}")
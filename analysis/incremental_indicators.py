@@ -0,0 +1,243 @@
+# analysis/incremental_indicators.py
+import json
+import os
+
+import pandas as pd
+
+from utils.atomic_file import atomic_write
+
+# پێناسەکان وەک analyze_data: RSI 14، MACD 12/26/9، EMA 50 و EMA 200
+RSI_LENGTH = 14
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+EMA_LENGTHS = (50, 200)
+
+
+def _to_millis(timestamp):
+    """کات (pandas Timestamp یان ژمارەی میلی چرکە) دەگۆڕێت بۆ میلی چرکەی int."""
+    if isinstance(timestamp, pd.Timestamp):
+        return int(timestamp.value // 1_000_000)
+    return int(timestamp)
+
+
+def _new_ema(length):
+    return {'length': length, 'count': 0, 'seed_sum': 0.0, 'value': None}
+
+
+def _step_ema(state, x):
+    """
+    یەک هەنگاوی EMA. یەکەم بەها SMAی یەکەم `length` بەهایە (وەک pandas_ta و TA-Lib).
+    :return: (state ی نوێ، بەهای EMA یان None لە کاتی گەرمبوونەوە)
+    """
+    length = state['length']
+    if state['value'] is not None:
+        alpha = 2.0 / (length + 1)
+        value = alpha * x + (1 - alpha) * state['value']
+        return dict(state, value=value), value
+
+    count = state['count'] + 1
+    seed_sum = state['seed_sum'] + x
+    value = seed_sum / length if count == length else None
+    return dict(state, count=count, seed_sum=seed_sum, value=value), value
+
+
+def _new_rsi(length):
+    return {'length': length, 'count': 0, 'prev_close': None,
+            'gain_sum': 0.0, 'loss_sum': 0.0, 'avg_gain': None, 'avg_loss': None}
+
+
+def _step_rsi(state, close):
+    """
+    یەک هەنگاوی RSIی Wilder: تێکڕای سەرەتا SMAی یەکەم `length` گۆڕانە،
+    پاشان avg = (avg * (length - 1) + x) / length.
+    کاتێک نرخ هیچ نەگۆڕاوە (avg_gain + avg_loss == 0) وەک TA-Lib (کە لە requirements.txt دا
+    جێگیرکراوە و analyze_data لە ڕێگەی pandas_ta بەکاری دەهێنێت) 0 دەگەڕێنێتەوە.
+    """
+    if state['prev_close'] is None:
+        return dict(state, prev_close=close), None
+
+    length = state['length']
+    change = close - state['prev_close']
+    gain = change if change > 0 else 0.0
+    loss = -change if change < 0 else 0.0
+
+    if state['avg_gain'] is not None:
+        avg_gain = (state['avg_gain'] * (length - 1) + gain) / length
+        avg_loss = (state['avg_loss'] * (length - 1) + loss) / length
+        new_state = dict(state, prev_close=close, avg_gain=avg_gain, avg_loss=avg_loss)
+    else:
+        count = state['count'] + 1
+        gain_sum = state['gain_sum'] + gain
+        loss_sum = state['loss_sum'] + loss
+        new_state = dict(state, prev_close=close, count=count, gain_sum=gain_sum, loss_sum=loss_sum)
+        if count < length:
+            return new_state, None
+        avg_gain, avg_loss = gain_sum / length, loss_sum / length
+        new_state.update(avg_gain=avg_gain, avg_loss=avg_loss)
+
+    if avg_gain + avg_loss == 0:
+        return new_state, 0.0
+    return new_state, 100.0 * avg_gain / (avg_gain + avg_loss)
+
+
+class IncrementalIndicators:
+    """
+    دۆخی ئیندیکەیتەرەکان بۆ یەک (symbol, timeframe) هەڵدەگرێت و بە O(1) نوێی دەکاتەوە
+    کاتێک مۆمێکی نوێ دادەخرێت، لە جیاتی حیسابکردنەوەی هەموو پەنجەرەکە.
+    """
+
+    def __init__(self, symbol, timeframe):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.last_timestamp = None
+        self.last_close = None
+        self.values = None
+        self.previous_close = None
+        self.previous_values = None
+        self._state = {
+            'rsi': _new_rsi(RSI_LENGTH),
+            'ema_fast': _new_ema(MACD_FAST),
+            'ema_slow': _new_ema(MACD_SLOW),
+            'macd_signal': _new_ema(MACD_SIGNAL),
+            'ema': {str(length): _new_ema(length) for length in EMA_LENGTHS},
+        }
+
+    def _step(self, close):
+        """بەهاکانی مۆمێکی نوێ حیساب دەکات بەبێ گۆڕینی دۆخی ئێستا."""
+        state = self._state
+        rsi_state, rsi = _step_rsi(state['rsi'], close)
+        fast_state, ema_fast = _step_ema(state['ema_fast'], close)
+        slow_state, ema_slow = _step_ema(state['ema_slow'], close)
+
+        signal_state, macd, macd_signal = state['macd_signal'], None, None
+        if ema_fast is not None and ema_slow is not None:
+            macd = ema_fast - ema_slow
+            signal_state, macd_signal = _step_ema(signal_state, macd)
+
+        ema_states, values = {}, {'RSI_14': rsi}
+        values['MACD_12_26_9'] = macd
+        values['MACDh_12_26_9'] = macd - macd_signal if macd_signal is not None else None
+        values['MACDs_12_26_9'] = macd_signal
+        for length in EMA_LENGTHS:
+            ema_states[str(length)], values[f'EMA_{length}'] = _step_ema(state['ema'][str(length)], close)
+
+        new_state = {'rsi': rsi_state, 'ema_fast': fast_state, 'ema_slow': slow_state,
+                     'macd_signal': signal_state, 'ema': ema_states}
+        return new_state, values
+
+    def update(self, timestamp, close):
+        """
+        مۆمێکی داخراو زیاد دەکات. مۆمی کۆنتر یان دووبارە پشتگوێ دەخرێت.
+        :return: بەهای ئیندیکەیتەرەکان دوای ئەم مۆمە.
+        """
+        timestamp = _to_millis(timestamp)
+        if self.last_timestamp is not None and timestamp <= self.last_timestamp:
+            return self.values
+
+        self._state, values = self._step(float(close))
+        self.previous_close, self.previous_values = self.last_close, self.values
+        self.last_timestamp, self.last_close, self.values = timestamp, float(close), values
+        return values
+
+    def peek(self, close):
+        """بەهاکان بۆ مۆمێکی هێشتا نەداخراو دەگەڕێنێتەوە بەبێ ئەوەی دۆخەکە بگۆڕێت."""
+        return self._step(float(close))[1]
+
+    def warm_up(self, df):
+        """هەموو مۆمەکانی DataFrame کە نوێترن لە دوایین مۆمی هەڵگیراو زیاد دەکات."""
+        if df is None or df.empty:
+            return self.values
+        for timestamp, close in zip(df['timestamp'].tolist(), df['close'].tolist()):
+            self.update(timestamp, close)
+        return self.values
+
+    @property
+    def is_ready(self):
+        return self.values is not None and all(v is not None for v in self.values.values())
+
+    def to_frame(self, pending_close=None):
+        """
+        DataFrameێکی دوو ڕیزی (پێشوو و دوایین) دروست دەکات کە QuantitativeScorer دەتوانێت بەکاری بهێنێت.
+        ئەگەر pending_close درابێت، وەک دوایین مۆمی نەداخراو مامەڵەی لەگەڵ دەکرێت.
+
+        :return: DataFrame یان None ئەگەر ئیندیکەیتەرەکان هێشتا گەرم نەبووبنەوە.
+        """
+        if pending_close is not None:
+            rows = [(self.last_close, self.values), (float(pending_close), self.peek(pending_close))]
+        else:
+            rows = [(self.previous_close, self.previous_values), (self.last_close, self.values)]
+
+        records = []
+        for close, values in rows:
+            if values is None or any(v is None for v in values.values()):
+                continue
+            records.append(dict(values, close=close))
+        if not records:
+            return None
+        return pd.DataFrame(records)
+
+    def snapshot(self):
+        """دۆخی تەواو وەک dictێکی JSON-safe دەگەڕێنێتەوە."""
+        return {
+            'symbol': self.symbol,
+            'timeframe': self.timeframe,
+            'last_timestamp': self.last_timestamp,
+            'last_close': self.last_close,
+            'values': self.values,
+            'previous_close': self.previous_close,
+            'previous_values': self.previous_values,
+            'state': self._state,
+        }
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """ئۆبجێکتێک لە snapshot() دروست دەکاتەوە."""
+        engine = cls(snapshot['symbol'], snapshot['timeframe'])
+        engine.last_timestamp = snapshot['last_timestamp']
+        engine.last_close = snapshot['last_close']
+        engine.values = snapshot['values']
+        engine.previous_close = snapshot['previous_close']
+        engine.previous_values = snapshot['previous_values']
+        engine._state = snapshot['state']
+        return engine
+
+
+class IncrementalIndicatorRegistry:
+    """
+    کۆکراوەی IncrementalIndicators بۆ هەموو (symbol, timeframe)ەکان،
+    لەگەڵ پاشەکەوتکردن و گەڕاندنەوە لە فایلی JSON بۆ ئەوەی دۆخەکە دوای ڕیستارت بمێنێتەوە.
+    """
+
+    def __init__(self, state_path=None):
+        self.state_path = state_path
+        self.engines = {}
+        if state_path and os.path.exists(state_path):
+            self.load(state_path)
+
+    def get(self, symbol, timeframe):
+        key = (symbol, timeframe)
+        if key not in self.engines:
+            self.engines[key] = IncrementalIndicators(symbol, timeframe)
+        return self.engines[key]
+
+    def reset(self, symbol, timeframe):
+        self.engines[(symbol, timeframe)] = IncrementalIndicators(symbol, timeframe)
+        return self.engines[(symbol, timeframe)]
+
+    def save(self, path=None):
+        path = path or self.state_path
+        if not path:
+            return
+        with atomic_write(path) as f:
+            json.dump([engine.snapshot() for engine in self.engines.values()], f)
+
+    def load(self, path=None):
+        path = path or self.state_path
+        try:
+            with open(path, encoding='utf-8') as f:
+                snapshots = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ نەتوانرا دۆخی ئیندیکەیتەرەکان بخوێنرێتەوە لە {path}: {e}")
+            return
+        for snapshot in snapshots:
+            engine = IncrementalIndicators.from_snapshot(snapshot)
+            self.engines[(engine.symbol, engine.timeframe)] = engine
@@ -1,10 +1,17 @@
 # analysis/quantitative_scorer.py
-import configparser
+import numpy as np
+import pandas as pd
+
+from utils.config_loader import load_config
 
 class QuantitativeScorer:
-    def __init__(self):
-        config = configparser.ConfigParser()
-        config.read('config/config.ini', encoding='utf-8')
+    def __init__(self, weights=None):
+        # ئەگەر کێشەکان ڕاستەوخۆ درابن (بۆ نموونە لە sweep)، پێویست بە خوێندنەوەی config ناکات
+        if weights is not None:
+            self.WEIGHTS = dict(weights)
+            return
+
+        config = load_config()
         
         # خوێندنەوەی کێشەکان لە فایلی کۆنفیک
         self.WEIGHTS = {
@@ -67,6 +74,121 @@ class QuantitativeScorer:
         return min(score, 100)
 
 
+    def calculate_technical_scores(self, analyzed_df, groups=None):
+        """
+        خاڵی تەکنیکی بۆ هەموو ڕیزەکانی DataFrame بە یەکجار (vectorized) حیساب دەکات.
+        ئەنجامی ڕیزی i یەکسانە بە _calculate_technical_score بۆ ڕیزەکانی 0..i دوای dropna.
+        ڕیزێک کە خۆی یان ڕیزی پێشووی NaNی تێدابێت خاڵی 0 وەردەگرێت.
+
+        :param groups: arrayی ناوی دراو بۆ هەر ڕیزێک لە frameی چەند دراوی (ڕیزەکانی هەر دراوێک
+                       پێکەوە و بە ڕیزبەندی کات). ڕیزی پێشوو تەنها لە هەمان دراودا حیساب دەکرێت.
+        """
+        valid = analyzed_df.notna().all(axis=1).to_numpy()
+        valid_pair = valid.copy()
+        valid_pair[0] = False
+        valid_pair[1:] &= valid[:-1]
+        if groups is not None:
+            groups = np.asarray(groups)
+            valid_pair[1:] &= groups[1:] == groups[:-1]
+
+        close = analyzed_df['close'].to_numpy(dtype=float)
+        rsi = analyzed_df['RSI_14'].to_numpy(dtype=float)
+        macd = analyzed_df['MACD_12_26_9'].to_numpy(dtype=float)
+        macd_signal = analyzed_df['MACDs_12_26_9'].to_numpy(dtype=float)
+        prev_macd = np.roll(macd, 1)
+        prev_macd_signal = np.roll(macd_signal, 1)
+
+        score = np.where(rsi < 30, 40, np.where(rsi < 40, 25, 0))
+        score = score + np.where((prev_macd < prev_macd_signal) & (macd > macd_signal), 40, 0)
+        score = score + np.where(close > analyzed_df['EMA_50'].to_numpy(dtype=float), 10, 0)
+        score = score + np.where(close > analyzed_df['EMA_200'].to_numpy(dtype=float), 10, 0)
+
+        return np.where(valid_pair, np.minimum(score, 100), 0)
+
+    def calculate_total_scores(self, technical_scores, sentiment_score, fundamental_data, correlation_value):
+        """
+        کۆی خاڵ بۆ زنجیرەیەک خاڵی تەکنیکی حیساب دەکات کاتێک بەشەکانی تر نەگۆڕن.
+        """
+        technical_scores = np.asarray(technical_scores)
+        count = len(technical_scores)
+        components = {
+            'technical': technical_scores,
+            'sentiment': np.full(count, self._calculate_sentiment_score(sentiment_score), dtype=float),
+            'fundamental': np.full(count, self._calculate_fundamental_score(fundamental_data), dtype=float),
+            'correlation': np.full(count, self._calculate_correlation_score(correlation_value), dtype=float),
+        }
+        return self._weighted_totals(components)
+
+    def score_frame(self, analyzed_df, sentiment_score=None, fundamental_data=None, correlation_value=None,
+                    group_column=None, sentiment_by_group=None, fundamental_by_group=None,
+                    correlation_by_group=None):
+        """
+        وەشانی ستوونی calculate_scores: خاڵەکان و هێزی سیگناڵ بۆ هەموو ڕیزەکان بە یەکجار.
+        ڕیزی i هەمان ئەنجامی calculate_scores دەدات بۆ ڕیزەکانی تا i (لە هەمان دراودا).
+
+        :param analyzed_df: frameی ئیندیکەیتەرەکان (analyze_data/add_indicators) یان چەند frameی
+                            دراوی جیاواز کە پێکەوە لکێنراون (stacked) لەگەڵ ستوونی group_column.
+        :param sentiment_score, fundamental_data, correlation_value: بەهایەک بۆ هەموو ڕیزەکان
+                            (fundamental_data هەمیشە dictی داتای یەک دراوە، نەک نەخشەی گرووپەکان).
+        :param group_column: ناوی ستوون یان levelی index کە ناوی دراوی تێدایە.
+        :param sentiment_by_group, fundamental_by_group, correlation_by_group: dictی {گرووپ: بەها}
+                            (پێویستی بە group_column هەیە)؛ گرووپێک کە تێیدا نەبێت بەهای گشتی وەردەگرێت.
+        :return: DataFrameی technical، sentiment، fundamental، correlation، total و signal.
+        """
+        by_group = {
+            'sentiment': sentiment_by_group,
+            'fundamental': fundamental_by_group,
+            'correlation': correlation_by_group,
+        }
+        if group_column is None and any(mapping is not None for mapping in by_group.values()):
+            raise ValueError("بەهای هەر گرووپێک پێویستی بە group_column هەیە")
+
+        groups = None
+        indicators = analyzed_df
+        if group_column is not None:
+            if group_column in analyzed_df.columns:
+                groups = analyzed_df[group_column].to_numpy()
+                indicators = analyzed_df.drop(columns=[group_column])
+            else:
+                groups = analyzed_df.index.get_level_values(group_column).to_numpy()
+
+        components = {'technical': self.calculate_technical_scores(indicators, groups)}
+        inputs = {
+            'sentiment': (sentiment_score, self._calculate_sentiment_score),
+            'fundamental': (fundamental_data, self._calculate_fundamental_score),
+            'correlation': (correlation_value, self._calculate_correlation_score),
+        }
+        for key, (value, score_function) in inputs.items():
+            mapping = by_group[key]
+            if mapping is not None:
+                # خاڵی هەر دراوێک تەنها یەکجار حیساب دەکرێت
+                unique_groups, inverse = np.unique(groups, return_inverse=True)
+                per_group = [score_function(mapping.get(group, value)) for group in unique_groups.tolist()]
+                components[key] = np.asarray(per_group, dtype=float)[inverse]
+            else:
+                components[key] = np.full(len(analyzed_df), score_function(value), dtype=float)
+
+        totals = self._weighted_totals(components)
+        result = pd.DataFrame(components, index=analyzed_df.index)
+        result['total'] = totals
+        unique_totals, inverse = np.unique(totals, return_inverse=True)
+        labels = np.asarray([self.get_signal_strength(total) for total in unique_totals.tolist()], dtype=object)
+        result['signal'] = labels[inverse]
+        return result
+
+    def _weighted_totals(self, components):
+        """
+        کۆی کێشدار بە هەمان ڕیزبەندی کۆکردنەوەی calculate_scores. round ی Python تەنها
+        بۆ هەر بەهایەکی جیاواز یەکجار بەکاردێت، بۆیە ئەنجام وەک ڕێگای ئاسایی وایە.
+        """
+        count = len(components['technical'])
+        total_score = np.zeros(count, dtype=float)
+        for key, weight in self.WEIGHTS.items():
+            total_score = total_score + np.asarray(components.get(key, np.zeros(count)), dtype=float) * weight
+        unique_scores, inverse = np.unique(total_score, return_inverse=True)
+        rounded = [round(total, 2) for total in unique_scores.tolist()]
+        return np.asarray(rounded, dtype=float)[inverse]
+
     def _calculate_sentiment_score(self, sentiment_score):
         if sentiment_score is None: return 0
         # گۆڕینی خاڵی (-1 بۆ +1) بۆ (0 بۆ 100)
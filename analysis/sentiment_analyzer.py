@@ -1,30 +1,176 @@
 # analysis/sentiment_analyzer.py
-import configparser
-from newsapi import NewsApiClient
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+import itertools
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from utils.atomic_file import atomic_write
+from utils.config_loader import load_config
+from utils.metrics import get_metrics
+
+# کاشی هاوبەشی پرۆسە: هەواڵەکان بەپێی query و خاڵی هەر هەواڵێک بەپێی URL/ID
+_article_cache = {}
+_score_cache = {}
+_cache_lock = threading.RLock()
+# بە شێوەی بنەڕەت زۆرترین ژمارەی خاڵە هەڵگیراوەکان لە بیرگەدا (کۆنترینەکان لادەبرێن)
+SCORE_CACHE_SIZE = 20000
+
+# ئەنالایزەری VADER بۆ هەر worker processێک تەنها یەکجار دروست دەکرێت
+_worker_analyzer = None
+
+
+def _score_texts(texts):
+    """لیستێک دەق بە VADER خاڵ دەدات (لە worker processدا جێبەجێ دەکرێت)."""
+    global _worker_analyzer
+    if _worker_analyzer is None:
+        from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+        _worker_analyzer = SentimentIntensityAnalyzer()
+    return [_worker_analyzer.polarity_scores(text)['compound'] for text in texts]
+
+
+def _article_key(article):
+    """ناسنامەی هەواڵ بۆ لابردنی دووبارە لە نێوان دراوەکاندا."""
+    return article.get('url') or f"{article.get('title')}|{article.get('publishedAt')}"
+
+
+def _article_text(article):
+    title = article.get('title') or ""
+    description = article.get('description') or ""
+    return f"{title}. {description}"
+
 
 class SentimentAnalyzer:
     def __init__(self):
-        # ... (کۆدی __init__ وەک خۆی دەمێنێتەوە)
-        config = configparser.ConfigParser()
-        config.read('config/config.ini', encoding='utf-8')
+        config = load_config()
+        self.metrics = get_metrics()
         try:
             api_key = config['NEWS_API']['API_KEY']
-            self.newsapi = NewsApiClient(api_key=api_key)
-        except (KeyError, configparser.NoSectionError):
+            from newsapi import NewsApiClient
+            self.newsapi = self.metrics.instrument(NewsApiClient(api_key=api_key), 'newsapi', ('get_',))
+        except KeyError:
             print("⚠️ کلیل (API Key) بۆ NewsAPI لە config.ini نەدۆزرایەوە یان بەشی [NEWS_API] بوونی نییە.")
             self.newsapi = None
-        
-        self.analyzer = SentimentIntensityAnalyzer()
 
+        # هەواڵەکان لەم ماوەیەدا دووبارە داوا ناکرێنەوە
+        self.cache_ttl = config.getfloat('NEWS_API', 'CACHE_TTL_MINUTES', fallback=30) * 60
+        # ئەگەر لە 1 زیاتر بێت، خاڵدانی هەواڵە نوێیەکان لە process poolدا دابەش دەکرێت
+        self.workers = config.getint('NEWS_API', 'SENTIMENT_WORKERS', fallback=1)
+        # queryە نوێیەکانی NewsAPI بە هاوکاتی دەهێنرێن (هەمان سنووری سکان)
+        self.concurrency = config.getint('SCAN_SETTINGS', 'MAX_CONCURRENCY', fallback=8)
+        self.score_cache_size = config.getint('NEWS_API', 'SCORE_CACHE_SIZE', fallback=SCORE_CACHE_SIZE)
+        cache_dir = config.get('DATA_STORE', 'CACHE_DIR', fallback='cache')
+        self.cache_path = os.path.join(cache_dir, 'news_articles.json')
+        self._load_disk_cache()
+        self._analyzer = None
+
+    @property
+    def analyzer(self):
+        # فەرهەنگی VADER تەنها کاتێک بار دەکرێت کە هەواڵی نوێ بۆ خاڵدان هەبێت
+        if self._analyzer is None:
+            from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+            self._analyzer = SentimentIntensityAnalyzer()
+        return self._analyzer
 
     def get_crypto_sentiment(self, crypto_name):
         """
         نوێترین هەواڵەکان بۆ دراوێک دەهێنێت و شیکاری هەست و سۆزیان بۆ دەکات.
         """
+        return self.get_crypto_sentiments([crypto_name]).get(crypto_name, 0)
+
+    def get_crypto_sentiments(self, crypto_names):
+        """
+        هەست و سۆز بۆ چەند دراوێک بە یەکجار حیساب دەکات. هەواڵەکان لە کاشی TTL دەخوێنرێنەوە،
+        هەر هەواڵێک (بەپێی URL) تەنها یەکجار خاڵ دەدرێت تەنانەت ئەگەر بۆ چەند دراوێک دەربکەوێت،
+        و هەواڵە نوێیەکان بە کۆمەڵ (batch) خاڵ دەدرێن.
+
+        :return: dictی {crypto_name: تێکڕای خاڵ}.
+        """
         if not self.newsapi:
-            return 0 
+            return {name: 0 for name in crypto_names}
+
+        articles_by_name = self._get_articles_batch(list(dict.fromkeys(crypto_names)))
+
+        # کۆکردنەوەی هەواڵە بێ خاڵەکان لە هەموو دراوەکان، بێ دووبارە
+        scores_by_key, pending = {}, {}
+        with _cache_lock:
+            for articles in articles_by_name.values():
+                for article in articles or []:
+                    key = _article_key(article)
+                    if key in scores_by_key or key in pending:
+                        continue
+                    if key in _score_cache:
+                        # LRU: خاڵی بەکارهاتوو دەچێتە کۆتایی ڕیزەکە
+                        scores_by_key[key] = _score_cache[key] = _score_cache.pop(key)
+                    else:
+                        pending[key] = _article_text(article)
+
+        total = sum(len(articles or []) for articles in articles_by_name.values())
+        self.metrics.cache('sentiment_scores', hits=max(0, total - len(pending)), misses=len(pending))
+        if pending:
+            scores_by_key.update(zip(pending.keys(), self._score_batch(list(pending.values()))))
+            with _cache_lock:
+                _score_cache.update((key, scores_by_key[key]) for key in pending)
+                self._trim_score_cache()
+            self._save_disk_cache()
 
+        results = {}
+        for name, articles in articles_by_name.items():
+            if not articles:
+                results[name] = 0
+                continue
+            scores = [scores_by_key[_article_key(article)] for article in articles]
+            results[name] = round(sum(scores) / len(scores), 3)
+        return results
+
+    def _trim_score_cache(self):
+        """کۆنترین خاڵەکان لادەبات تا score_cache_size (پێویستە _cache_lock گیرابێت)."""
+        excess = len(_score_cache) - max(0, self.score_cache_size)
+        if excess > 0:
+            for key in list(itertools.islice(_score_cache, excess)):
+                del _score_cache[key]
+
+    def _get_articles_batch(self, crypto_names):
+        """
+        هەواڵەکانی چەند query ـیەک: ئەوانەی لە کاشدان ڕاستەوخۆ، و ئەوانەی تر بە هاوکاتی
+        لە thread poolێکدا (بە قەبارەی MAX_CONCURRENCY).
+        """
+        articles_by_name = {}
+        missing = []
+        for name in crypto_names:
+            cached = self._cached_articles(name)
+            if cached is None:
+                missing.append(name)
+            else:
+                articles_by_name[name] = cached
+
+        workers = min(self.concurrency, len(missing))
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='newsapi') as executor:
+                fetched = dict(zip(missing, executor.map(self._fetch_articles, missing)))
+        else:
+            fetched = {name: self._fetch_articles(name) for name in missing}
+        # ڕیزبەندی ئەنجامەکان وەک crypto_names
+        return {name: articles_by_name[name] if name in articles_by_name else fetched[name] for name in crypto_names}
+
+    def _cached_articles(self, crypto_name):
+        """هەواڵە هێشتا تازەکانی query لە کاش، یان None."""
+        with _cache_lock:
+            cached = _article_cache.get(crypto_name)
+            if cached and time.time() - cached[0] < self.cache_ttl:
+                self.metrics.cache('news_articles', hits=1)
+                return cached[1]
+        return None
+
+    def _get_articles(self, crypto_name):
+        """هەواڵەکانی query دەگەڕێنێتەوە، لە کاشەوە ئەگەر هێشتا کۆن نەبووبن."""
+        cached = self._cached_articles(crypto_name)
+        return cached if cached is not None else self._fetch_articles(crypto_name)
+
+    def _fetch_articles(self, crypto_name):
+        """هەواڵەکانی query لە NewsAPI دەهێنێت و لە کاش دادەنێت."""
+        self.metrics.cache('news_articles', misses=1)
         try:
             all_articles = self.newsapi.get_everything(
                 q=crypto_name,
@@ -32,27 +178,17 @@ class SentimentAnalyzer:
                 sort_by='publishedAt',
                 page_size=20
             )
-
-            if not all_articles or all_articles['totalResults'] == 0:
-                return 0
-
-            scores = []
-            for article in all_articles['articles']:
-                title = article['title'] or ""
-                description = article['description'] or ""
-                text_to_analyze = f"{title}. {description}"
-                vs = self.analyzer.polarity_scores(text_to_analyze)
-                scores.append(vs['compound'])
-
-            if scores:
-                average_score = sum(scores) / len(scores)
-                return round(average_score, 3)
-            return 0
+            articles = []
+            if all_articles and all_articles['totalResults'] != 0:
+                articles = [
+                    {key: article.get(key) for key in ('url', 'title', 'description', 'publishedAt')}
+                    for article in all_articles['articles']
+                ]
+            with _cache_lock:
+                _article_cache[crypto_name] = (time.time(), articles)
+            return articles
 
         except Exception as e:
-            # --- گۆڕانکاری لێرەدایە ---
-            # کۆن: print(f"❌ هەڵە لە هێنانی هەواڵ بۆ {crypto_name}: {e}")
-            # نوێ: شێوازێکی سەلامەتتر بۆ چاپکردن
             try:
                 # هەوڵدەدەین بە شێوازی ستاندارد چاپی بکەین
                 print(f"❌ هەڵە لە هێنانی هەواڵ بۆ {crypto_name}: {e}")
@@ -60,4 +196,43 @@ class SentimentAnalyzer:
                 # ئەگەر شکستی هێنا، نووسە نامۆکان پشتگوێ دەخەین
                 safe_error_message = str(e).encode('ascii', 'ignore').decode('ascii')
                 print(f"❌ هەڵە لە هێنانی هەواڵ بۆ {crypto_name}: {safe_error_message}")
-            return 0
\ No newline at end of file
+            # هەواڵی کۆن (ئەگەر هەبێت) باشترە لە هیچ
+            with _cache_lock:
+                cached = _article_cache.get(crypto_name)
+            return cached[1] if cached else []
+
+    def _score_batch(self, texts):
+        """دەقەکان خاڵ دەدات؛ ئەگەر workers > 1 بێت، بە چەند processێک."""
+        if self.workers <= 1 or len(texts) < self.workers * 10:
+            return [self.analyzer.polarity_scores(text)['compound'] for text in texts]
+
+        chunk_size = -(-len(texts) // self.workers)
+        chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            return [score for chunk_scores in executor.map(_score_texts, chunks) for score in chunk_scores]
+
+    def _load_disk_cache(self):
+        with _cache_lock:
+            if _article_cache or not os.path.exists(self.cache_path):
+                return
+            try:
+                with open(self.cache_path, encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                return
+            _article_cache.update({query: tuple(entry) for query, entry in data.get('articles', {}).items()})
+            _score_cache.update(data.get('scores', {}))
+            self._trim_score_cache()
+
+    def _save_disk_cache(self):
+        with _cache_lock:
+            # تەنها هەواڵە تازەکان و خاڵەکانیان هەڵدەگیرێن بۆ ئەوەی فایلەکە گەورە نەبێت
+            now = time.time()
+            articles = {q: entry for q, entry in _article_cache.items() if now - entry[0] < self.cache_ttl}
+            keys = {_article_key(a) for _, entry in articles.values() for a in entry}
+            data = {'articles': articles, 'scores': {k: v for k, v in _score_cache.items() if k in keys}}
+        try:
+            with atomic_write(self.cache_path) as f:
+                json.dump(data, f)
+        except OSError as e:
+            print(f"⚠️ نەتوانرا کاشی هەواڵەکان پاشەکەوت بکرێت: {e}")
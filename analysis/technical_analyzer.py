@@ -1,19 +1,32 @@
 # analysis/technical_analyzer.py
-import pandas_ta as ta
 
-def analyze_data(df):
+# ناوی ئەو ستوونانەی کە add_indicators زیادیان دەکات
+INDICATOR_COLUMNS = ['RSI_14', 'MACD_12_26_9', 'MACDh_12_26_9', 'MACDs_12_26_9', 'EMA_50', 'EMA_200']
+
+def add_indicators(df):
     """
-    ئیندیکەیتەرە تەکنیکییەکان بۆ DataFrame زیاد دەکات
+    ئیندیکەیتەرە تەکنیکییەکان بۆ DataFrame زیاد دەکات بەبێ لابردنی ڕیزەکانی سەرەتا (warmup).
+    هەموو ئیندیکەیتەرەکان causalن، واتە بەهای ڕیزی i تەنها پشت بە ڕیزەکانی 0..i دەبەستێت.
     """
-    if df is None or df.empty:
-        return None
-    
+    # pandas_ta قورسە، بۆیە تەنها لە یەکەم حیسابکردندا import دەکرێت (accessorی df.ta تۆمار دەکات)
+    import pandas_ta  # noqa: F401
+
     # زیادکردنی ستراتیژییەکانی TA بە بەکارهێنانی pandas_ta
     df.ta.rsi(length=14, append=True)
     df.ta.macd(fast=12, slow=26, signal=9, append=True)
     df.ta.ema(length=50, append=True)  # EMA 50
     df.ta.ema(length=200, append=True) # EMA 200
-    
+    return df
+
+def analyze_data(df):
+    """
+    ئیندیکەیتەرە تەکنیکییەکان بۆ DataFrame زیاد دەکات
+    """
+    if df is None or df.empty:
+        return None
+
+    add_indicators(df)
+
     # دڵنیابوونەوە لەوەی هیچ NaN value بوونی نییە
     df.dropna(inplace=True)
-    return df
\ No newline at end of file
+    return df
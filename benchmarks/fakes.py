@@ -0,0 +1,280 @@
+# benchmarks/fakes.py
+"""
+جێگرەوەی ناوخۆیی بۆ ccxt، NewsAPI، CoinGecko و تێلیگرام بۆ ئەوەی بێنچمارکەکان بەبێ ئینتەرنێت
+و بە ئەنجامی دووبارەبووەوە (deterministic) کار بکەن. install_fakes مۆدیولە ساختەکان لە
+sys.modules دادەنێت؛ چونکە کۆدی پڕۆژەکە ئەم کتێبخانانە تەنها لە یەکەم بەکارهێناندا import
+دەکات، هەمان ڕێڕەوی کۆدی ڕاستەقینە تاقی دەکرێتەوە.
+"""
+import asyncio
+import sys
+import time
+import types
+import zlib
+
+import numpy as np
+
+TIMEFRAME_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800, 'M': 2592000, 'y': 31536000}
+
+BASE_SYMBOLS = ['BTC', 'ETH', 'SOL', 'BNB', 'XRP', 'ADA', 'DOGE', 'AVAX', 'DOT', 'LINK',
+                'MATIC', 'LTC', 'ATOM', 'NEAR', 'APT', 'ARB', 'OP', 'FIL', 'INJ', 'SUI']
+
+NEWS_WORDS = {
+    'positive': ['surges', 'rallies', 'breaks out', 'gains adoption', 'hits record high', 'partnership announced'],
+    'negative': ['crashes', 'plunges', 'hacked', 'faces lawsuit', 'sell-off deepens', 'delisted'],
+    'neutral': ['trades sideways', 'update released', 'volume steady', 'community call scheduled'],
+}
+
+
+def parse_timeframe(timeframe):
+    """وەک ccxt.Exchange.parse_timeframe: ماوەی تایمفرەیم بە چرکە."""
+    return int(timeframe[:-1]) * TIMEFRAME_UNITS[timeframe[-1]]
+
+
+def make_symbols(count, quote='USDT'):
+    """لیستی دراوەکانی بێنچمارک؛ BTC هەمیشە یەکەمە (بۆ شیکاری پەیوەندی)."""
+    bases = list(BASE_SYMBOLS)
+    bases += [f"SYN{i}" for i in range(max(0, count - len(bases)))]
+    return [f"{base}/{quote}" for base in bases[:count]]
+
+
+def synthetic_ohlcv(bars, timeframe_ms, end_ms, seed):
+    """
+    مۆمی ساختە بە random walkی لۆگاریتمی کە ڕێڕەوی (drift) ـەکەی هەر 150 مۆم دەگۆڕێت،
+    بۆیە RSI و MACD هەردوو لایەنی سیگناڵ دەبینن.
+
+    :return: arrayی (bars, 6): timestamp (ms)، open، high، low، close، volume.
+    """
+    rng = np.random.default_rng(seed)
+    drift = np.repeat(rng.normal(0, 0.004, bars // 150 + 1), 150)[:bars]
+    log_returns = drift + rng.normal(0, 0.02, bars)
+    close = 100 * np.exp(np.cumsum(log_returns))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    spread = np.abs(rng.normal(0, 0.01, bars)) * close
+    high = np.maximum(open_, close) + spread
+    low = np.minimum(open_, close) - spread
+    volume = rng.lognormal(10, 1, bars)
+
+    last_open = (end_ms // timeframe_ms) * timeframe_ms
+    timestamps = last_open - timeframe_ms * np.arange(bars - 1, -1, -1, dtype=np.int64)
+    return np.column_stack((timestamps, open_, high, low, close, volume))
+
+
+class SyntheticMarket:
+    """
+    بازاڕێکی ساختە: بۆ هەر (دراو، تایمفرەیم) دوایین `bars` مۆم تا end_ms. هەمان دراو
+    هەمیشە هەمان داتا دەدات چونکە seed لە ناوەکەیەوە دروست دەکرێت.
+    """
+
+    def __init__(self, bars=500, end_ms=None, latency_ms=0, symbols=None):
+        self.bars = bars
+        self.symbols = symbols or make_symbols(20)
+        self.end_ms = end_ms if end_ms is not None else int(time.time() * 1000)
+        self.latency = latency_ms / 1000
+        # کاتژمێری بازاڕ: ئەگەر دیاری کرابێت، مۆمە دواتر لەم کاتە نادرێنەوە (بڕوانە kline_server.py)
+        self.now_ms = None
+        self._candles = {}
+        self.requests = 0
+
+    def candles(self, symbol, timeframe):
+        key = (symbol, timeframe, self.bars)
+        if key not in self._candles:
+            seed = zlib.crc32(f"{symbol}|{timeframe}".encode())
+            self._candles[key] = synthetic_ohlcv(self.bars, parse_timeframe(timeframe) * 1000, self.end_ms, seed)
+        return self._candles[key]
+
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        self.requests += 1
+        candles = self.candles(symbol, timeframe)
+        if self.now_ms is not None:
+            candles = candles[candles[:, 0] <= self.now_ms]
+        if since is not None:
+            candles = candles[candles[:, 0] >= since]
+            if limit:
+                candles = candles[:limit]
+        elif limit:
+            candles = candles[-limit:]
+        return [[int(row[0])] + row[1:].tolist() for row in candles]
+
+    def ticker(self, symbol):
+        """tickerی 24 کاتژمێری لە مۆمەکانی 1h ی هەمان دراو."""
+        day = self.candles(symbol, '1h')[-24:]
+        last = float(day[-1, 4])
+        # spreadی جێگیر بۆ هەر دراوێک لە نێوان 0 و 1% دا
+        half_spread = last * (zlib.crc32(symbol.encode()) % 100) / 20000
+        return {
+            'symbol': symbol, 'timestamp': self.end_ms, 'last': last, 'close': last,
+            'bid': last - half_spread, 'ask': last + half_spread,
+            'open': float(day[0, 1]), 'high': float(day[:, 2].max()), 'low': float(day[:, 3].min()),
+            'baseVolume': float(day[:, 5].sum()), 'quoteVolume': float((day[:, 5] * day[:, 4]).sum()),
+            'percentage': (last / float(day[0, 1]) - 1) * 100,
+        }
+
+
+MARKET = SyntheticMarket()
+
+
+class FakeExchange:
+    """کلاینتی هاوکاتی (sync) ی ccxt بە داتای MARKET."""
+    rateLimit = 0
+
+    def __init__(self, config=None):
+        self.name = f"{type(self).__name__} (offline)"
+
+    def milliseconds(self):
+        return MARKET.end_ms if MARKET.now_ms is None else MARKET.now_ms
+
+    def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None):
+        if MARKET.latency:
+            time.sleep(MARKET.latency)
+        return MARKET.fetch_ohlcv(symbol, timeframe, since, limit)
+
+    def fetch_ticker(self, symbol):
+        return MARKET.ticker(symbol)
+
+    def fetch_tickers(self, symbols=None):
+        return {symbol: MARKET.ticker(symbol) for symbol in (symbols or MARKET.symbols)}
+
+    def load_markets(self, reload=False):
+        return {
+            symbol: {'symbol': symbol, 'base': symbol.split('/')[0], 'quote': symbol.split('/')[1],
+                     'active': True, 'spot': True, 'type': 'spot'}
+            for symbol in MARKET.symbols
+        }
+
+
+class FakeAsyncExchange(FakeExchange):
+    """کلاینتی async ی ccxt؛ دواکەوتنی تۆڕ بە asyncio.sleep لاسایی دەکرێتەوە."""
+
+    async def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None):
+        if MARKET.latency:
+            await asyncio.sleep(MARKET.latency)
+        return MARKET.fetch_ohlcv(symbol, timeframe, since, limit)
+
+    async def close(self):
+        pass
+
+
+class FakeNewsApiClient:
+    """NewsApiClient: بۆ هەر query بیست هەواڵی ساختە، هەندێکیان لە نێوان دراوەکاندا هاوبەشن."""
+
+    def __init__(self, api_key=None):
+        self.requests = 0
+
+    def get_everything(self, q=None, language=None, sort_by=None, page_size=20):
+        self.requests += 1
+        rng = np.random.default_rng(zlib.crc32(str(q).encode()))
+        articles = []
+        for i in range(page_size):
+            mood = rng.choice(list(NEWS_WORDS))
+            phrase = rng.choice(NEWS_WORDS[mood])
+            # هەواڵە گشتییەکانی بازاڕ بۆ هەموو queryیەک دووبارە دەبنەوە
+            shared = i % 4 == 0
+            subject = 'Crypto market' if shared else q
+            url = f"https://news.invalid/{'market' if shared else q}/{i}"
+            articles.append({
+                'url': url,
+                'title': f"{subject} {phrase}",
+                'description': f"Analysts say {subject} {phrase} as traders react.",
+                'publishedAt': '2024-01-01T00:00:00Z',
+            })
+        return {'status': 'ok', 'totalResults': len(articles), 'articles': articles}
+
+
+class FakeCoinGeckoAPI:
+    """CoinGeckoAPI: لیستی دراوەکان، ڕیزبەندی بازاڕ و داتای پەرەپێدان بۆ دراوەکانی بێنچمارک."""
+
+    def __init__(self, *args, **kwargs):
+        self.requests = 0
+        bases = BASE_SYMBOLS + [f"SYN{i}" for i in range(1000)]
+        self._coins = [{'id': f"coin-{base.lower()}", 'symbol': base.lower(), 'name': base} for base in bases]
+
+    def get_coins_list(self, **kwargs):
+        self.requests += 1
+        return list(self._coins)
+
+    def get_coins_markets(self, vs_currency='usd', ids=None, per_page=250, **kwargs):
+        self.requests += 1
+        ids = ids.split(',') if isinstance(ids, str) else list(ids or [])
+        return [{'id': coin_id, 'market_cap_rank': zlib.crc32(coin_id.encode()) % 300 + 1} for coin_id in ids]
+
+    def get_coin_by_id(self, id, **kwargs):
+        self.requests += 1
+        seed = zlib.crc32(id.encode())
+        return {'id': id, 'developer_score': seed % 100, 'developer_data': {'stars': seed % 50000}}
+
+
+class FakeTelegramBot:
+    """telegram.Bot: پەیامەکان تەنها هەڵدەگیرێن."""
+
+    def __init__(self, token=None):
+        self.sent = []
+
+    async def send_message(self, chat_id=None, text=None, parse_mode=None, **kwargs):
+        if MARKET.latency:
+            await asyncio.sleep(MARKET.latency)
+        self.sent.append(text)
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+
+class TelegramError(Exception):
+    pass
+
+
+class NetworkError(TelegramError):
+    pass
+
+
+class BadRequest(NetworkError):
+    pass
+
+
+class TimedOut(NetworkError):
+    pass
+
+
+class RetryAfter(TelegramError):
+    def __init__(self, retry_after):
+        super().__init__(f"Flood control exceeded. Retry in {retry_after} seconds")
+        self.retry_after = retry_after
+
+
+def _module(name, **attributes):
+    module = types.ModuleType(name)
+    module.__dict__.update(attributes)
+    return module
+
+
+def install_fakes(market=None):
+    """
+    مۆدیولە ساختەکان لە sys.modules دادەنێت. پێویستە پێش یەکەم بەکارهێنانی ccxt، newsapi،
+    pycoingecko و telegram بانگ بکرێت.
+    """
+    global MARKET
+    if market is not None:
+        MARKET = market
+
+    exchange_ids = ['binance', 'kucoin', 'okx']
+    async_support = _module('ccxt.async_support', **{i: type(i, (FakeAsyncExchange,), {}) for i in exchange_ids})
+    ccxt = _module('ccxt', Exchange=type('Exchange', (), {'parse_timeframe': staticmethod(parse_timeframe)}),
+                   async_support=async_support, **{i: type(i, (FakeExchange,), {}) for i in exchange_ids})
+
+    telegram_constants = _module('telegram.constants', ParseMode=types.SimpleNamespace(MARKDOWN='Markdown', HTML='HTML'))
+    telegram_error = _module('telegram.error', TelegramError=TelegramError, NetworkError=NetworkError,
+                             BadRequest=BadRequest, TimedOut=TimedOut, RetryAfter=RetryAfter)
+    telegram = _module('telegram', Bot=FakeTelegramBot, constants=telegram_constants, error=telegram_error)
+
+    sys.modules.update({
+        'ccxt': ccxt,
+        'ccxt.async_support': async_support,
+        'newsapi': _module('newsapi', NewsApiClient=FakeNewsApiClient),
+        'pycoingecko': _module('pycoingecko', CoinGeckoAPI=FakeCoinGeckoAPI),
+        'telegram': telegram,
+        'telegram.constants': telegram_constants,
+        'telegram.error': telegram_error,
+    })
+    return MARKET
@@ -0,0 +1,256 @@
+# benchmarks/kline_server.py
+"""
+سێرڤەرێکی websocket ی ناوخۆیی کە klineی Binance لاسایی دەکاتەوە، بۆ تاقیکردنەوەی مۆدی stream
+(data_fetcher/kline_stream.py) بەبێ ئینتەرنێت. مۆمەکان لە SyntheticMarket دێن و کاتژمێری
+بازاڕ (now_ms) لەگەڵ streamەکە پێشدەکەوێت، بۆیە REST (بۆ پڕکردنەوەی بۆشایی) و stream هەمان داتا دەدەن.
+
+    python -m benchmarks.kline_server --symbols 10 --candles 6 --candle-seconds 1 --drop-after 3
+
+بەبێ پارامێتەر: daemon ی stream لە بەرامبەر سێرڤەرەکە جێبەجێ دەکات، پەیوەندییەکە لە ناوەڕاستدا
+دەپچڕێنێت و دڵنیادەبێتەوە لەوەی هەموو مۆمە داخراوەکان سکان کراون و لەگەڵ REST یەکدەگرنەوە.
+"""
+import argparse
+import asyncio
+import configparser
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.fakes import SyntheticMarket, install_fakes, make_symbols, parse_timeframe
+
+
+class FakeKlineServer:
+    """
+    دوایین `candles` مۆمی هەر دراوێک وەک streamی kline دەنێرێت: بۆ هەر مۆمێک updates_per_candle
+    پەیامی نەداخراو و پاشان یەک پەیامی x=true. ئەگەر drop_after دیاری کرابێت، دوای ئەو ژمارە مۆمە
+    هەموو پەیوەندییەکان دادەخرێن بۆ تاقیکردنەوەی reconnect و پڕکردنەوەی بۆشایی بە REST.
+    """
+
+    def __init__(self, market, timeframe='4h', candles=5, candle_seconds=1.0, updates_per_candle=3,
+                 drop_after=None, host='127.0.0.1', port=0):
+        self.market = market
+        self.timeframe = timeframe
+        self.timeframe_ms = parse_timeframe(timeframe) * 1000
+        self.candles = candles
+        self.candle_seconds = candle_seconds
+        self.updates_per_candle = updates_per_candle
+        self.drop_after = drop_after
+        self.host = host
+        self.port = port
+        self._ids = {symbol.replace('/', ''): symbol for symbol in market.symbols}
+        self._clients = {}     # ws -> set of stream names
+        self._runner = None
+        self.loop = None
+        self.connections = 0
+        self.close_times = {}  # timestampی مۆم -> کاتی ناردنی x=true (perf_counter)
+        self.finished = threading.Event()
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}/stream"
+
+    async def start(self):
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_get('/stream', self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        # REST تەنها مۆمەکانی پێش یەکەم مۆمی stream دەبینێت
+        first = self.market.candles(self.market.symbols[0], self.timeframe)[-self.candles, 0]
+        self.market.now_ms = int(first) - self.timeframe_ms
+        return self
+
+    async def stop(self):
+        for ws in list(self._clients):
+            await ws.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def _handle(self, request):
+        from aiohttp import web
+
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self._clients[ws] = set(request.query.get('streams', '').split('/'))
+        self.connections += 1
+        try:
+            async for _ in ws:
+                pass
+        finally:
+            self._clients.pop(ws, None)
+        return ws
+
+    def _message(self, symbol, row, closed):
+        market_id = symbol.replace('/', '')
+        return json.dumps({
+            'stream': f"{market_id.lower()}@kline_{self.timeframe}",
+            'data': {'e': 'kline', 'E': self.market.now_ms, 's': market_id, 'k': {
+                't': int(row[0]), 'T': int(row[0]) + self.timeframe_ms - 1, 's': market_id, 'i': self.timeframe,
+                'o': str(row[1]), 'h': str(row[2]), 'l': str(row[3]), 'c': str(row[4]), 'v': str(row[5]), 'x': closed,
+            }},
+        })
+
+    async def _broadcast(self, index, step):
+        """مۆمی index ی هەموو دراوەکان (step لە updates_per_candle؛ دوایینیان x=true)."""
+        closed = step == self.updates_per_candle
+        for ws, streams in list(self._clients.items()):
+            for stream in streams:
+                symbol = self._ids.get(stream.split('@')[0].upper())
+                if symbol is None:
+                    continue
+                row = self.market.candles(symbol, self.timeframe)[index].copy()
+                if not closed:
+                    # مۆمی نەداخراو: نرخ بە شێوەی هێڵی لە open ەوە بەرەو close دەڕوات
+                    fraction = (step + 1) / (self.updates_per_candle + 1)
+                    row[4] = row[1] + (row[4] - row[1]) * fraction
+                    row[2], row[3] = max(row[1], row[4]), min(row[1], row[4])
+                    row[5] *= fraction
+                try:
+                    await ws.send_str(self._message(symbol, row, closed))
+                except ConnectionError:
+                    break
+
+    async def play(self):
+        """مۆمەکان یەک بە یەک دەنێرێت؛ هەر مۆمێک candle_seconds دەخایەنێت."""
+        pause = self.candle_seconds / (self.updates_per_candle + 1)
+        timestamps = self.market.candles(self.market.symbols[0], self.timeframe)[:, 0]
+        for n, index in enumerate(range(len(timestamps) - self.candles, len(timestamps)), start=1):
+            self.market.now_ms = int(timestamps[index])
+            for step in range(self.updates_per_candle + 1):
+                await asyncio.sleep(pause)
+                if step == self.updates_per_candle:
+                    self.close_times[self.market.now_ms] = time.perf_counter()
+                await self._broadcast(index, step)
+            if self.drop_after and n == self.drop_after:
+                print(f"✂️ سێرڤەری تاقیکردنەوە پەیوەندییەکانی دوای مۆمی {n} پچڕاند.")
+                for ws in list(self._clients):
+                    await ws.close()
+        self.finished.set()
+
+    def serve_in_thread(self):
+        """سێرڤەرەکە لە threadێکی جیا (بە event loopی خۆی) دەستپێدەکات و play دەکات."""
+        started = threading.Event()
+
+        def run():
+            self.loop = asyncio.new_event_loop()
+            self.loop.run_until_complete(self.start())
+            started.set()
+            self.loop.run_until_complete(self.play())
+            self.loop.run_forever()
+            self.loop.run_until_complete(self.stop())
+            self.loop.close()
+
+        thread = threading.Thread(target=run, name='kline-server', daemon=True)
+        thread.start()
+        started.wait()
+        return thread
+
+    def shutdown(self, thread):
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        thread.join(timeout=10)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="تاقیکردنەوەی مۆدی stream لە بەرامبەر سێرڤەری websocket ی ناوخۆیی")
+    parser.add_argument('--symbols', type=int, default=10)
+    parser.add_argument('--timeframe', default='4h')
+    parser.add_argument('--candles', type=int, default=6, help="ژمارەی ئەو مۆمانەی بە stream دەنێردرێن")
+    parser.add_argument('--candle-seconds', type=float, default=1.0, help="ماوەی هەر مۆمێک بە چرکە")
+    parser.add_argument('--drop-after', type=int, default=3, help="پچڕاندنی پەیوەندی دوای ئەم مۆمە (0 = هەرگیز)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    from benchmarks.run_benchmarks import BENCH_CONFIG
+
+    args = parse_args(argv)
+    symbols = make_symbols(args.symbols)
+    market = install_fakes(SyntheticMarket(bars=400, end_ms=1_700_000_000_000, symbols=symbols))
+    server = FakeKlineServer(market, args.timeframe, args.candles, args.candle_seconds,
+                             drop_after=args.drop_after or None)
+    server_thread = server.serve_in_thread()
+
+    workdir = tempfile.mkdtemp(prefix='crypto_stream_')
+    config = configparser.ConfigParser()
+    config.read_string(BENCH_CONFIG.format(timeframe=args.timeframe, symbols=", ".join(symbols), concurrency=8,
+                                           cache_dir=os.path.join(workdir, 'cache')))
+    config.read_dict({
+        'STREAM': {'URL': server.url, 'DEBOUNCE_SECONDS': '0.1'},
+        'DAEMON': {'INDICATOR_STATE_PATH': os.path.join(workdir, 'indicator_state.json')},
+    })
+    os.makedirs(os.path.join(workdir, 'config'))
+    with open(os.path.join(workdir, 'config', 'config.ini'), 'w', encoding='utf-8') as f:
+        config.write(f)
+
+    previous_dir = os.getcwd()
+    os.chdir(workdir)
+    try:
+        from core.daemon import ScanDaemon
+
+        class SilentNotifier:
+            def send_message(self, *args, **kwargs):
+                pass
+
+            def close(self):
+                pass
+
+        daemon = ScanDaemon(config, notifier=SilentNotifier())
+        daemon.grace_seconds = 0
+        latencies = []
+        scan_frames = daemon._scan_frames
+
+        async def timed_scan(frames):
+            signals = await scan_frames(frames)
+            finished = time.perf_counter()
+            for df in frames.values():
+                closed_at = server.close_times.get(int(df['timestamp'].iloc[-1].value // 1_000_000))
+                if closed_at is not None:
+                    latencies.append(finished - closed_at)
+            return signals
+        daemon._scan_frames = timed_scan
+
+        def stop_when_finished():
+            server.finished.wait()
+            time.sleep(max(1.0, args.candle_seconds))
+            asyncio.run_coroutine_threadsafe(daemon.stream.stop(), daemon.loop)
+        threading.Thread(target=stop_when_finished, daemon=True).start()
+
+        daemon.run_streaming()
+        handler = daemon.scanner.exchange_handler
+        mismatched = [symbol for symbol in symbols
+                      if not handler.fetch_ohlcv_data(symbol, args.timeframe, daemon.history).equals(daemon.series[symbol].to_frame())]
+        last_closed = int(market.now_ms)
+        unscanned = [symbol for symbol in symbols if daemon.last_candle.get(symbol) != last_closed]
+    finally:
+        os.chdir(previous_dir)
+        shutil.rmtree(workdir, ignore_errors=True)
+        server.shutdown(server_thread)
+
+    print("\n----- 📡 ئەنجامی تاقیکردنەوەی stream -----")
+    print(f"پەیوەندییەکان: {server.connections} | سکانەکان: {daemon.cycles} | {daemon.stream.stats}")
+    if latencies:
+        print(f"دواکەوتنی داخستنی مۆم تا سیگناڵ: median {statistics.median(latencies) * 1000:.0f} ms، "
+              f"زۆرترین {max(latencies) * 1000:.0f} ms")
+    if mismatched or unscanned:
+        print(f"❌ جیاوازی لەگەڵ REST: {mismatched} | دوایین مۆم سکان نەکرا: {unscanned}")
+        return 1
+    print("✅ مۆمەکانی stream لەگەڵ REST یەکدەگرنەوە و هەموو مۆمە داخراوەکان سکان کران.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,321 @@
+# benchmarks/run_benchmarks.py
+"""
+بێنچمارکی ئۆفلاین بۆ گرتنی دواکەوتنی کارایی پێش ئەوەی بگاتە production.
+
+    python -m benchmarks.run_benchmarks --symbols 20 --history-lengths 500,2000,8000 --output bench.json
+    python -m benchmarks.run_benchmarks --compare bench.json --threshold 0.25
+
+هەموو پەیوەندییە دەرەکییەکان (ccxt، NewsAPI، CoinGecko، تێلیگرام) بە benchmarks.fakes جێگۆڕکێ
+دەکرێن و لە دایرێکتۆرییەکی کاتیدا بە config.iniی تایبەت کار دەکات، بۆیە کاش و ڕێکخستنەکانی
+پڕۆژەکە دەستکاری ناکرێن. ئەنجامەکان وەک JSON دەنووسرێن بۆ بەراوردکردن لە نێوان commitەکاندا.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.fakes import SyntheticMarket, install_fakes, make_symbols
+
+TIMEFRAME = '4h'
+
+BENCH_CONFIG = """
+[SCAN_SETTINGS]
+EXCHANGE_ID = binance
+TIMEFRAME = {timeframe}
+SYMBOLS = {symbols}
+MAX_CONCURRENCY = {concurrency}
+
+[BACKTEST_SETTINGS]
+INITIAL_CAPITAL = 1000
+TRADE_AMOUNT_PERCENT = 0.1
+START_DATE = 2000-01-01T00:00:00Z
+TRADING_FEE_PERCENT = 0.001
+STOP_LOSS_PERCENT = 0.05
+BACKFILL_PARALLEL = 4
+
+[NEWS_API]
+API_KEY = offline
+
+[TELEGRAM]
+BOT_TOKEN = offline
+CHAT_ID = 0
+DIGEST_WINDOW_SECONDS = 0
+MESSAGES_PER_SECOND = 100000
+BURST = 100000
+
+[DATA_STORE]
+CACHE_DIR = {cache_dir}
+
+[RESULTS_STORE]
+# تاقیکردنەوەکان دەبێت هەموو جارێک حیساب بکرێن، نەک لە کاشی memoization بێن
+ENABLED = false
+"""
+
+
+def measure(func, repeat=3, setup=None):
+    """
+    func چەند جارێک جێبەجێ دەکات: کات بەبێ tracemalloc دەپێورێت (چونکە خاوی دەکاتەوە)
+    و لە جێبەجێکردنێکی جیادا بەرزترین بیرگەی بەکارهاتوو دەپێورێت.
+
+    :param setup: بانگکردنێک پێش هەر جێبەجێکردنێک کە کاتەکەی ناپێورێت (بۆ نموونە پاککردنەوەی کاش).
+    :return: dictی seconds (کەمترین)، seconds_median و peak_mb.
+    """
+    timings = []
+    for _ in range(max(1, repeat)):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'seconds': min(timings),
+        'seconds_median': statistics.median(timings),
+        'peak_mb': peak / (1024 * 1024),
+    }
+
+
+def reset_analysis_caches(cache_dir):
+    """کاشی هەواڵ، خاڵی هەست و سۆز و داتای CoinGecko (لە بیرگە و دیسک) پاک دەکاتەوە."""
+    from analysis import fundamental_analyzer, sentiment_analyzer
+
+    sentiment_analyzer._article_cache.clear()
+    sentiment_analyzer._score_cache.clear()
+    fundamental_analyzer._shared_cache.update({'coin_list': None, 'symbol_index': None, 'loaded_at': 0, 'coins': None})
+    shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def bench_analyze(market, symbols, lengths, repeat):
+    from analysis.technical_analyzer import analyze_data
+    from data_fetcher.exchange_handler import ExchangeHandler
+
+    handler = ExchangeHandler('binance', candle_store_dir='')
+    results = []
+    for length in lengths:
+        market.bars = length
+        frames = [handler._to_dataframe(market.fetch_ohlcv(symbol, TIMEFRAME)) for symbol in symbols]
+        run = lambda: [analyze_data(df.copy()) for df in frames]
+        run()  # گەرمکردنەوە (import ی pandas_ta)
+        stats = measure(run, repeat)
+        rows = length * len(symbols)
+        stats['rows_per_second'] = rows / stats['seconds']
+        results.append({'name': 'analyze_data', 'params': {'bars': length, 'symbols': len(symbols)}, **stats})
+    return results
+
+
+def bench_scan(market, symbols, bars, concurrency_levels, repeat, cache_dir):
+    from core.scanner import CryptoScanner
+
+    market.bars = bars
+    scanner = CryptoScanner('binance', TIMEFRAME)
+    scanner.exchange_handler.candle_store = None
+    reset = lambda: reset_analysis_caches(cache_dir)
+
+    results = []
+    for concurrency in concurrency_levels:
+        run = lambda: scanner.scan_symbols(symbols, concurrency=concurrency)
+        run()
+        # cold: کاشەکانی هەواڵ و CoinGecko بەتاڵن؛ warm: سکانی دووبارە لە هەمان پرۆسەدا
+        for cache_state, setup in (('cold', reset), ('warm', None)):
+            stats = measure(run, repeat, setup=setup)
+            stats['seconds_per_symbol'] = stats['seconds'] / len(symbols)
+            params = {'symbols': len(symbols), 'bars': bars, 'concurrency': concurrency,
+                      'cache': cache_state, 'latency_ms': market.latency * 1000}
+            results.append({'name': 'scan_symbols', 'params': params, **stats})
+    return results
+
+
+def bench_backtest(market, lengths, repeat, config_text):
+    import configparser
+
+    from core.backtester import Backtester
+    from core.scanner import CryptoScanner
+    from data_fetcher.exchange_handler import ExchangeHandler
+
+    scanner = CryptoScanner('binance', TIMEFRAME)
+    scanner.exchange_handler.candle_store = None
+    timeframe_ms = ExchangeHandler('binance', candle_store_dir='')._timeframe_ms(TIMEFRAME)
+
+    results = []
+    for length in lengths:
+        market.bars = length
+        config = configparser.ConfigParser()
+        config.read_string(config_text)
+        config['SCAN_SETTINGS']['SYMBOLS'] = 'BTC/USDT'
+        first_open = (market.end_ms // timeframe_ms - (length - 1)) * timeframe_ms
+        config['BACKTEST_SETTINGS']['START_DATE'] = datetime.fromtimestamp(first_open / 1000, timezone.utc).isoformat()
+
+        backtester = Backtester(config, scanner=scanner)
+        outcome = {}
+        run = lambda: outcome.update(zip(('history', 'trades', 'results'), backtester.run()))
+        run()
+        stats = measure(run, repeat)
+        stats['bars_per_second'] = length / stats['seconds']
+        stats['trades'] = len(outcome['trades'])
+        results.append({'name': 'backtest', 'params': {'bars': length}, **stats})
+    return results
+
+
+def bench_notifier(messages, repeat):
+    from utils.notifier import TelegramNotifier
+
+    results = []
+    notifier = TelegramNotifier()
+    counter = iter(range(10 ** 9))
+
+    def enqueue():
+        for _ in range(messages):
+            notifier.send_message(f"signal {next(counter)}")
+
+    try:
+        stats = measure(enqueue, repeat, setup=lambda: notifier.flush(60))
+        stats['seconds_per_message'] = stats['seconds'] / messages
+        results.append({'name': 'notifier_enqueue', 'params': {'messages': messages}, **stats})
+    finally:
+        notifier.close()
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def result_key(result):
+    return f"{result['name']} {json.dumps(result['params'], sort_keys=True)}"
+
+
+def compare(results, baseline_path, threshold):
+    """
+    ئەنجامەکان لەگەڵ فایلی baseline بەراورد دەکات.
+    :return: لیستی ئەو بێنچمارکانەی کە لە threshold زیاتر خاو بوون.
+    """
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {result_key(r): r for r in json.load(f)['results']}
+
+    regressions = []
+    print(f"\n----- 📉 بەراورد لەگەڵ {baseline_path} -----")
+    for result in results:
+        previous = baseline.get(result_key(result))
+        if previous is None:
+            print(f"➕ {result_key(result)}: نوێیە")
+            continue
+        ratio = result['seconds'] / previous['seconds'] if previous['seconds'] else float('inf')
+        marker = "❌" if ratio > 1 + threshold else "✅"
+        print(f"{marker} {result_key(result)}: {previous['seconds']:.4f}s -> {result['seconds']:.4f}s ({ratio:.2f}x)")
+        if ratio > 1 + threshold:
+            regressions.append(result_key(result))
+    return regressions
+
+
+def print_table(results):
+    print("\n----- ⏱️ ئەنجامی بێنچمارک -----")
+    for result in results:
+        params = ", ".join(f"{k}={v}" for k, v in result['params'].items())
+        print(f"{result['name']:<18} {params:<70} {result['seconds']:>9.4f}s  "
+              f"(median {result['seconds_median']:.4f}s)  peak {result['peak_mb']:.1f} MB")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="بێنچمارکی ئۆفلاینی سکانەر و تاقیکردنەوە")
+    parser.add_argument('--symbols', type=int, default=10, help="ژمارەی دراوەکان (universe)")
+    parser.add_argument('--bars', type=int, default=500, help="ژمارەی مۆم بۆ هەر دراوێک لە سکان")
+    parser.add_argument('--history-lengths', default='500,2000,8000', help="درێژی مێژوو بۆ analyze_data و backtest")
+    parser.add_argument('--concurrency', default='1,8', help="ئاستەکانی هاوکاتی بۆ scan_symbols")
+    parser.add_argument('--latency-ms', type=float, default=0, help="دواکەوتنی ساختەی تۆڕ بۆ هەر داواکارییەک")
+    parser.add_argument('--notifier-messages', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--only', default='analyze,scan,backtest,notifier', help="ئەو بێنچمارکانەی جێبەجێ دەکرێن")
+    parser.add_argument('--output', default='bench_output.json', help="فایلی JSONی ئەنجامەکان")
+    parser.add_argument('--compare', help="فایلی JSONی پێشوو بۆ بەراوردکردن")
+    parser.add_argument('--threshold', type=float, default=0.2, help="ڕێژەی خاوبوونی ڕێگەپێدراو پێش شکست (0.2 = 20%%)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    lengths = [int(x) for x in args.history_lengths.split(',') if x]
+    concurrency_levels = [int(x) for x in args.concurrency.split(',') if x]
+    selected = set(args.only.split(','))
+    symbols = make_symbols(args.symbols)
+    output_path = os.path.abspath(args.output)
+    baseline_path = os.path.abspath(args.compare) if args.compare else None
+
+    market = install_fakes(SyntheticMarket(bars=args.bars, latency_ms=args.latency_ms))
+
+    workdir = tempfile.mkdtemp(prefix='crypto_bench_')
+    cache_dir = os.path.join(workdir, 'cache')
+    config_text = BENCH_CONFIG.format(timeframe=TIMEFRAME, symbols=", ".join(symbols),
+                                      concurrency=max(concurrency_levels), cache_dir=cache_dir)
+    os.makedirs(os.path.join(workdir, 'config'))
+    with open(os.path.join(workdir, 'config', 'config.ini'), 'w', encoding='utf-8') as f:
+        f.write(config_text)
+
+    previous_dir = os.getcwd()
+    os.chdir(workdir)
+    results = []
+    try:
+        if 'analyze' in selected:
+            results += bench_analyze(market, symbols, lengths, args.repeat)
+        if 'scan' in selected:
+            results += bench_scan(market, symbols, args.bars, concurrency_levels, args.repeat, cache_dir)
+        if 'backtest' in selected:
+            results += bench_backtest(market, lengths, args.repeat, config_text)
+        if 'notifier' in selected:
+            results += bench_notifier(args.notifier_messages, args.repeat)
+    finally:
+        os.chdir(previous_dir)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'args': vars(args),
+        },
+        'results': results,
+    }
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    print_table(results)
+    print(f"\n💾 ئەنجامەکان پاشەکەوت کران لە {output_path}")
+
+    if baseline_path:
+        regressions = compare(results, baseline_path, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} بێنچمارک لە {args.threshold:.0%} زیاتر خاو بوون.")
+            return 1
+        print("\n✅ هیچ خاوبوونێک نەدۆزرایەوە.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
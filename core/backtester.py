@@ -1,14 +1,111 @@
 # core/backtester.py
 
-import pandas as pd
+import sqlite3
+
+import numpy as np
 from datetime import datetime
 from .scanner import CryptoScanner
-from utils.visualizer import plot_backtest_results
+from analysis.quantitative_scorer import QuantitativeScorer
+from utils.log_sink import LogSink
+from utils.results_store import backtest_cache_key, get_results_store
 # <--- هەنگاوی 1: ئەم دێڕە زۆر گرنگە
-from analysis.technical_analyzer import analyze_data 
+from analysis.technical_analyzer import analyze_data, add_indicators
+
+# بەهای نەگۆڕی بەشەکانی تری خاڵبەندی لە کاتی تاقیکردنەوەدا
+BACKTEST_SENTIMENT = 0.5
+BACKTEST_FUNDAMENTALS = {'market_cap_rank': 50, 'developer_score': 60}
+BACKTEST_CORRELATION = 0.7
+# یەکەم ڕیز کە لۆجیکی کڕین و فرۆشتن لەسەری جێبەجێ دەکرێت (پێشتر EMA 200 گەرم دەبێتەوە)
+WARMUP_BARS = 199
+# بەشێکی کلیلی memoization ی تاقیکردنەوەکان؛ کاتێک لۆجیکی ستراتیژی یان ئیندیکەیتەرەکان دەگۆڕێن زیادی بکە
+STRATEGY_VERSION = 1
+
+
+def precompute_indicators(historical_data, scorer):
+    """
+    ئیندیکەیتەرەکان و خاڵی تەکنیکی یەکجار بۆ هەموو مێژووەکە حیساب دەکات.
+    ئەنجامەکە پشت بە کێش و ڕێکخستنی مامەڵە نابەستێت، بۆیە دەتوانرێت بۆ چەندین تاقیکردنەوە بەکاربێت.
+
+    :return: dictی NumPy arrayەکان: timestamp، close، rsi، technical، total (بە کێشەکانی scorer)، tradable.
+    """
+    analyzed_df = add_indicators(historical_data.copy())
+    scored = scorer.score_frame(analyzed_df, BACKTEST_SENTIMENT, BACKTEST_FUNDAMENTALS, BACKTEST_CORRELATION)
+    return {
+        'timestamp': analyzed_df['timestamp'].to_numpy(),
+        'close': analyzed_df['close'].to_numpy(dtype=float),
+        'rsi': analyzed_df['RSI_14'].to_numpy(dtype=float),
+        'technical': scored['technical'].to_numpy(),
+        'total': scored['total'].to_numpy(),
+        'tradable': analyzed_df.notna().all(axis=1).to_numpy(),
+    }
+
+
+def simulate_trades(close, rsi, total_scores, tradable, initial_capital, trade_amount_percent,
+                    trading_fee, stop_loss_percent, start=WARMUP_BARS, buy_threshold=60, sell_rsi=70):
+    """
+    ماشینی دۆخی کڕین/فرۆشتن/ڕاگرتنی زیان لەسەر NumPy arrayی ئامادەکراو جێبەجێ دەکات.
+    ڕیزی j وەک دوایین مۆمی بەردەست مامەڵەی لەگەڵ دەکرێت، هەروەک historical_data.iloc[:j + 1].
+
+    :return: Tuple(capital, position, events) کە events لیستی (index, type, price, amount)ە.
+    """
+    close = np.asarray(close, dtype=float).tolist()
+    rsi = np.asarray(rsi, dtype=float).tolist()
+    total_scores = np.asarray(total_scores, dtype=float).tolist()
+    tradable = np.asarray(tradable, dtype=bool).tolist()
+
+    capital = initial_capital
+    position = 0
+    in_position = False
+    buy_price = 0
+    events = []
+
+    # دوایین مۆم هەرگیز وەک خاڵی بڕیار بەکارنایەت، هەروەک لە ڕێگای ئاسایی
+    for j in range(start, len(close) - 1):
+        current_price = close[j]
+
+        # --- لۆجیکی ڕاگرتنی زیان (Stop-Loss) ---
+        if in_position and current_price <= (buy_price * (1 - stop_loss_percent)):
+            amount_to_sell = position
+            sell_value = amount_to_sell * current_price
+            fee = sell_value * trading_fee
+            capital += sell_value - fee
+            position = 0
+            in_position = False
+            events.append((j, 'STOP-LOSS', current_price, amount_to_sell))
+            continue
+
+        if not tradable[j]:
+            continue
+
+        if total_scores[j] >= buy_threshold and not in_position:
+            trade_amount = capital * trade_amount_percent
+            if trade_amount > 10:
+                fee = trade_amount * trading_fee
+                position_to_buy = (trade_amount - fee) / current_price
+                position += position_to_buy
+                capital -= trade_amount
+                in_position = True
+                buy_price = current_price
+                events.append((j, 'BUY', current_price, position_to_buy))
+
+        elif in_position and rsi[j] > sell_rsi:
+            amount_to_sell = position
+            sell_value = amount_to_sell * current_price
+            fee = sell_value * trading_fee
+            capital += sell_value - fee
+            position = 0
+            in_position = False
+            events.append((j, 'SELL', current_price, amount_to_sell))
+
+    return capital, position, events
+
 
 class Backtester:
-    def __init__(self, config):
+    def __init__(self, config, scanner=None):
+        """
+        :param scanner: CryptoScannerێکی ئامادە (بۆ نموونە هی کاشی داشبۆرد) بۆ بەکارهێنانەوەی
+                        پەیوەندیی ئیکسچەینج؛ ئەگەر نەدرێت، دانەیەکی نوێ دروست دەکرێت.
+        """
         self.config = config
         self.initial_capital = config.getfloat('BACKTEST_SETTINGS', 'INITIAL_CAPITAL')
         self.trade_amount_percent = config.getfloat('BACKTEST_SETTINGS', 'TRADE_AMOUNT_PERCENT')
@@ -19,10 +116,21 @@ class Backtester:
         self.timeframe = config.get('SCAN_SETTINGS', 'TIMEFRAME')
         self.symbols = [s.strip() for s in config.get('SCAN_SETTINGS', 'SYMBOLS').split(',')]
         
-        self.scanner = CryptoScanner(self.exchange_id, self.timeframe)
-        self.scorer = self.scanner.scorer
+        if scanner is None:
+            self.scanner = CryptoScanner(self.exchange_id, self.timeframe)
+            self.scorer = self.scanner.scorer
+        else:
+            # scorerی جیا بۆ ئەوەی گۆڕینی کێشەکان کار لە سکانەری هاوبەش نەکات
+            self.scanner = scanner
+            self.scorer = QuantitativeScorer(weights=dict(scanner.scorer.WEIGHTS))
         self.trading_fee = config.getfloat('BACKTEST_SETTINGS', 'TRADING_FEE_PERCENT')
         self.stop_loss_percent = config.getfloat('BACKTEST_SETTINGS', 'STOP_LOSS_PERCENT')
+        # ئیندیکەیتەرەکان یەکجار بۆ هەموو مێژووەکە حیساب دەکرێن لە جیاتی هەر مۆمێک
+        self.vectorized = config.getboolean('BACKTEST_SETTINGS', 'VECTORIZED', fallback=True)
+        # ژمارەی پەڕە هاوکاتەکان لە کاتی هێنانی مێژووی درێژ
+        self.backfill_parallel = config.getint('BACKTEST_SETTINGS', 'BACKFILL_PARALLEL', fallback=4)
+        # ئەنجامەکان بەپێی hashی داتا و ڕێکخستن لە SQLite هەڵدەگیرێن و دووبارە حیساب ناکرێنەوە
+        self.results_store = get_results_store()
 
 
 
@@ -33,30 +141,145 @@ class Backtester:
         :param ui_logger: ئۆبجێکتێکی Streamlit بۆ پیشاندانی لۆگ.
         :return: Tuple(historical_data, trades, final_results)
         """
-        log_messages = [] # بۆ کۆکردنەوەی هەموو پەیامەکان
-        
-        log_messages.append("===== 🚀 دەستپێکردنی تاقیکردنەوەی ستراتیژی (Backtesting) =====")
-        log_messages.append(f"سەرمایەی سەرەتایی: ${self.initial_capital:,.2f}")
-        log_messages.append(f"بەرواری دەستپێک: {self.start_date_str}")
+        # لۆگ بە سنووردار و بە نوێکردنەوەی سنووردار لە داشبۆرد
+        with LogSink('backtest', ui_logger) as log:
+            return self._run(log)
+
+    def _run(self, log):
+        log.append("===== 🚀 دەستپێکردنی تاقیکردنەوەی ستراتیژی (Backtesting) =====")
+        log.append(f"سەرمایەی سەرەتایی: ${self.initial_capital:,.2f}")
+        log.append(f"بەرواری دەستپێک: {self.start_date_str}")
         
         symbol = self.symbols[0]
-        log_messages.append(f"تاقیکردنەوە لەسەر: {symbol}")
+        log.append(f"تاقیکردنەوە لەسەر: {symbol}")
 
-        historical_data = self.scanner.exchange_handler.fetch_ohlcv_data(symbol, self.timeframe, limit=1000)
+        historical_data = self._load_history(symbol)
         
         if historical_data is None or historical_data.empty:
-            log_messages.append("❌ نەتوانرا داتای مێژوویی بهێنرێت بۆ تاقیکردنەوە.")
-            if ui_logger:
-                ui_logger.text_area("لۆگی تاقیکردنەوە", "\n".join(log_messages), height=300)
+            log.append("❌ نەتوانرا داتای مێژوویی بهێنرێت بۆ تاقیکردنەوە.")
             return None, [], {}
 
         historical_data = historical_data[historical_data['timestamp'] >= self.start_date]
         if historical_data.empty:
-            log_messages.append(f"❌ هیچ داتایەک لەدوای بەرواری {self.start_date_str} بوونی نییە.")
-            if ui_logger:
-                ui_logger.text_area("لۆگی تاقیکردنەوە", "\n".join(log_messages), height=300)
+            log.append(f"❌ هیچ داتایەک لەدوای بەرواری {self.start_date_str} بوونی نییە.")
             return None, [], {}
 
+        cache_key = None
+        if self.results_store is not None:
+            settings = self._settings(symbol)
+            cache_key = backtest_cache_key(historical_data, settings)
+            cached = self._load_cached(cache_key)
+            if cached is not None:
+                trades, final_results = cached
+                log.append(f"♻️ هەمان تاقیکردنەوە (هەمان داتا و ڕێکخستن) پێشتر کراوە؛ ئەنجام لە کۆگا هێنرایەوە ({len(trades)} مامەڵە).")
+                self._report(log, final_results)
+                return historical_data, trades, final_results
+
+        if self.vectorized:
+            capital, position, trades = self._simulate_vectorized(historical_data, symbol, log)
+        else:
+            capital, position, trades = self._simulate_per_bar(historical_data, symbol, log)
+
+        # ئەنجامی کۆتایی
+        final_portfolio_value = capital + (position * historical_data.iloc[-1]['close'])
+        profit_loss = final_portfolio_value - self.initial_capital
+        profit_loss_percent = (profit_loss / self.initial_capital) * 100
+
+        buy_and_hold_value = (self.initial_capital / historical_data.iloc[0]['close']) * historical_data.iloc[-1]['close']
+        buy_and_hold_profit_percent = ((buy_and_hold_value - self.initial_capital) / self.initial_capital) * 100
+
+        final_results = {
+            'final_portfolio_value': final_portfolio_value,
+            'profit_loss': profit_loss,
+            'profit_loss_percent': profit_loss_percent,
+            'buy_and_hold_profit_percent': buy_and_hold_profit_percent,
+            'total_trades': len(trades)
+        }
+
+        if cache_key is not None:
+            try:
+                self.results_store.save_backtest(cache_key, symbol, self.timeframe, settings, len(historical_data),
+                                                 trades, final_results)
+            except sqlite3.Error as e:
+                print(f"⚠️ هەڵە لە هەڵگرتنی ئەنجامی تاقیکردنەوە: {e}")
+
+        self._report(log, final_results)
+        return historical_data, trades, final_results
+
+    def _report(self, log, final_results):
+        log.append("\n===== 📊 ئەنجامی کۆتایی تاقیکردنەوە =====")
+        log.append(f"سەرمایەی کۆتایی: ${final_results['final_portfolio_value']:,.2f}")
+        log.append(f"ڕێژەی قازانج/زیانی ستراتیژی: {final_results['profit_loss_percent']:.2f}%")
+        log.append(f"ڕێژەی قازانجی 'کڕین و هێشتنەوە': {final_results['buy_and_hold_profit_percent']:.2f}%")
+
+    def _settings(self, symbol):
+        """هەموو ئەو ڕێکخستنانەی کاریگەرییان لەسەر ئەنجامی تاقیکردنەوە هەیە (بەشێکی کلیلی memoization)."""
+        return {
+            'strategy_version': STRATEGY_VERSION,
+            'symbol': symbol,
+            'timeframe': self.timeframe,
+            'start_date': self.start_date_str,
+            'initial_capital': self.initial_capital,
+            'trade_amount_percent': self.trade_amount_percent,
+            'trading_fee': self.trading_fee,
+            'stop_loss_percent': self.stop_loss_percent,
+            'vectorized': self.vectorized,
+            'weights': dict(self.scorer.WEIGHTS),
+        }
+
+    def _load_cached(self, cache_key):
+        try:
+            return self.results_store.load_backtest(cache_key)
+        except sqlite3.Error as e:
+            print(f"⚠️ هەڵە لە خوێندنەوەی کۆگای ئەنجامەکان: {e}")
+            return None
+
+    def _load_history(self, symbol):
+        """
+        هەموو مێژووی دراوێک لە START_DATEەوە تا ئێستا پەڕە بە پەڕە دەهێنێت،
+        بۆیە مێژووی درێژتر لە 1000 مۆم ئیتر کورت ناکرێتەوە.
+        """
+        return self.scanner.exchange_handler.fetch_history(
+            symbol, self.timeframe, self.start_date, max_parallel=self.backfill_parallel
+        )
+
+    def _simulate_vectorized(self, historical_data, symbol, log):
+        """
+        ئیندیکەیتەرەکان و خاڵی تەکنیکی یەکجار بۆ هەموو مێژووەکە حیساب دەکات،
+        پاشان ماشینی دۆخی مامەڵەکان لەسەر NumPy array جێبەجێ دەکات.
+        """
+        arrays = precompute_indicators(historical_data, self.scorer)
+
+        capital, position, events = simulate_trades(
+            arrays['close'],
+            arrays['rsi'],
+            arrays['total'],
+            arrays['tradable'],
+            self.initial_capital,
+            self.trade_amount_percent,
+            self.trading_fee,
+            self.stop_loss_percent,
+        )
+
+        timestamps = historical_data['timestamp'].tolist()
+        base_currency = symbol.split('/')[0]
+        trades = []
+        for j, trade_type, price, amount in events:
+            trades.append({'date': timestamps[j], 'type': trade_type, 'price': price, 'amount': amount})
+            log.append(self._format_trade_log(trade_type, amount, base_currency, price))
+        return capital, position, trades
+
+    def _format_trade_log(self, trade_type, amount, base_currency, price):
+        if trade_type == 'BUY':
+            return f"🟢 BUY: کڕینی {amount:.4f} {base_currency} لە نرخی ${price:.2f}"
+        if trade_type == 'SELL':
+            return f"🔴 SELL: فرۆشتنی {amount:.4f} {base_currency} لە نرخی ${price:.2f}"
+        return f"⛔️ STOP-LOSS: فرۆشتنی {amount:.4f} {base_currency} لە نرخی ${price:.2f}"
+
+    def _simulate_per_bar(self, historical_data, symbol, log):
+        """
+        ڕێگای کۆن: analyze_data بۆ هەر مۆمێک لەسەر هەموو مێژووی پێشوو جێبەجێ دەکات.
+        """
         capital = self.initial_capital
         position = 0
         in_position = False
@@ -77,14 +300,14 @@ class Backtester:
                 position = 0
                 in_position = False
                 trades.append({'date': current_df.iloc[-1]['timestamp'], 'type': 'STOP-LOSS', 'price': current_price, 'amount': amount_to_sell})
-                log_messages.append(f"⛔️ STOP-LOSS: فرۆشتنی {amount_to_sell:.4f} {symbol.split('/')[0]} لە نرخی ${current_price:.2f}")
+                log.append(f"⛔️ STOP-LOSS: فرۆشتنی {amount_to_sell:.4f} {symbol.split('/')[0]} لە نرخی ${current_price:.2f}")
                 continue
 
             analyzed_df = analyze_data(current_df.copy())
             if analyzed_df is None or analyzed_df.empty:
                 continue
 
-            scores = self.scorer.calculate_scores(analyzed_df, 0.5, {'market_cap_rank': 50, 'developer_score': 60}, 0.7)
+            scores = self.scorer.calculate_scores(analyzed_df, BACKTEST_SENTIMENT, BACKTEST_FUNDAMENTALS, BACKTEST_CORRELATION)
             signal = self.scorer.get_signal_strength(scores['total'])
             
             if "Buy" in signal and not in_position:
@@ -97,7 +320,7 @@ class Backtester:
                     in_position = True
                     buy_price = current_price
                     trades.append({'date': current_df.iloc[-1]['timestamp'], 'type': 'BUY', 'price': current_price, 'amount': position_to_buy})
-                    log_messages.append(f"🟢 BUY: کڕینی {position_to_buy:.4f} {symbol.split('/')[0]} لە نرخی ${current_price:.2f}")
+                    log.append(f"🟢 BUY: کڕینی {position_to_buy:.4f} {symbol.split('/')[0]} لە نرخی ${current_price:.2f}")
 
             elif in_position and analyzed_df.iloc[-1]['RSI_14'] > 70:
                 amount_to_sell = position
@@ -107,33 +330,9 @@ class Backtester:
                 position = 0
                 in_position = False
                 trades.append({'date': current_df.iloc[-1]['timestamp'], 'type': 'SELL', 'price': current_price, 'amount': amount_to_sell})
-                log_messages.append(f"🔴 SELL: فرۆشتنی {amount_to_sell:.4f} {symbol.split('/')[0]} لە نرخی ${current_price:.2f}")
-        
-            if ui_logger:
-                ui_logger.text_area("لۆگی تاقیکردنەوە", "\n".join(log_messages), height=300, key=f"log_{i}")
-
-        # ئەنجامی کۆتایی
-        final_portfolio_value = capital + (position * historical_data.iloc[-1]['close'])
-        profit_loss = final_portfolio_value - self.initial_capital
-        profit_loss_percent = (profit_loss / self.initial_capital) * 100
-
-        buy_and_hold_value = (self.initial_capital / historical_data.iloc[0]['close']) * historical_data.iloc[-1]['close']
-        buy_and_hold_profit_percent = ((buy_and_hold_value - self.initial_capital) / self.initial_capital) * 100
-
-        final_results = {
-            'final_portfolio_value': final_portfolio_value,
-            'profit_loss': profit_loss,
-            'profit_loss_percent': profit_loss_percent,
-            'buy_and_hold_profit_percent': buy_and_hold_profit_percent,
-            'total_trades': len(trades)
-        }
-
-        log_messages.append("\n===== 📊 ئەنجامی کۆتایی تاقیکردنەوە =====")
-        log_messages.append(f"سەرمایەی کۆتایی: ${final_portfolio_value:,.2f}")
-        log_messages.append(f"ڕێژەی قازانج/زیانی ستراتیژی: {profit_loss_percent:.2f}%")
-        log_messages.append(f"ڕێژەی قازانجی 'کڕین و هێشتنەوە': {buy_and_hold_profit_percent:.2f}%")
+                log.append(f"🔴 SELL: فرۆشتنی {amount_to_sell:.4f} {symbol.split('/')[0]} لە نرخی ${current_price:.2f}")
 
-        if ui_logger:
-            ui_logger.text_area("لۆگی تاقیکردنەوە", "\n".join(log_messages), height=300)
+            # داشبۆرد تەنها لە هەر flush_interval جارێک نوێ دەکرێتەوە، نەک بۆ هەر مۆمێک
+            log.flush()
 
-        return historical_data, trades, final_results
\ No newline at end of file
+        return capital, position, trades
@@ -0,0 +1,257 @@
+# core/daemon.py
+import asyncio
+import os
+import time
+
+import numpy as np
+
+from .scanner import CryptoScanner
+from .universe import UniverseSelector, universe_enabled
+from data_fetcher.candle_series import CandleSeries
+from utils.notifier import TelegramNotifier
+
+
+class ScanDaemon:
+    """
+    سکانی بەردەوام: لە کۆتایی هەر مۆمێکی TIMEFRAME دا بەئاگا دێت و تەنها ئەو دراوانە سکان دەکات
+    کە مۆمی نوێیان هەیە. سکانەر، پەیوەندییە async ـەکان و دۆخی ئیندیکەیتەرەکان لە نێوان خولەکاندا
+    دەمێننەوە، بۆیە هەر خولێک تێچووی دەستپێکردنی پرۆسەیەکی نوێ ناکات.
+    """
+
+    def __init__(self, config, scanner=None, notifier=None):
+        self.exchange_id = config.get('SCAN_SETTINGS', 'EXCHANGE_ID')
+        self.timeframe = config.get('SCAN_SETTINGS', 'TIMEFRAME')
+        # لە مۆدی universe دا SYMBOLS پێویست نییە (بڕوانە core/universe.py)
+        self.symbols = [s.strip() for s in config.get('SCAN_SETTINGS', 'SYMBOLS', fallback='').split(',') if s.strip()]
+        self.concurrency = config.getint('SCAN_SETTINGS', 'MAX_CONCURRENCY', fallback=8)
+        # چەند چرکە دوای داخستنی مۆم چاوەڕێ دەکرێت بۆ ئەوەی ئیکسچەینج مۆمەکەی تەواو کردبێت
+        self.grace_seconds = config.getfloat('DAEMON', 'GRACE_SECONDS', fallback=5)
+        self.candle_dtype = np.dtype(config.get('DAEMON', 'CANDLE_DTYPE', fallback='float64'))
+        cache_dir = config.get('DATA_STORE', 'CACHE_DIR', fallback='cache')
+        state_path = config.get('DAEMON', 'INDICATOR_STATE_PATH', fallback=os.path.join(cache_dir, 'indicator_state.json'))
+
+        self.scanner = scanner or CryptoScanner(
+            self.exchange_id, self.timeframe, incremental_indicators=True, indicator_state_path=state_path
+        )
+        # مۆمەکانی هەر دراوێک لە بیرگەدا دەمێننەوە؛ float32 بیرگە نیوە دەکاتەوە بەڵام وردی نرخ کەمتر دەبێت.
+        # بە شێوەی بنەڕەت هەمان ژمارەی سکانەر، بۆ ئەوەی مۆمی ڕۆژانەی پەیوەندی لێیەوە resample بکرێت
+        self.history = config.getint('DAEMON', 'CANDLE_HISTORY', fallback=self.scanner.history_limit)
+        self.notifier = notifier or TelegramNotifier()
+        self.interval = self.scanner.exchange_handler._timeframe_ms(self.timeframe) / 1000
+        # مۆدی universe: لیستی دراوەکان لە سەرەتای هەر خولێکدا بە یەک fetch_tickers نوێ دەکرێتەوە
+        self.universe = UniverseSelector(self.scanner.exchange_handler, config) if universe_enabled(config) else None
+        # مۆدی stream (run_streaming): URL بۆ گۆڕینی ناونیشانی websocket (بۆ نموونە سێرڤەری تاقیکردنەوە)
+        self.stream_url = config.get('STREAM', 'URL', fallback='') or None
+        # هەموو دراوەکان لە هەمان چرکەدا دادەخرێن؛ ئەم ماوەیە چاوەڕێ دەکرێت بۆ ئەوەی پێکەوە سکان بکرێن
+        self.stream_debounce = config.getfloat('STREAM', 'DEBOUNCE_SECONDS', fallback=0.5)
+        # ماوەی نوێکردنەوەی universe لە مۆدی stream (بە شێوەی بنەڕەت یەک مۆم، وەک daemonی poll)
+        self.universe_refresh = config.getfloat('STREAM', 'UNIVERSE_REFRESH_SECONDS', fallback=self.interval)
+        self.stream = None
+
+        # یەک event loop بۆ هەموو ژیانی daemon، بۆ ئەوەی کلاینتی async ی ccxt گەرم بمێنێتەوە
+        self.loop = asyncio.new_event_loop()
+        # لە replay دا کات لە tape وەردەگیرێت (REPLAY_SPEED)، بۆیە چاوەڕێی کاتژمێری ڕاستەقینە ناکرێت
+        self.replaying = self.scanner.exchange_handler.mode == 'replay'
+        self.series = {}        # symbol -> CandleSeries
+        self.last_candle = {}   # symbol -> timestampی نوێترین مۆمی سکانکراو (میلی چرکە)
+        self.cycles = 0
+
+    def run(self, max_cycles=None):
+        """
+        خولەکان جێبەجێ دەکات تا Ctrl+C (یان max_cycles). یەکەم خول دەستبەجێ دەکرێت.
+        """
+        print(f"🛰️ daemon دەستیپێکرد | {len(self.symbols)} دراو | تایمفرەیم: {self.timeframe}")
+        try:
+            while max_cycles is None or self.cycles < max_cycles:
+                if self.cycles:
+                    self._sleep_until_next_close()
+                try:
+                    self.run_cycle()
+                except Exception as e:
+                    # خولێکی شکستخواردوو daemon ناوەستێنێت؛ خولی داهاتوو لە کاتی خۆیدا دەکرێت
+                    print(f"❌ هەڵە لە خولی {self.cycles} ی daemon: {e}")
+                if self.replaying and not self.scanner.exchange_handler.tape.remaining():
+                    print("⏹️ هەموو داواکارییە تۆمارکراوەکان replay کران؛ daemon وەستێنرا.")
+                    break
+        except KeyboardInterrupt:
+            print("\n🛑 daemon وەستێنرا.")
+        finally:
+            self.close()
+
+    def run_cycle(self):
+        """
+        یەک خول: مۆمەکان دەهێنێت، دراوە گۆڕاوەکان سکان دەکات و سیگناڵەکان دەنێرێت.
+        :return: لیستی سیگناڵەکانی ئەم خولە.
+        """
+        started = time.monotonic()
+        self.cycles += 1
+        if self.universe is not None:
+            self._refresh_universe()
+
+        self.loop.run_until_complete(self._update_series())
+        # DataFrame تەنها بۆ دراوە گۆڕاوەکان و بەبێ کۆپی دروست دەکرێت؛ لە ماوەی ئەم خولەدا بەکاردێت
+        changed = {
+            symbol: series.to_frame()
+            for symbol, series in self.series.items()
+            if len(series) and series.last_timestamp != self.last_candle.get(symbol)
+        }
+
+        signals = self.loop.run_until_complete(self._scan_frames(changed)) if changed else []
+
+        duration = time.monotonic() - started
+        print(f"⏱️ خولی {self.cycles}: {len(changed)}/{len(self.symbols)} دراو سکان کران، "
+              f"{len(signals)} سیگناڵ | ماوە: {duration:.1f} چرکە")
+        if duration > self.interval:
+            print(f"⚠️ خولی {self.cycles} لە ماوەی تایمفرەیم ({self.interval:.0f} چرکە) درێژتر بوو؛ "
+                  f"مۆمی داهاتوو لەوانەیە دوابکەوێت.")
+        return signals
+
+    async def _scan_frames(self, frames):
+        """دراوەکانی frames سکان دەکات و سیگناڵەکان دەنێرێت. :return: لیستی سیگناڵەکان."""
+        candles = {symbol: int(df['timestamp'].iloc[-1].value // 1_000_000) for symbol, df in frames.items()}
+        signals = await self.scanner.scan_symbols_async(
+            list(frames), concurrency=self.concurrency, ohlcv_frames=frames, close_exchange=False
+        )
+        self.last_candle.update(candles)
+        # ناردن لە threadی notifier دەکرێت؛ خولەکە چاوەڕێی تێلیگرام ناکات
+        for signal in sorted(signals, key=lambda x: x['total_score'], reverse=True):
+            self.notifier.send_message(self._format_signal(signal),
+                                       dedupe_key=f"{signal['symbol']}|{signal['strength']}|{candles[signal['symbol']]}")
+        return signals
+
+    def run_streaming(self, max_batches=None):
+        """
+        مۆمەکان بە websocket وەردەگرێت (data_fetcher/kline_stream.py) و هەر کاتێک مۆمێک داخرا
+        دراوەکەی دەستبەجێ سکان دەکات، بەبێ چاوەڕێی خولی poll. ئەگەر stream بۆ ئیکسچەینجەکە
+        پشتگیری نەکرابێت، run() بەکاردێت.
+
+        :param max_batches: دوای ئەم ژمارە سکانە دەوەستێت (بۆ تاقیکردنەوە).
+        """
+        from data_fetcher.kline_stream import stream_supported
+
+        if not (self.stream_url or stream_supported(self.exchange_id)):
+            print(f"⚠️ stream بۆ {self.exchange_id} پشتگیری ناکرێت؛ daemon ی poll بەکاردێت.")
+            return self.run(max_batches)
+        if self.universe is not None:
+            self._refresh_universe()
+        print(f"🛰️ daemon (stream) دەستیپێکرد | {len(self.symbols)} دراو | تایمفرەیم: {self.timeframe}")
+        try:
+            self.loop.run_until_complete(self._run_stream(max_batches))
+        except KeyboardInterrupt:
+            print("\n🛑 daemon وەستێنرا.")
+        finally:
+            if self.stream is not None:
+                print(f"📊 stream: {self.stream.stats}")
+            self.close()
+
+    async def _run_stream(self, max_batches=None):
+        from data_fetcher.kline_stream import KlineStream
+
+        closed, ready = set(), asyncio.Event()
+
+        def on_close(symbol, series):
+            closed.add(symbol)
+            ready.set()
+
+        def start_stream():
+            self.stream = KlineStream(self.scanner.exchange_handler, self.symbols, self.timeframe, on_close=on_close,
+                                      series=self.series, url=self.stream_url, capacity=self.history,
+                                      dtype=self.candle_dtype, concurrency=self.concurrency)
+            return asyncio.create_task(self.stream.run())
+
+        async def stop_stream(task):
+            await self.stream.stop()
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+        stream_task = start_stream()
+        universe_checked = time.monotonic()
+        try:
+            while max_batches is None or self.cycles < max_batches:
+                ready_task = asyncio.ensure_future(ready.wait())
+                await asyncio.wait({stream_task, ready_task}, return_when=asyncio.FIRST_COMPLETED)
+                if stream_task.done():
+                    ready_task.cancel()
+                    stream_task.result()
+                    break
+                await asyncio.sleep(self.stream_debounce)
+                ready.clear()
+                symbols = [symbol for symbol in self.symbols if symbol in closed]
+                closed.clear()
+
+                started = time.monotonic()
+                self.cycles += 1
+                # تەنها مۆمە داخراوەکان؛ copy=True چونکە stream لە کاتی سکاندا بافەرەکان نوێ دەکاتەوە
+                frames = {symbol: self.series[symbol].to_frame(copy=True, until=self.stream.last_closed[symbol])
+                          for symbol in symbols}
+                try:
+                    signals = await self._scan_frames(frames)
+                except Exception as e:
+                    # سکانێکی شکستخواردوو stream ناوەستێنێت؛ مۆمی داهاتوو دووبارە هەوڵ دەدرێت
+                    print(f"❌ هەڵە لە سکانی مۆمی داخراو ({self.cycles}): {e}")
+                    continue
+                print(f"⚡ مۆم داخرا ({self.cycles}): {len(symbols)}/{len(self.symbols)} دراو سکان کران، "
+                      f"{len(signals)} سیگناڵ | ماوە: {time.monotonic() - started:.2f} چرکە")
+
+                # وەک daemonی poll، universe جارێک بۆ هەر مۆمێک نوێ دەکرێتەوە؛ ئەگەر گۆڕا stream دووبارە دەبەسترێتەوە
+                if self.universe is not None and time.monotonic() - universe_checked >= self.universe_refresh:
+                    universe_checked = time.monotonic()
+                    selected = await asyncio.to_thread(self.universe.select)
+                    if selected and set(selected) != set(self.symbols):
+                        await stop_stream(stream_task)
+                        self._apply_universe(selected)
+                        print(f"🔄 universe گۆڕا؛ stream بۆ {len(self.symbols)} دراو دووبارە دەبەسترێتەوە.")
+                        stream_task = start_stream()
+        finally:
+            await stop_stream(stream_task)
+
+    def _refresh_universe(self):
+        self._apply_universe(self.universe.select())
+
+    def _apply_universe(self, symbols):
+        if not symbols:
+            print("⚠️ هەڵبژاردنی universe سەرکەوتوو نەبوو؛ لیستی پێشوو بەکاردێت.")
+            return
+        self.symbols = symbols
+        # مۆمی ئەو دراوانەی لە universe دەرچوون لە بیرگەدا ناهێڵرێنەوە
+        for symbol in set(self.series) - set(symbols):
+            del self.series[symbol]
+
+    async def _update_series(self):
+        """مۆمە نوێیەکانی هەموو دراوەکان دەهێنێت و دەیانخاتە سەر CandleSeries ـی هەر دراوێک."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def update(symbol):
+            series = self.series.get(symbol)
+            if series is None:
+                series = self.series[symbol] = CandleSeries(self.history, dtype=self.candle_dtype)
+            async with semaphore:
+                return await self.scanner.exchange_handler.update_series_async(symbol, self.timeframe, series)
+
+        await asyncio.gather(*(update(symbol) for symbol in self.symbols))
+
+    def _sleep_until_next_close(self):
+        if self.replaying:
+            return
+        interval_ms = self.interval * 1000
+        now_ms = time.time() * 1000
+        next_close = (now_ms // interval_ms + 1) * interval_ms
+        delay = (next_close - now_ms) / 1000 + self.grace_seconds
+        print(f"💤 چاوەڕێی داخستنی مۆمی داهاتوو ({delay:.0f} چرکە)...")
+        time.sleep(delay)
+
+    def _format_signal(self, signal):
+        scores = signal['scores']
+        return (f"💎 *{signal['symbol']}* ({self.timeframe})\n"
+                f"🎯 {signal['strength']}\n"
+                f"💯 کۆی خاڵ: {signal['total_score']:.2f} / 100\n"
+                f"تەکنیکی: {scores['technical']:.0f} | هەست و سۆز: {scores['sentiment']:.0f} | "
+                f"بنەڕەتی: {scores['fundamental']:.0f} | پەیوەندی: {scores['correlation']:.0f}")
+
+    def close(self):
+        try:
+            self.loop.run_until_complete(self.scanner.exchange_handler.close_async())
+        finally:
+            self.scanner.exchange_handler.close()
+            self.loop.close()
+            self.notifier.close()
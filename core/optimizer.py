@@ -0,0 +1,146 @@
+# core/optimizer.py
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from analysis.quantitative_scorer import QuantitativeScorer
+from .backtester import (Backtester, simulate_trades, precompute_indicators,
+                         BACKTEST_SENTIMENT, BACKTEST_FUNDAMENTALS, BACKTEST_CORRELATION)
+
+WEIGHT_KEYS = ['technical', 'sentiment', 'fundamental', 'correlation']
+TRADING_KEYS = ['stop_loss_percent', 'trading_fee', 'trade_amount_percent', 'buy_threshold', 'sell_rsi']
+
+# داتای ئامادەکراو بۆ هەر worker processێک تەنها یەکجار (لە initializer) دەنێردرێت
+_worker_datasets = None
+
+
+def parse_grid_values(text):
+    """
+    بەهاکانی گرید دەخوێنێتەوە: یان لیستێک بە کۆما ("0.3, 0.4, 0.5")
+    یان مەودایەک بە شێوەی "start:stop:step" (stop لەناویدایە).
+    """
+    text = str(text).strip()
+    if ':' in text:
+        start, stop, step = (float(part) for part in text.split(':'))
+        count = int(round((stop - start) / step)) + 1
+        return [round(start + i * step, 10) for i in range(count)]
+    return [float(value) for value in text.split(',') if value.strip()]
+
+
+def grid_from_config(config, section='SWEEP'):
+    """
+    گرید لە بەشی [SWEEP] ی config دەخوێنێتەوە. هەر پارامێتەرێک کە دیاری نەکرابێت
+    بەهای ئێستای config ی وەردەگرێت.
+    """
+    defaults = {
+        'technical': config.getfloat('SCORING_WEIGHTS', 'technical', fallback=0.40),
+        'sentiment': config.getfloat('SCORING_WEIGHTS', 'sentiment', fallback=0.20),
+        'fundamental': config.getfloat('SCORING_WEIGHTS', 'fundamental', fallback=0.25),
+        'correlation': config.getfloat('SCORING_WEIGHTS', 'correlation', fallback=0.15),
+        'stop_loss_percent': config.getfloat('BACKTEST_SETTINGS', 'STOP_LOSS_PERCENT'),
+        'trading_fee': config.getfloat('BACKTEST_SETTINGS', 'TRADING_FEE_PERCENT'),
+        'trade_amount_percent': config.getfloat('BACKTEST_SETTINGS', 'TRADE_AMOUNT_PERCENT'),
+        'buy_threshold': 60.0,
+        'sell_rsi': 70.0,
+    }
+    grid = {}
+    for key, default in defaults.items():
+        value = config.get(section, key, fallback=None) if config.has_section(section) else None
+        grid[key] = parse_grid_values(value) if value else [default]
+    return grid
+
+
+def expand_grid(grid):
+    """هەموو تێکەڵەکانی گرید وەک لیستی dict دەگەڕێنێتەوە."""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[key] for key in keys))]
+
+
+def _init_worker(datasets):
+    global _worker_datasets
+    _worker_datasets = datasets
+
+
+def evaluate_params(params, datasets=None, initial_capital=None):
+    """
+    یەک تێکەڵەی پارامێتەر لەسەر هەموو دراوەکان تاقیدەکاتەوە بە بەکارهێنانی ئیندیکەیتەرە ئامادەکراوەکان.
+    :return: dictی پارامێتەرەکان لەگەڵ ئەنجامەکان.
+    """
+    datasets = datasets if datasets is not None else _worker_datasets
+    scorer = QuantitativeScorer(weights={key: params[key] for key in WEIGHT_KEYS})
+
+    profits, trade_counts = [], 0
+    for arrays in datasets['symbols'].values():
+        total_scores = scorer.calculate_total_scores(
+            arrays['technical'], BACKTEST_SENTIMENT, BACKTEST_FUNDAMENTALS, BACKTEST_CORRELATION
+        )
+        capital, position, events = simulate_trades(
+            arrays['close'], arrays['rsi'], total_scores, arrays['tradable'],
+            datasets['initial_capital'], params['trade_amount_percent'], params['trading_fee'],
+            params['stop_loss_percent'], buy_threshold=params['buy_threshold'], sell_rsi=params['sell_rsi'],
+        )
+        final_value = capital + position * arrays['close'][-1]
+        profits.append((final_value - datasets['initial_capital']) / datasets['initial_capital'] * 100)
+        trade_counts += len(events)
+
+    return dict(params,
+                profit_loss_percent=float(np.mean(profits)) if profits else 0.0,
+                worst_profit_loss_percent=float(np.min(profits)) if profits else 0.0,
+                total_trades=trade_counts)
+
+
+class ParameterSweep:
+    """
+    چەندین تێکەڵەی کێش و ڕێکخستنی مامەڵە لەسەر هەمان داتا تاقیدەکاتەوە.
+    داتا و ئیندیکەیتەرەکان بۆ هەر دراوێک تەنها یەکجار ئامادە دەکرێن و بە هەموو workerەکان دەدرێن.
+    """
+
+    def __init__(self, config, backtester=None):
+        self.config = config
+        self.backtester = backtester or Backtester(config)
+        self.max_workers = config.getint('SWEEP', 'MAX_WORKERS', fallback=os.cpu_count() or 1) \
+            if config.has_section('SWEEP') else (os.cpu_count() or 1)
+
+    def load_datasets(self, symbols=None, ui_logger=None):
+        """
+        مێژووی هەر دراوێک دەهێنێت و ئیندیکەیتەرەکانی یەکجار حیساب دەکات.
+        :param symbols: بە شێوەی بنەڕەت هەموو SYMBOLS ی [SCAN_SETTINGS] (وەک Backtester).
+        """
+        datasets = {}
+        for symbol in symbols or self.backtester.symbols:
+            historical_data = self.backtester._load_history(symbol)
+            if historical_data is None or historical_data.empty:
+                print(f"⚠️ داتای مێژوویی بۆ {symbol} نییە، لە sweep لادەبرێت.")
+                continue
+            historical_data = historical_data[historical_data['timestamp'] >= self.backtester.start_date]
+            datasets[symbol] = precompute_indicators(historical_data, self.backtester.scorer)
+            if ui_logger:
+                ui_logger.text(f"✅ ئیندیکەیتەرەکانی {symbol} ئامادەن ({len(historical_data)} مۆم)")
+        return {'initial_capital': self.backtester.initial_capital, 'symbols': datasets}
+
+    def run(self, grid, symbols=None, max_workers=None, ui_logger=None):
+        """
+        هەموو تێکەڵەکانی گرید تاقیدەکاتەوە و خشتەیەکی ڕیزبەندکراو بەپێی قازانج دەگەڕێنێتەوە.
+
+        :param grid: dictی {پارامێتەر: لیستی بەها}، بۆ نموونە لە grid_from_config.
+        """
+        datasets = self.load_datasets(symbols, ui_logger)
+        if not datasets['symbols']:
+            return pd.DataFrame()
+
+        combinations = expand_grid(grid)
+        max_workers = max_workers or self.max_workers
+        print(f"🔁 تاقیکردنەوەی {len(combinations)} تێکەڵە لەسەر {len(datasets['symbols'])} دراو بە {max_workers} worker...")
+
+        if max_workers <= 1 or len(combinations) < 2:
+            results = [evaluate_params(params, datasets) for params in combinations]
+        else:
+            chunksize = max(1, len(combinations) // (max_workers * 4))
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(datasets,)) as executor:
+                results = list(executor.map(evaluate_params, combinations, chunksize=chunksize))
+
+        table = pd.DataFrame(results)
+        return table.sort_values(['profit_loss_percent', 'worst_profit_loss_percent'], ascending=False, ignore_index=True)
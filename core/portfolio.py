@@ -0,0 +1,206 @@
+# core/portfolio.py
+import heapq
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from analysis.quantitative_scorer import QuantitativeScorer
+from utils.log_sink import LogSink
+from .backtester import Backtester, precompute_indicators, WARMUP_BARS
+
+
+def generate_signals(task):
+    """
+    سیگناڵەکانی کڕین/فرۆشتنی یەک دراو حیساب دەکات (لە worker processدا جێبەجێ دەکرێت).
+
+    :param task: Tuple(symbol, historical_data, weights, buy_threshold, sell_rsi)
+    :return: dictی NumPy arrayەکان: timestamp (میلی چرکە)، close، buy، sell.
+    """
+    symbol, historical_data, weights, buy_threshold, sell_rsi = task
+    scorer = QuantitativeScorer(weights=weights)
+    arrays = precompute_indicators(historical_data, scorer)
+    total_scores = arrays['total']
+    timestamps = historical_data['timestamp'].dt.as_unit('ms').astype('int64').to_numpy()
+    return {
+        'symbol': symbol,
+        'timestamp': timestamps,
+        'close': arrays['close'],
+        'buy': arrays['tradable'] & (total_scores >= buy_threshold),
+        'sell': arrays['tradable'] & (arrays['rsi'] > sell_rsi),
+    }
+
+
+def _symbol_events(index, signals):
+    """ڕووداوەکانی یەک دراو بە ڕیزبەندی کات: (timestamp, symbol index, bar index)."""
+    timestamps = signals['timestamp'].tolist()
+    # هەروەک تاقیکردنەوەی تاک، دوایین مۆم وەک خاڵی بڕیار بەکارنایەت
+    for j in range(WARMUP_BARS, len(timestamps) - 1):
+        yield timestamps[j], index, j
+
+
+def simulate_portfolio(all_signals, initial_capital, trade_amount_percent, trading_fee, stop_loss_percent):
+    """
+    هەموو دراوەکان بە سەرمایەیەکی هاوبەش تاقیدەکاتەوە. ڕووداوەکانی هەموو دراوەکان بە ڕیزبەندی کات
+    تێکەڵ دەکرێن (heapq.merge) و هەر کڕینێک equity * trade_amount_percent / ژمارەی دراوەکان
+    بەکاردەهێنێت (بۆ یەک دراو هەمان ئەنجامی Backtester.run دەدات).
+
+    :return: dictی trades، cash، positions، realized و equity_curves.
+    """
+    symbols = [signals['symbol'] for signals in all_signals]
+    columns = [(s['close'].tolist(), s['buy'].tolist(), s['sell'].tolist(), s['timestamp'].tolist()) for s in all_signals]
+    symbol_count = len(all_signals)
+
+    cash = initial_capital
+    positions = [0.0] * symbol_count
+    buy_prices = [0.0] * symbol_count
+    realized = [0.0] * symbol_count # قازانج/زیانی داخراوی هەر دراوێک
+    last_prices = [None] * symbol_count
+    trades = []
+    curve_times, symbol_curves, portfolio_curve = [], [], []
+
+    def record(timestamp):
+        symbol_values = [realized[k] + positions[k] * (last_prices[k] or 0) for k in range(symbol_count)]
+        curve_times.append(timestamp)
+        symbol_curves.append(symbol_values)
+        portfolio_curve.append(cash + sum(positions[k] * (last_prices[k] or 0) for k in range(symbol_count)))
+
+    def sell(k, j, price, trade_type):
+        nonlocal cash
+        sell_value = positions[k] * price
+        fee = sell_value * trading_fee
+        cash += sell_value - fee
+        realized[k] += sell_value - fee
+        trades.append({'symbol': symbols[k], 'date': pd.to_datetime(columns[k][3][j], unit='ms', utc=True),
+                       'type': trade_type, 'price': price, 'amount': positions[k]})
+        positions[k] = 0.0
+
+    current_time = None
+    events = heapq.merge(*(_symbol_events(k, signals) for k, signals in enumerate(all_signals)))
+    for timestamp, k, j in events:
+        if current_time is not None and timestamp != current_time:
+            record(current_time)
+        current_time = timestamp
+
+        close, buy, sell_signal, _ = columns[k]
+        price = close[j]
+        last_prices[k] = price
+        in_position = positions[k] > 0
+
+        # --- لۆجیکی ڕاگرتنی زیان (Stop-Loss) ---
+        if in_position and price <= buy_prices[k] * (1 - stop_loss_percent):
+            sell(k, j, price, 'STOP-LOSS')
+            continue
+
+        if buy[j] and not in_position:
+            equity = cash + sum(positions[m] * (last_prices[m] or 0) for m in range(symbol_count))
+            trade_amount = min(cash, equity * trade_amount_percent / symbol_count)
+            if trade_amount > 10:
+                fee = trade_amount * trading_fee
+                amount = (trade_amount - fee) / price
+                positions[k] += amount
+                cash -= trade_amount
+                realized[k] -= trade_amount
+                buy_prices[k] = price
+                trades.append({'symbol': symbols[k], 'date': pd.to_datetime(columns[k][3][j], unit='ms', utc=True),
+                               'type': 'BUY', 'price': price, 'amount': amount})
+        elif in_position and sell_signal[j]:
+            sell(k, j, price, 'SELL')
+
+    if current_time is not None:
+        record(current_time)
+
+    index = pd.to_datetime(curve_times, unit='ms', utc=True)
+    equity_curves = pd.DataFrame(symbol_curves, index=index, columns=symbols)
+    equity_curves['portfolio'] = portfolio_curve
+    return {'trades': trades, 'cash': cash, 'positions': positions, 'realized': realized, 'equity_curves': equity_curves}
+
+
+def portfolio_results(all_signals, simulation, initial_capital):
+    """ئەنجامی کۆتایی بۆ هەموو پۆرتفۆلیۆکە و بۆ هەر دراوێک."""
+    trades = simulation['trades']
+    final_prices = [float(signals['close'][-1]) for signals in all_signals]
+    final_value = simulation['cash'] + sum(p * price for p, price in zip(simulation['positions'], final_prices))
+
+    per_symbol = {}
+    for k, signals in enumerate(all_signals):
+        symbol = signals['symbol']
+        per_symbol[symbol] = {
+            'total_trades': sum(1 for t in trades if t['symbol'] == symbol),
+            'profit_loss': simulation['realized'][k] + simulation['positions'][k] * final_prices[k],
+            'buy_and_hold_profit_percent': (final_prices[k] / float(signals['close'][0]) - 1) * 100,
+        }
+
+    profit_loss = final_value - initial_capital
+    return {
+        'final_portfolio_value': final_value,
+        'profit_loss': profit_loss,
+        'profit_loss_percent': profit_loss / initial_capital * 100,
+        'buy_and_hold_profit_percent': float(np.mean([s['buy_and_hold_profit_percent'] for s in per_symbol.values()])) if per_symbol else 0.0,
+        'total_trades': len(trades),
+        'per_symbol': per_symbol,
+    }
+
+
+class PortfolioBacktester(Backtester):
+    """
+    تاقیکردنەوەی ستراتیژی لەسەر هەموو دراوەکانی SYMBOLS بە سەرمایەیەکی هاوبەش.
+    سیگناڵی هەر دراوێک لە worker processی جیاواز حیساب دەکرێت، پاشان هەموویان
+    بە ڕیزبەندی کات تێکەڵ دەکرێن بۆ تاقیکردنەوەی پۆرتفۆلیۆ.
+    """
+
+    def __init__(self, config, scanner=None):
+        super().__init__(config, scanner)
+        self.max_workers = config.getint('BACKTEST_SETTINGS', 'PORTFOLIO_WORKERS', fallback=os.cpu_count() or 1)
+
+    def run(self, ui_logger=None):
+        """
+        :param ui_logger: ئۆبجێکتێکی Streamlit بۆ پیشاندانی لۆگ.
+        :return: Tuple(equity_curves, trades, final_results)
+        """
+        # بەبێ داشبۆرد، لۆگەکە وەک پێشوو لە terminal چاپ دەکرێت
+        with LogSink('portfolio', ui_logger, echo=ui_logger is None) as log:
+            return self._run_portfolio(log)
+
+    def _run_portfolio(self, log):
+        log.append("===== 🚀 دەستپێکردنی تاقیکردنەوەی پۆرتفۆلیۆ =====")
+        log.append(f"سەرمایەی سەرەتایی: ${self.initial_capital:,.2f}")
+        log.append(f"دراوەکان: {', '.join(self.symbols)}")
+
+        tasks = []
+        for symbol in self.symbols:
+            historical_data = self._load_history(symbol)
+            if historical_data is not None:
+                historical_data = historical_data[historical_data['timestamp'] >= self.start_date]
+            if historical_data is None or len(historical_data) <= WARMUP_BARS + 1:
+                log.append(f"⚠️ داتای پێویست بۆ {symbol} نییە، لە پۆرتفۆلیۆ لادەبرێت.")
+                continue
+            tasks.append((symbol, historical_data, self.scorer.WEIGHTS, 60, 70))
+
+        if not tasks:
+            log.append("❌ هیچ دراوێک داتای تەواوی نییە بۆ تاقیکردنەوە.")
+            return None, [], {}
+
+        # سیگناڵی هەر دراوێک بە هاوکاتی لە processی جیاواز
+        if self.max_workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=min(self.max_workers, len(tasks))) as executor:
+                all_signals = list(executor.map(generate_signals, tasks))
+        else:
+            all_signals = [generate_signals(task) for task in tasks]
+
+        simulation = simulate_portfolio(
+            all_signals, self.initial_capital, self.trade_amount_percent, self.trading_fee, self.stop_loss_percent
+        )
+        final_results = portfolio_results(all_signals, simulation, self.initial_capital)
+
+        for trade in simulation['trades']:
+            log.append(f"{trade['date']} | {trade['symbol']} | " +
+                                self._format_trade_log(trade['type'], trade['amount'], trade['symbol'].split('/')[0], trade['price']))
+        log.append("\n===== 📊 ئەنجامی کۆتایی پۆرتفۆلیۆ =====")
+        log.append(f"سەرمایەی کۆتایی: ${final_results['final_portfolio_value']:,.2f}")
+        log.append(f"ڕێژەی قازانج/زیانی پۆرتفۆلیۆ: {final_results['profit_loss_percent']:.2f}%")
+        for symbol, result in final_results['per_symbol'].items():
+            log.append(f"   - {symbol}: قازانج/زیان ${result['profit_loss']:,.2f} | مامەڵەکان: {result['total_trades']}")
+
+        return simulation['equity_curves'], simulation['trades'], final_results
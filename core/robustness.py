@@ -0,0 +1,311 @@
+# core/robustness.py
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from analysis.quantitative_scorer import QuantitativeScorer
+from .backtester import simulate_trades, WARMUP_BARS, BACKTEST_SENTIMENT, BACKTEST_FUNDAMENTALS, BACKTEST_CORRELATION
+from .optimizer import ParameterSweep, grid_from_config, expand_grid, WEIGHT_KEYS
+
+DRAWDOWN_PERCENTILES = (5, 25, 50, 75, 95)
+SECONDS_PER_YEAR = 365 * 24 * 3600
+# ژمارەی simulation لە هەر taskێکی Monte Carlo (بۆ سنوورداربوونی بیرگەی matrixی ڕێڕەوەکان)
+SIMULATIONS_PER_TASK = 500
+
+# داتای هاوبەش (ئیندیکەیتەرە ئامادەکراوەکان، تێکەڵەکانی گرید، نموونەکان) بۆ هەر worker processێک
+# تەنها یەکجار لە initializer دەنێردرێت، هەروەک core/optimizer.py
+_worker_state = None
+
+
+def _init_worker(state):
+    global _worker_state
+    _worker_state = state
+
+
+def _map(func, tasks, state, max_workers):
+    """tasks لەسەر process pool (یان لە هەمان process ئەگەر max_workers=1) جێبەجێ دەکات."""
+    if max_workers <= 1 or len(tasks) < 2:
+        _init_worker(state)
+        return [func(task) for task in tasks]
+    chunksize = max(1, len(tasks) // (max_workers * 4))
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(state,)) as executor:
+        return list(executor.map(func, tasks, chunksize=chunksize))
+
+
+def equity_curve(close, events, initial_capital, trading_fee):
+    """
+    بەهای پۆرتفۆلیۆ (پارە + پۆزیشن × نرخ) بۆ هەر مۆمێک لە eventsی simulate_trades.
+    دوایین بەها هەمان final_portfolio_value ی Backtesterە.
+    """
+    close = np.asarray(close, dtype=float)
+    cash = np.zeros(len(close))
+    position = np.zeros(len(close))
+    for j, trade_type, price, amount in events:
+        if trade_type == 'BUY':
+            # trade_amount - fee = amount × price، بۆیە trade_amount = amount × price / (1 - fee)
+            cash[j] -= amount * price / (1 - trading_fee)
+            position[j] += amount
+        else:
+            cash[j] += amount * price * (1 - trading_fee)
+            position[j] -= amount
+    return initial_capital + np.cumsum(cash) + np.cumsum(position) * close
+
+
+def trade_returns(events, trading_fee):
+    """قازانجی هەر مامەڵەیەکی داخراو (BUY تا SELL/STOP-LOSS) وەک ڕێژە، دوای کرێی هەردوو لا."""
+    returns, buy_price = [], None
+    for _, trade_type, price, _ in events:
+        if trade_type == 'BUY':
+            buy_price = price
+        elif buy_price is not None:
+            returns.append(price / buy_price * (1 - trading_fee) ** 2 - 1)
+            buy_price = None
+    return np.asarray(returns, dtype=float)
+
+
+def max_drawdown(curve):
+    curve = np.asarray(curve, dtype=float)
+    if len(curve) == 0:
+        return 0.0
+    return float(1 - (curve / np.maximum.accumulate(curve)).min())
+
+
+def sharpe_ratio(returns, periods_per_year):
+    returns = np.asarray(returns, dtype=float)
+    if len(returns) < 2:
+        return float('nan')
+    std = returns.std(ddof=1)
+    return float(returns.mean() / std * math.sqrt(periods_per_year)) if std > 0 else float('nan')
+
+
+def _simulate_window(symbol, params_index, start, end):
+    """تێکەڵەی params_index لەسەر مۆمەکانی [start, end) ی دراوێک. :return: Tuple(curve, events)."""
+    state = _worker_state
+    arrays = state['datasets']['symbols'][symbol]
+    params = state['combinations'][params_index]
+    # کۆی خاڵ بۆ هەر (دراو، تێکەڵە) تەنها یەکجار بۆ هەموو مێژووەکە حیساب دەکرێت
+    totals = state.setdefault('totals', {})
+    key = (symbol, params_index)
+    if key not in totals:
+        scorer = QuantitativeScorer(weights={name: params[name] for name in WEIGHT_KEYS})
+        totals[key] = scorer.calculate_total_scores(
+            arrays['technical'], BACKTEST_SENTIMENT, BACKTEST_FUNDAMENTALS, BACKTEST_CORRELATION
+        )
+
+    window = slice(start, end)
+    initial_capital = state['datasets']['initial_capital']
+    capital, position, events = simulate_trades(
+        arrays['close'][window], arrays['rsi'][window], totals[key][window], arrays['tradable'][window],
+        initial_capital, params['trade_amount_percent'], params['trading_fee'], params['stop_loss_percent'],
+        start=0, buy_threshold=params['buy_threshold'], sell_rsi=params['sell_rsi'],
+    )
+    return equity_curve(arrays['close'][window], events, initial_capital, params['trading_fee']), events
+
+
+def evaluate_window(task):
+    """
+    یەک پەنجەرەی walk-forward: باشترین تێکەڵە لەسەر train هەڵدەبژێرێت و لەسەر test (کە
+    هەرگیز لە هەڵبژاردندا بەکارنەهاتووە) تاقیی دەکاتەوە.
+    """
+    symbol, (train_start, train_end), (test_start, test_end) = task
+    state = _worker_state
+    initial_capital = state['datasets']['initial_capital']
+
+    best_index, best_profit = 0, -math.inf
+    for index in range(len(state['combinations'])):
+        curve, _ = _simulate_window(symbol, index, train_start, train_end)
+        if curve[-1] > best_profit:
+            best_index, best_profit = index, curve[-1]
+
+    params = state['combinations'][best_index]
+    curve, events = _simulate_window(symbol, best_index, test_start, test_end)
+    timestamps = state['datasets']['symbols'][symbol]['timestamp']
+    return {
+        'symbol': symbol,
+        'train_start': timestamps[train_start],
+        'test_start': timestamps[test_start],
+        'test_end': timestamps[test_end - 1],
+        'params_index': best_index,
+        'train_profit_percent': (best_profit / initial_capital - 1) * 100,
+        'test_profit_percent': (curve[-1] / initial_capital - 1) * 100,
+        'test_max_drawdown_percent': max_drawdown(curve) * 100,
+        'test_trades': len(events),
+        # بۆ Monte Carlo: قازانجی هەر مۆمێک و کاریگەری هەر مامەڵەیەک لەسەر پۆرتفۆلیۆ
+        'bar_returns': curve[1:] / curve[:-1] - 1,
+        'trade_returns': trade_returns(events, params['trading_fee']) * params['trade_amount_percent'],
+    }
+
+
+def bootstrap_indices(rng, sample_count, simulations, block_size):
+    """
+    indexی نموونەکان بۆ block bootstrap: بلۆکی block_size نموونەی یەک لە دوای یەک (بۆ پاراستنی
+    پەیوەندی نێوان مۆمە نزیکەکان)؛ block_size=1 واتە resamplingی سەربەخۆ.
+    """
+    block_size = max(1, min(block_size, sample_count))
+    blocks = math.ceil(sample_count / block_size)
+    starts = rng.integers(0, sample_count - block_size + 1, size=(simulations, blocks))
+    return (starts[:, :, None] + np.arange(block_size)).reshape(simulations, -1)[:, :sample_count]
+
+
+def simulate_paths(task):
+    """
+    یەک بەشی Monte Carlo: simulations ڕێڕەوی نوێ لە نموونەکانی symbol دروست دەکات.
+    :return: Tuple(final_returns, max_drawdowns, sharpes) وەک NumPy array.
+    """
+    symbol, seed, simulations = task
+    state = _worker_state
+    samples = state['samples'][symbol]
+    rng = np.random.default_rng(seed)
+    paths = samples[bootstrap_indices(rng, len(samples), simulations, state['block_size'])]
+
+    log_equity = np.cumsum(np.log1p(paths), axis=1)
+    # بەهای سەرەتا (log = 0) بەشێکە لە لووتکەکان
+    peaks = np.maximum.accumulate(np.maximum(log_equity, 0.0), axis=1)
+    max_drawdowns = 1 - np.exp((log_equity - peaks).min(axis=1))
+    std = paths.std(axis=1, ddof=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpes = np.where(std > 0, paths.mean(axis=1) / std, np.nan) * math.sqrt(state['periods_per_year'][symbol])
+    return np.expm1(log_equity[:, -1]), max_drawdowns, sharpes
+
+
+def summarize(final_returns, max_drawdowns, sharpes):
+    """ئامارەکانی دابەشبوونی Monte Carlo (هەموو ڕێژەکان بە %)."""
+    summary = {
+        'simulations': len(final_returns),
+        'return_mean_percent': float(np.mean(final_returns) * 100),
+        'return_p5_percent': float(np.percentile(final_returns, 5) * 100),
+        'return_p50_percent': float(np.percentile(final_returns, 50) * 100),
+        'return_p95_percent': float(np.percentile(final_returns, 95) * 100),
+        'loss_probability': float(np.mean(final_returns < 0)),
+    }
+    for percentile in DRAWDOWN_PERCENTILES:
+        summary[f'max_drawdown_p{percentile}_percent'] = float(np.percentile(max_drawdowns, percentile) * 100)
+    if np.isnan(sharpes).all():
+        sharpe_stats = dict.fromkeys(('sharpe_mean', 'sharpe_std', 'sharpe_p5', 'sharpe_p95'), float('nan'))
+    else:
+        sharpe_stats = {
+            'sharpe_mean': float(np.nanmean(sharpes)),
+            'sharpe_std': float(np.nanstd(sharpes)),
+            'sharpe_p5': float(np.nanpercentile(sharpes, 5)),
+            'sharpe_p95': float(np.nanpercentile(sharpes, 95)),
+        }
+    summary.update(sharpe_stats)
+    return summary
+
+
+class RobustnessAnalyzer:
+    """
+    تاقیکردنەوەی توندوتۆڵی ستراتیژی لە جیاتی یەک ژمارەی قازانج:
+      1. walk-forward: بۆ هەر پەنجەرەیەک باشترین تێکەڵەی گرید ([SWEEP]) لەسەر TRAIN_BARS هەڵدەبژێردرێت
+         و لەسەر TEST_BARS ی دواتر تاقیدەکرێتەوە.
+      2. Monte Carlo: قازانجی out-of-sample (هەر مۆمێک یان هەر مامەڵەیەک) بە bootstrap دووبارە
+         ڕیز دەکرێتەوە بۆ دابەشبوونی قازانج، drawdown و Sharpe.
+
+    ئیندیکەیتەرەکان یەکجار لە ParameterSweep.load_datasets حیساب دەکرێن و بە initializer دەدرێن
+    بە workerەکان. ڕێکخستنەکان لە بەشی [ROBUSTNESS] ی config.ini دا.
+    """
+
+    def __init__(self, config, backtester=None):
+        self.config = config
+        self.sweep = ParameterSweep(config, backtester)
+        self.backtester = self.sweep.backtester
+        self.train_bars = config.getint('ROBUSTNESS', 'TRAIN_BARS', fallback=500)
+        self.test_bars = config.getint('ROBUSTNESS', 'TEST_BARS', fallback=100)
+        # returns: block bootstrapی قازانجی هەر مۆمێک؛ trades: resamplingی ڕیزبەندی مامەڵەکان
+        self.method = config.get('ROBUSTNESS', 'METHOD', fallback='returns')
+        self.simulations = config.getint('ROBUSTNESS', 'SIMULATIONS', fallback=5000)
+        self.block_size = config.getint('ROBUSTNESS', 'BLOCK_SIZE', fallback=20)
+        self.seed = config.getint('ROBUSTNESS', 'SEED', fallback=42)
+        self.max_workers = config.getint('ROBUSTNESS', 'MAX_WORKERS', fallback=os.cpu_count() or 1)
+        self.timeframe_seconds = self.backtester.scanner.exchange_handler._timeframe_ms(self.backtester.timeframe) / 1000
+
+    def windows(self, length):
+        """پەنجەرەکانی walk-forward وەک لیستی ((train_start, train_end), (test_start, test_end))."""
+        windows = []
+        start = WARMUP_BARS
+        while start + self.train_bars + self.test_bars <= length:
+            train_end = start + self.train_bars
+            windows.append(((start, train_end), (train_end, train_end + self.test_bars)))
+            start += self.test_bars
+        return windows
+
+    def run(self, symbols=None, grid=None, max_workers=None, ui_logger=None):
+        """
+        :return: dict: windows (DataFrameی ئەنجامی هەر پەنجەرەیەک)، summary (DataFrameی ئامارەکانی
+                 هەر دراوێک) و combinations (لیستی تێکەڵەکانی گرید بۆ params_index).
+        """
+        datasets = self.sweep.load_datasets(symbols, ui_logger)
+        combinations = expand_grid(grid or grid_from_config(self.config))
+        max_workers = max_workers or self.max_workers
+        state = {'datasets': datasets, 'combinations': combinations}
+
+        required = WARMUP_BARS + self.train_bars + self.test_bars
+        tasks, usable = [], []
+        for symbol, arrays in datasets['symbols'].items():
+            symbol_windows = self.windows(len(arrays['close']))
+            if not symbol_windows:
+                # دراوێکی کورت ئەنجامی دراوەکانی تر ناوەستێنێت
+                print(f"⚠️ {symbol}: مێژوو بۆ walk-forward بەس نییە ({len(arrays['close'])} مۆم، "
+                      f"پێویستە لانیکەم {required} بێت)؛ لادەبرێت.")
+                continue
+            usable.append(symbol)
+            tasks += [(symbol, train, test) for train, test in symbol_windows]
+        if not tasks:
+            print(f"⚠️ مێژوو بۆ walk-forward بەس نییە (پێویستە لانیکەم {required} مۆم بێت).")
+            return {'windows': pd.DataFrame(), 'summary': pd.DataFrame(), 'combinations': combinations}
+
+        print(f"🚶 walk-forward: {len(tasks)} پەنجەرە × {len(combinations)} تێکەڵە بە {max_workers} worker...")
+        windows = _map(evaluate_window, tasks, state, max_workers)
+
+        samples, periods_per_year, actual = {}, {}, {}
+        for symbol in usable:
+            symbol_windows = [w for w in windows if w['symbol'] == symbol]
+            bar_returns = np.concatenate([w['bar_returns'] for w in symbol_windows])
+            oos_years = len(bar_returns) * self.timeframe_seconds / SECONDS_PER_YEAR
+            if self.method == 'trades':
+                samples[symbol] = np.concatenate([w['trade_returns'] for w in symbol_windows])
+                periods_per_year[symbol] = len(samples[symbol]) / oos_years if oos_years else 0
+            else:
+                samples[symbol] = bar_returns
+                periods_per_year[symbol] = SECONDS_PER_YEAR / self.timeframe_seconds
+            # ڕێڕەوی ڕاستەقینەی out-of-sample (پەنجەرەکان بە یەکەوە لکێنراون)
+            curve = np.concatenate(([1.0], np.cumprod(1 + bar_returns)))
+            actual[symbol] = {
+                'windows': len(symbol_windows),
+                'oos_return_percent': (curve[-1] - 1) * 100,
+                'oos_max_drawdown_percent': max_drawdown(curve) * 100,
+                'oos_sharpe': sharpe_ratio(samples[symbol], periods_per_year[symbol]),
+            }
+
+        summary = self._monte_carlo(samples, periods_per_year, actual, max_workers)
+        for window in windows:
+            del window['bar_returns'], window['trade_returns']
+        return {'windows': pd.DataFrame(windows), 'summary': summary, 'combinations': combinations}
+
+    def _monte_carlo(self, samples, periods_per_year, actual, max_workers):
+        state = {'samples': samples, 'periods_per_year': periods_per_year, 'block_size':
+                 1 if self.method == 'trades' else self.block_size}
+        usable = [symbol for symbol in samples if len(samples[symbol]) >= 2]
+        for symbol in set(samples) - set(usable):
+            print(f"⚠️ {symbol}: نموونەی بەس نییە بۆ Monte Carlo ({len(samples[symbol])}).")
+
+        # seedی هەر task لە SeedSequence، بۆیە ئەنجام بە هەر ژمارەیەک worker وەک یەکە
+        tasks = []
+        for symbol in usable:
+            sizes = [min(SIMULATIONS_PER_TASK, self.simulations - i) for i in range(0, self.simulations, SIMULATIONS_PER_TASK)]
+            seeds = np.random.SeedSequence([self.seed, len(tasks)]).spawn(len(sizes))
+            tasks += [(symbol, seed, size) for seed, size in zip(seeds, sizes)]
+        print(f"🎲 Monte Carlo ({self.method}): {self.simulations} ڕێڕەو بۆ {len(usable)} دراو...")
+        results = _map(simulate_paths, tasks, state, max_workers) if tasks else []
+
+        rows = []
+        for symbol in samples:
+            parts = [result for task, result in zip(tasks, results) if task[0] == symbol]
+            row = {'symbol': symbol, **actual[symbol]}
+            if parts:
+                row.update(summarize(*(np.concatenate(values) for values in zip(*parts))))
+            rows.append(row)
+        return pd.DataFrame(rows)
@@ -1,88 +1,375 @@
 # core/scanner.py
-from data_fetcher.exchange_handler import ExchangeHandler
-from analysis.technical_analyzer import analyze_data
+import asyncio
+import sqlite3
+import time
+
+import pandas as pd
+
+from data_fetcher.replay_handler import create_exchange_handler
+from analysis.technical_analyzer import analyze_data, INDICATOR_COLUMNS
 from analysis.sentiment_analyzer import SentimentAnalyzer
 from analysis.fundamental_analyzer import FundamentalAnalyzer
-from analysis.correlation_analyzer import CorrelationAnalyzer # زیادکرا
+from analysis.correlation_analyzer import CorrelationAnalyzer, REFERENCE_SYMBOL # زیادکرا
 from analysis.quantitative_scorer import QuantitativeScorer # زیادکرا
+from analysis.incremental_indicators import IncrementalIndicatorRegistry
+from utils.log_sink import LogSink
+from utils.metrics import get_metrics
+from utils.results_store import get_results_store
+
+# ستوونەکانی پێویست بۆ خاڵبەندی
+SCORE_COLUMNS = ['close'] + INDICATOR_COLUMNS
+# ژمارەی مۆمەکانی TIMEFRAME کە شیکاری تەکنیکی لەسەری دەکرێت
+ANALYSIS_BARS = 200
 
 class CryptoScanner:
-    def __init__(self, exchange_id, timeframe):
-        self.exchange_handler = ExchangeHandler(exchange_id)
+    def __init__(self, exchange_id, timeframe, incremental_indicators=False, indicator_state_path=None):
+        # live، record یان replay بەپێی [EXCHANGE] MODE
+        self.exchange_handler = create_exchange_handler(exchange_id)
         self.sentiment_analyzer = SentimentAnalyzer()
         self.fundamental_analyzer = FundamentalAnalyzer()
         self.correlation_analyzer = CorrelationAnalyzer(self.exchange_handler) # زیادکرا
         self.scorer = QuantitativeScorer() # زیادکرا
+        # پێوانی قۆناغەکان و داواکارییەکان ([METRICS] ENABLED)؛ کاتێک کوژاوەتەوە هیچ ناکات
+        self.metrics = get_metrics()
+        # هەر سکانێک و سیگناڵەکانی لە SQLite هەڵدەگیرێن ([RESULTS_STORE] ENABLED)
+        self.results_store = get_results_store()
         self.timeframe = timeframe
+        # مۆمی زیاتر دەهێنرێت ئەگەر پێویست بێت بۆ ئەوەی مۆمی ڕۆژانەی پەیوەندی لێیەوە resample بکرێت
+        self.history_limit = self.correlation_analyzer.history_limit(timeframe, minimum=ANALYSIS_BARS)
         self.signals = []
+        # ئەگەر چالاک بێت، ئیندیکەیتەرەکان لە نێوان سکانەکاندا بە O(1) نوێ دەکرێنەوە
+        self.indicator_registry = IncrementalIndicatorRegistry(indicator_state_path) if incremental_indicators else None
+
+    @staticmethod
+    def _analysis_frame(ohlcv_df):
+        """دوایین ANALYSIS_BARS مۆم بۆ شیکاری تەکنیکی (مێژووی زیاتر تەنها بۆ resampleی پەیوەندییە)."""
+        if ohlcv_df is None or len(ohlcv_df) <= ANALYSIS_BARS:
+            return ohlcv_df
+        return ohlcv_df.iloc[-ANALYSIS_BARS:].reset_index(drop=True)
 
-    def scan_symbols(self, symbols, ui_logger=None):
+    def _analyze(self, symbol, ohlcv_df):
+        """ئیندیکەیتەرەکان بۆ دراوێک حیساب دەکات (کاتەکەی لە قۆناغی indicators دا دەپێورێت)."""
+        if ohlcv_df is None or ohlcv_df.empty:
+            return None
+        with self.metrics.stage('indicators'):
+            return self._run_indicators(symbol, ohlcv_df)
+
+    def _run_indicators(self, symbol, ohlcv_df):
+        """
+        لە مۆدی incremental تەنها مۆمە داخراوە نوێیەکان دەدرێن بە دۆخی هەڵگیراو و دوایین
+        مۆمی نەداخراو تەنها peek دەکرێت.
+        """
+        if self.indicator_registry is None:
+            # کۆپی سەتحی: analyze_data تەنها ستوون زیاد دەکات و ڕیز لادەبات، نرخەکان کۆپی ناکرێن
+            return analyze_data(ohlcv_df.copy(deep=False))
+
+        engine = self.indicator_registry.get(symbol, self.timeframe)
+        closed_candles = ohlcv_df.iloc[:-1]
+        if engine.last_timestamp is not None and not closed_candles.empty:
+            first_timestamp = int(closed_candles['timestamp'].iloc[0].value // 1_000_000)
+            # ئەگەر بۆشاییەک لە نێوان دۆخی هەڵگیراو و داتای نوێدا هەبێت، لە سەرەتاوە گەرمی دەکەینەوە
+            if engine.last_timestamp < first_timestamp:
+                engine = self.indicator_registry.reset(symbol, self.timeframe)
+        engine.warm_up(closed_candles)
+        return engine.to_frame(pending_close=ohlcv_df['close'].iloc[-1])
+
+    def scan_symbols(self, symbols, ui_logger=None, concurrency=1, scorer=None, on_result=None, ohlcv_frames=None):
         """
         دراوەکان سکان دەکات و ئەنجامەکان دەگەڕێنێتەوە.
         ئەگەر ui_logger هەبێت، پرۆسەکە ڕاستەوخۆ لە داشبۆرد پیشان دەدات.
 
         :param symbols: لیستی دراوەکان بۆ سکانکردن.
         :param ui_logger: ئۆبجێکتێکی Streamlit بۆ پیشاندانی لۆگ (بۆ نموونە st.empty()).
+        :param concurrency: ئەگەر لە 1 زیاتر بێت، دراوەکان بە هاوکاتی (asyncio) سکان دەکرێن.
+        :param scorer: QuantitativeScorerی تایبەت بەم سکانە (بۆ نموونە بە کێشی جیاواز)، بەبێ گۆڕینی self.scorer.
+        :param on_result: callback(symbol, signal) کە دوای تەواوبوونی هەر دراوێک بانگ دەکرێت (signal دەتوانێت None بێت).
+        :param ohlcv_frames: dictی {symbol: DataFrame} بۆ ئەو دراوانەی مۆمەکانیان پێشتر هێنراون.
         :return: لیستی سیگناڵە دۆزراوەکان.
         """
-        # پاککردنەوەی سیگناڵە کۆنەکان پێش هەر سکانێکی نوێ
-        self.signals = []
+        if concurrency > 1:
+            return asyncio.run(self.scan_symbols_async(symbols, ui_logger, concurrency, scorer, on_result, ohlcv_frames))
 
-        if ui_logger:
-            ui_logger.info(f"🔎 دەستکرا بە سکانکردنی {len(symbols)} دراو لەسەر تایمفرەیمی {self.timeframe}...")
+        # هەموو پەیامەکان لە یەک widgetدا و بە نوێکردنەوەی سنووردار پیشان دەدرێن؛ فایلی لۆگ
+        # تەنانەت ئەگەر سکانەکە هەڵە بدات دادەخرێت
+        with LogSink('scan', ui_logger) as log:
+            try:
+                return self._scan_symbols(symbols, log, ui_logger, scorer, on_result, ohlcv_frames)
+            finally:
+                self.exchange_handler.close()
+
+    def _scan_symbols(self, symbols, log, ui_logger=None, scorer=None, on_result=None, ohlcv_frames=None):
+        # سیگناڵەکانی ئەم سکانە؛ لە کۆتاییدا لە self.signals دادەنرێن
+        signals = []
+        started = time.perf_counter()
+        # ژمێرەرە هاوبەشەکان سفر ناکرێنەوە؛ کۆتایی سکان تەنها جیاوازی ئەم نیشانەیە پیشان دەدات
+        metrics_mark = self.metrics.mark()
+
+        log.append(f"🔎 دەستکرا بە سکانکردنی {len(symbols)} دراو لەسەر تایمفرەیمی {self.timeframe}...")
         
         # دروستکردنی progress bar بۆ داشبۆرد
         progress_bar = None
         if ui_logger:
             progress_bar = ui_logger.progress(0)
 
+        # 1. مۆمەکانی TIMEFRAME بۆ هەر دراوێک تەنها یەکجار دەهێنرێن
+        frames = {}
+        for symbol in symbols:
+            if ohlcv_frames and symbol in ohlcv_frames:
+                frames[symbol] = ohlcv_frames[symbol]
+            else:
+                with self.metrics.stage('ohlcv_fetch'):
+                    frames[symbol] = self.exchange_handler.fetch_ohlcv_data(symbol, self.timeframe, self.history_limit)
+
+        # 4. شیکاری پەیوەندی: مۆمی ڕۆژانە لە هەمان مۆمەکان دروست دەکرێت (resample)، نەک داواکاری جیا
+        with self.metrics.stage('correlation'):
+            correlations = self.correlation_analyzer.get_btc_correlations(
+                symbols, frames=self.correlation_analyzer.resample_frames(frames, self.timeframe)
+            )
+        # 3. شیکاری بنەڕەتی: هەموو دراوەکان بە داواکاری کۆمەڵ (batch) و کاش
+        with self.metrics.stage('fundamentals'):
+            fundamentals = self.fundamental_analyzer.get_fundamental_data_batch([s.split('/')[0] for s in symbols])
+        # 2. شیکاری هەست و سۆز: هەواڵی هاوبەش لە نێوان دراوەکاندا تەنها یەکجار خاڵ دەدرێت
+        with self.metrics.stage('sentiment'):
+            sentiments = self.sentiment_analyzer.get_crypto_sentiments([s.split('/')[0] for s in symbols])
+
+        entries = []
         for i, symbol in enumerate(symbols):
-            if ui_logger:
-                # بەکارهێنانی markdown بۆ شێوازێکی جوانتر
-                ui_logger.markdown(f"--- \n ### 🪙 پشکنینی: {symbol}")
-            
             crypto_symbol = symbol.split('/')[0]
+            ohlcv_df = frames[symbol]
+            if not (ohlcv_frames and symbol in ohlcv_frames):
+                ohlcv_df = self._analysis_frame(ohlcv_df)
+            sentiment_score = sentiments.get(crypto_symbol, 0)
+            fundamental_data = fundamentals.get(crypto_symbol)
 
-            # 1. شیکاری تەکنیکی
-            ohlcv_df = self.exchange_handler.fetch_ohlcv_data(symbol, self.timeframe)
-            analyzed_df = analyze_data(ohlcv_df.copy()) if ohlcv_df is not None else None
-            
-            # 2. شیکاری هەست و سۆز
-            sentiment_score = self.sentiment_analyzer.get_crypto_sentiment(crypto_symbol)
-            if ui_logger:
-                ui_logger.text(f"   - 📰 خاڵی هەست و سۆز: {sentiment_score}")
-
-            # 3. شیکاری بنەڕەتی
-            fundamental_data = self.fundamental_analyzer.get_fundamental_data(crypto_symbol)
-            if ui_logger and fundamental_data:
-                ui_logger.text(f"   - 🏛️ بنەڕەتی: ڕیزبەندی: {fundamental_data.get('market_cap_rank')} | خاڵی پەرەپێدان: {fundamental_data.get('developer_score'):.2f}")
-            
-            # 4. شیکاری پەیوەندی
-            correlation = self.correlation_analyzer.get_btc_correlation(symbol)
-            if ui_logger:
-                ui_logger.text(f"   - 🔗 پەیوەندی لەگەڵ BTC: {correlation}")
-
-            # 5. خاڵبەندی چמותی
-            if analyzed_df is not None:
-                scores = self.scorer.calculate_scores(analyzed_df, sentiment_score, fundamental_data, correlation)
-                signal_strength = self.scorer.get_signal_strength(scores['total'])
-                
-                if signal_strength != "بێلایەن (Neutral)":
-                    if ui_logger:
-                        ui_logger.success(f"   ✅ سیگناڵ دۆزرایەوە: {signal_strength} | کۆی خاڵ: {scores['total']:.2f}")
-                    self.signals.append({
-                        'symbol': symbol,
-                        'total_score': scores['total'],
-                        'strength': signal_strength,
-                        'scores': scores,
-                        'dataframe': ohlcv_df
-                    })
+            entries.append(self._prepare_symbol(symbol, ohlcv_df, sentiment_score, fundamental_data, correlations.get(symbol), log))
             
             # نوێکردنەوەی progress bar
             if progress_bar:
                 progress_bar.progress((i + 1) / len(symbols))
+
+        # 5. خاڵبەندی هەموو دراوەکان بە یەک بانگکردنی ستوونی
+        for symbol, signal in self._score_entries(entries, log, scorer):
+            if signal:
+                signals.append(signal)
+            if on_result:
+                on_result(symbol, signal)
         
+        self.signals = signals
+        self._finish_scan(log, len(symbols), started, metrics_mark)
+        return signals
+
+    async def scan_symbols_async(self, symbols, ui_logger=None, concurrency=10, scorer=None, on_result=None,
+                                 ohlcv_frames=None, close_exchange=True):
+        """
+        هەمان scan_symbols بەڵام چەند دراوێک بە هاوکاتی سکان دەکات.
+        هێنانی OHLCV و پەیوەندی بە ccxt.async_support دەبێت و NewsAPI و CoinGecko
+        لە threadی جیاواز جێبەجێ دەکرێن. ژمارەی دراوە هاوکاتەکان بە concurrency سنووردار دەکرێت.
+
+        :param close_exchange: ئەگەر False بێت، کلاینتی async دانەخرێت بۆ ئەوەی سکانی داهاتوو
+                               لە هەمان event loopدا پەیوەندییە گەرمەکان بەکاربهێنێتەوە.
+        """
+        with LogSink('scan', ui_logger) as log:
+            try:
+                return await self._scan_symbols_async(symbols, log, ui_logger, concurrency, scorer, on_result,
+                                                      ohlcv_frames, close_exchange)
+            finally:
+                self.exchange_handler.close()
+
+    async def _scan_symbols_async(self, symbols, log, ui_logger=None, concurrency=10, scorer=None, on_result=None,
+                                  ohlcv_frames=None, close_exchange=True):
+        log.append(f"🔎 دەستکرا بە سکانکردنی {len(symbols)} دراو لەسەر تایمفرەیمی {self.timeframe}...")
+        started = time.perf_counter()
+        # ژمێرەرە هاوبەشەکان سفر ناکرێنەوە؛ کۆتایی سکان تەنها جیاوازی ئەم نیشانەیە پیشان دەدات
+        metrics_mark = self.metrics.mark()
+
+        progress_bar = None
         if ui_logger:
-            ui_logger.info("سکانکردن تەواو بوو!")
+            progress_bar = ui_logger.progress(0)
+
+        semaphore = asyncio.Semaphore(concurrency)
+        results = [None] * len(symbols)
+        # بەبێ on_result پێویست بە ئەنجامی دراو بە دراو نییە، بۆیە هەموویان بە یەکجار خاڵ دەدرێن
+        entries = [None] * len(symbols)
+        completed = 0
+        # NewsAPI و CoinGecko لە پاڵ هێنانی مۆمەکاندا کار دەکەن
+        crypto_symbols = [s.split('/')[0] for s in symbols]
+        fundamentals_task = asyncio.create_task(self.metrics.timed('fundamentals', asyncio.to_thread(
+            self.fundamental_analyzer.get_fundamental_data_batch, crypto_symbols
+        )))
+        sentiments_task = asyncio.create_task(self.metrics.timed('sentiment', asyncio.to_thread(
+            self.sentiment_analyzer.get_crypto_sentiments, crypto_symbols
+        )))
+
+        async def fetch_one(symbol):
+            if ohlcv_frames and symbol in ohlcv_frames:
+                return ohlcv_frames[symbol]
+            async with semaphore:
+                with self.metrics.stage('ohlcv_fetch'):
+                    return await self.exchange_handler.fetch_ohlcv_data_async(symbol, self.timeframe, self.history_limit)
+
+        # ئەگەر مێژووی هێنراو بۆ resample بەس نەبێت، مۆمی ڕۆژانە لە پاڵ مۆمەکانی TIMEFRAME دا دەهێنرێت
+        resample_covered = self.correlation_analyzer.covers(self.timeframe, self.history_limit)
+
+        async def daily_one(symbol):
+            given = bool(ohlcv_frames) and symbol in ohlcv_frames
+            base_frame = await frame_tasks[symbol] if symbol in frame_tasks and (given or resample_covered) else None
+            try:
+                return await self.correlation_analyzer.daily_frame_async(symbol, self.timeframe, base_frame, semaphore)
+            except Exception as e:
+                print(f"❌ هەڵە لە ئامادەکردنی مۆمی ڕۆژانە بۆ {symbol}: {e}")
+                return None
+
+        # 1. مۆمەکانی TIMEFRAME و 4. مۆمی ڕۆژانەی پەیوەندی (resample یان داواکاری جیا) بۆ هەر دراوێک
+        frame_tasks = {symbol: asyncio.create_task(fetch_one(symbol)) for symbol in dict.fromkeys(symbols)}
+        daily_tasks = {symbol: asyncio.create_task(self.metrics.timed('correlation', daily_one(symbol)))
+                       for symbol in dict.fromkeys([REFERENCE_SYMBOL, *symbols])}
+        tasks = [fundamentals_task, sentiments_task, *frame_tasks.values(), *daily_tasks.values()]
+
+        async def scan_one(index, symbol):
+            # هەر دراوێک دەستبەجێ دوای ئامادەبوونی داتاکانی خۆی شیکار دەکرێت (on_result دراو بە دراو)
+            nonlocal completed
+            crypto_symbol = symbol.split('/')[0]
+            ohlcv_df = await frame_tasks[symbol]
+            if not (ohlcv_frames and symbol in ohlcv_frames):
+                ohlcv_df = self._analysis_frame(ohlcv_df)
+            correlation = self.correlation_analyzer.correlation_from_frames(
+                symbol, await daily_tasks[REFERENCE_SYMBOL], await daily_tasks[symbol]
+            )
+            fundamental_data = (await fundamentals_task).get(crypto_symbol)
+            sentiment_score = (await sentiments_task).get(crypto_symbol, 0)
+
+            scan_args = (symbol, ohlcv_df, sentiment_score, fundamental_data, correlation, log)
+            if on_result:
+                results[index] = self._evaluate_symbol(*scan_args, scorer)
+                on_result(symbol, results[index])
+            else:
+                entries[index] = self._prepare_symbol(*scan_args)
+            completed += 1
+            if progress_bar:
+                progress_bar.progress(completed / len(symbols))
+
+        try:
+            await asyncio.gather(*(scan_one(index, symbol) for index, symbol in enumerate(symbols)))
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            if close_exchange:
+                await self.exchange_handler.close_async()
+
+        if not on_result:
+            results = [signal for _, signal in self._score_entries(entries, log, scorer)]
+
+        # ڕیزبەندی سیگناڵەکان وەک لیستی دراوەکان دەمێنێتەوە
+        signals = [signal for signal in results if signal]
+        self.signals = signals
+        self._finish_scan(log, len(symbols), started, metrics_mark)
+        return signals
+
+    def _prepare_symbol(self, symbol, ohlcv_df, sentiment_score, fundamental_data, correlation, log=None):
+        """
+        ئیندیکەیتەرەکانی دراوێک حیساب دەکات و داتاکانی تری لۆگ دەکات.
+        :return: Tuple(symbol, analyzed_df, sentiment_score, fundamental_data, correlation)
+        """
+        if log is not None:
+            log.append(f"--- 🪙 پشکنینی: {symbol}")
+
+        analyzed_df = self._analyze(symbol, ohlcv_df)
+
+        if log is not None:
+            log.append(f"   - 📰 خاڵی هەست و سۆز: {sentiment_score}")
+        if log is not None and fundamental_data:
+            log.append(f"   - 🏛️ بنەڕەتی: ڕیزبەندی: {fundamental_data.get('market_cap_rank')} | خاڵی پەرەپێدان: {fundamental_data.get('developer_score'):.2f}")
+        if log is not None:
+            log.append(f"   - 🔗 پەیوەندی لەگەڵ BTC: {correlation}")
+        return symbol, analyzed_df, sentiment_score, fundamental_data, correlation
+
+    def _evaluate_symbol(self, symbol, ohlcv_df, sentiment_score, fundamental_data, correlation, log=None, scorer=None):
+        """
+        ئەنجامی هەموو شیکارییەکانی دراوێک کۆدەکاتەوە و خاڵی دەداتێ.
+        :return: dictی سیگناڵ یان None ئەگەر سیگناڵ بێلایەن بێت.
+        """
+        entry = self._prepare_symbol(symbol, ohlcv_df, sentiment_score, fundamental_data, correlation, log)
+        analyzed_df = entry[1]
+
+        # 5. خاڵبەندی چەندایەتی
+        if analyzed_df is None:
+            return None
+
+        scorer = scorer or self.scorer
+        with self.metrics.stage('scoring'):
+            scores = scorer.calculate_scores(analyzed_df, sentiment_score, fundamental_data, correlation)
+        return self._build_signal(symbol, scores, scorer.get_signal_strength(scores['total']), log)
+
+    def _score_entries(self, entries, log=None, scorer=None):
+        """
+        هەموو دراوەکان بە یەک بانگکردنی QuantitativeScorer.score_frame خاڵ دەدات: دوو دوایین ڕیزی
+        هەر دراوێک پێکەوە دەلکێنرێن و بەشەکانی تر وەک dictی {entry: بەها} (..._by_group) دەدرێن.
+        :return: لیستی (symbol, signal یان None) بە ڕیزبەندی entries.
+        """
+        scorer = scorer or self.scorer
+        # هەر entryێک بە ژمارەکەی دەناسرێتەوە، بۆیە دراوی دووبارە تێکەڵ نابێت
+        frames, sentiments, fundamentals, correlations = [], {}, {}, {}
+        for k, (symbol, analyzed_df, sentiment_score, fundamental_data, correlation) in enumerate(entries):
+            if analyzed_df is None:
+                continue
+            # calculate_scores تەنها دوو دوایین ڕیز بەکاردەهێنێت؛ frameی بەتاڵ ڕیزێکی NaN دەبێت (خاڵی تەکنیکی 0)
+            frame = analyzed_df.tail(2).reindex(columns=SCORE_COLUMNS) if not analyzed_df.empty \
+                else pd.DataFrame(index=[0], columns=SCORE_COLUMNS, dtype=float)
+            frames.append(frame.assign(entry=k))
+            sentiments[k], fundamentals[k], correlations[k] = sentiment_score, fundamental_data, correlation
+
+        last_rows = {}
+        if frames:
+            with self.metrics.stage('scoring'):
+                stacked = pd.concat(frames, ignore_index=True)
+                scored = scorer.score_frame(stacked, group_column='entry', sentiment_by_group=sentiments,
+                                            fundamental_by_group=fundamentals, correlation_by_group=correlations)
+                scored['entry'] = stacked['entry']
+                last = scored.groupby('entry', sort=False).tail(1)
+                last_rows = dict(zip(last['entry'].tolist(), last.to_dict('records')))
+
+        results = []
+        for k, (symbol, *_) in enumerate(entries):
+            row = last_rows.get(k)
+            if row is None:
+                results.append((symbol, None))
+                continue
+            scores = {key: row[key] for key in ('sentiment', 'fundamental', 'correlation', 'total')}
+            scores['technical'] = int(row['technical'])
+            results.append((symbol, self._build_signal(symbol, scores, row['signal'], log)))
+        return results
+
+    def _build_signal(self, symbol, scores, signal_strength, log=None):
+        """
+        سیگناڵ تەنها خاڵەکان هەڵدەگرێت، نەک DataFrameی مۆمەکان، بۆ ئەوەی لیستی سیگناڵەکانی
+        سکانێکی گەورە (یان daemon) بیرگەی مۆمەکان بە زیندوویی نەهێڵێتەوە.
+        """
+        if signal_strength == "بێلایەن (Neutral)":
+            return None
+
+        if log is not None:
+            log.append(f"   ✅ سیگناڵ دۆزرایەوە: {signal_strength} | کۆی خاڵ: {scores['total']:.2f}")
+        return {
+            'symbol': symbol,
+            'total_score': scores['total'],
+            'strength': signal_strength,
+            'scores': scores,
+        }
+
+    def _finish_scan(self, log=None, symbol_count=0, started=None, metrics_mark=None):
+        if self.indicator_registry is not None:
+            self.indicator_registry.save()
+
+        if self.results_store is not None:
+            duration_ms = (time.perf_counter() - started) * 1000 if started is not None else None
+            try:
+                self.results_store.record_scan(self.exchange_handler.exchange_id, self.timeframe, symbol_count,
+                                               self.signals, duration_ms)
+            except sqlite3.Error as e:
+                print(f"⚠️ هەڵە لە هەڵگرتنی ئەنجامی سکان: {e}")
 
-        return self.signals
\ No newline at end of file
+        # خشتەی کاتەکان و فایلەکانی JSON/Prometheus (تەنها ئەگەر پێوان چالاک بێت)
+        self.metrics.report(log, since=metrics_mark)
+        if log is not None:
+            log.append("سکانکردن تەواو بوو!")
@@ -0,0 +1,116 @@
+# core/universe.py
+import math
+
+from utils.config_loader import load_config
+
+# جووتە stablecoinەکان قەبارەیان زۆرە بەڵام نرخیان ناجوڵێت، بۆیە بە شێوەی بنەڕەت لادەبرێن
+DEFAULT_EXCLUDE = 'USDC,FDUSD,TUSD,BUSD,DAI,USDP,USDD,PYUSD,EUR,EURI,AEUR'
+# تۆکنە leverageکراوەکانی وەک BTCUP/BTCDOWN یان ETHBULL/ETHBEAR (تەنها ئەگەر BTC/ETH خۆی بازاڕی هەبێت)
+LEVERAGED_SUFFIXES = ('UP', 'DOWN', 'BULL', 'BEAR', '3L', '3S', '5L', '5S')
+
+RANK_KEYS = {
+    'quote_volume': lambda stats: stats['quote_volume'],
+    'change': lambda stats: stats['change'],
+    'abs_change': lambda stats: abs(stats['change']),
+}
+
+
+class UniverseSelector:
+    """
+    سکانی هەموو ئیکسچەینج بە دوو قۆناغ:
+      1. load_markets: هەموو جووتەکانی QUOTE کە چالاک و spotن.
+      2. یەک داواکاری fetch_tickers بۆ هەموو بازاڕ: فلتەر بەپێی قەبارەی 24 کاتژمێری، گۆڕانی نرخ
+         و spread، پاشان ڕیزبەندی و هەڵبژاردنی TOP_K دراو بۆ CryptoScanner.
+
+    ڕێکخستنەکان لە بەشی [UNIVERSE] ی config.ini دا.
+    """
+
+    def __init__(self, exchange_handler, config=None):
+        config = config or load_config()
+        self.exchange_handler = exchange_handler
+        self.quote = config.get('UNIVERSE', 'QUOTE', fallback='USDT').upper()
+        self.min_quote_volume = config.getfloat('UNIVERSE', 'MIN_QUOTE_VOLUME', fallback=1_000_000)
+        # گۆڕانی نرخی 24 کاتژمێری بە %؛ بۆ نموونە MIN = -5 و MAX = 30
+        self.min_change = config.getfloat('UNIVERSE', 'MIN_PRICE_CHANGE_PERCENT', fallback=-math.inf)
+        self.max_change = config.getfloat('UNIVERSE', 'MAX_PRICE_CHANGE_PERCENT', fallback=math.inf)
+        # جیاوازی bid/ask بە % ی نرخی ناوەڕاست؛ ئەگەر ticker bid/ask ی نەبێت ئەم فلتەرە پشتگوێ دەخرێت
+        self.max_spread = config.getfloat('UNIVERSE', 'MAX_SPREAD_PERCENT', fallback=0.5)
+        self.top_k = config.getint('UNIVERSE', 'TOP_K', fallback=50)
+        self.rank_by = config.get('UNIVERSE', 'RANK_BY', fallback='quote_volume')
+        if self.rank_by not in RANK_KEYS:
+            print(f"⚠️ RANK_BY ی نەناسراو ({self.rank_by})؛ quote_volume بەکاردێت.")
+            self.rank_by = 'quote_volume'
+        exclude = config.get('UNIVERSE', 'EXCLUDE', fallback=DEFAULT_EXCLUDE)
+        self.exclude = {item.strip().upper() for item in exclude.split(',') if item.strip()}
+        # دوایین ئەنجام، بۆ پیشاندان لە داشبۆرد یان لۆگ
+        self.last_stats = {}
+
+    @staticmethod
+    def _base(symbol, market):
+        return (market.get('base') or symbol.split('/')[0]).upper()
+
+    def _is_candidate(self, symbol, market, bases):
+        base = self._base(symbol, market)
+        if (market.get('quote') or '').upper() != self.quote:
+            return False
+        if market.get('active') is False or market.get('spot') is False:
+            return False
+        if base in self.exclude or symbol.upper() in self.exclude:
+            return False
+        return not any(base.endswith(suffix) and base[:-len(suffix)] in bases for suffix in LEVERAGED_SUFFIXES)
+
+    @staticmethod
+    def _ticker_stats(ticker):
+        """قەبارە، گۆڕان و spread لە tickerی ccxt؛ خانە ونبووەکان لە خانەکانی تر حیساب دەکرێن."""
+        last = ticker.get('last') or ticker.get('close')
+        if not last:
+            return None
+        quote_volume = ticker.get('quoteVolume')
+        if quote_volume is None:
+            quote_volume = (ticker.get('baseVolume') or 0) * last
+        change = ticker.get('percentage')
+        if change is None:
+            change = (last / ticker['open'] - 1) * 100 if ticker.get('open') else 0.0
+        bid, ask = ticker.get('bid'), ticker.get('ask')
+        spread = (ask - bid) / ((ask + bid) / 2) * 100 if bid and ask else None
+        return {'last': last, 'quote_volume': quote_volume, 'change': change, 'spread': spread}
+
+    def _passes(self, stats):
+        if stats is None or stats['quote_volume'] < self.min_quote_volume:
+            return False
+        if not self.min_change <= stats['change'] <= self.max_change:
+            return False
+        return stats['spread'] is None or stats['spread'] <= self.max_spread
+
+    def select(self, report=print):
+        """
+        :param report: callable بۆ پیشاندانی کورتەی هەڵبژاردن (بۆ نموونە job.log ی داشبۆرد).
+        :return: لیستی TOP_K دراو بە ڕیزبەندی RANK_BY، یان لیستی بەتاڵ ئەگەر هێنان سەرکەوتوو نەبێت.
+        """
+        markets = self.exchange_handler.load_markets()
+        bases = {self._base(symbol, market) for symbol, market in markets.items()}
+        candidates = [symbol for symbol, market in markets.items() if self._is_candidate(symbol, market, bases)]
+        if not candidates:
+            report(f"⚠️ هیچ بازاڕێکی {self.quote} لە {self.exchange_handler.exchange_id} نەدۆزرایەوە.")
+            return []
+
+        # یەک داواکاری بۆ هەموو بازاڕ؛ ناردنی هەزاران symbol لە URL دا لە هەندێک ئیکسچەینج سنووردارە
+        tickers = self.exchange_handler.fetch_tickers()
+        survivors = {}
+        for symbol in candidates:
+            ticker = tickers.get(symbol)
+            stats = self._ticker_stats(ticker) if ticker else None
+            if self._passes(stats):
+                survivors[symbol] = stats
+
+        rank = RANK_KEYS[self.rank_by]
+        selected = sorted(survivors, key=lambda symbol: rank(survivors[symbol]), reverse=True)[:self.top_k]
+        self.last_stats = {symbol: survivors[symbol] for symbol in selected}
+        report(f"🌐 گەردوونی {self.exchange_handler.exchange_id}: {len(markets)} بازاڕ → {len(candidates)} جووتی "
+               f"{self.quote} → {len(survivors)} پاش فلتەر → {len(selected)} دراو بۆ سکان")
+        return selected
+
+
+def universe_enabled(config=None):
+    config = config or load_config()
+    return config.getboolean('UNIVERSE', 'ENABLED', fallback=False)
@@ -1,10 +1,16 @@
 # dashboard.py
 import streamlit as st
-import configparser
 import pandas as pd
 
+from analysis.quantitative_scorer import QuantitativeScorer
 from core.scanner import CryptoScanner
 from core.backtester import Backtester
+from core.optimizer import ParameterSweep, parse_grid_values
+from core.portfolio import PortfolioBacktester
+from core.universe import UniverseSelector, universe_enabled
+from utils.config_loader import config_copy
+from utils.jobs import BackgroundJob, JobLogger
+from utils.results_store import get_results_store
 from utils.visualizer import plot_backtest_results
 
 # --- ڕێکخستنی سەرەتایی پەڕەکە ---
@@ -18,8 +24,8 @@ st.title("🤖 داشبۆردی بۆتی شیکاری کریپتۆ")
 st.markdown("لێرەوە دەتوانیت بۆتەکە کۆنتڕۆڵ بکەیت، سکانی ڕاستەوخۆ بکەیت، یان ستراتیژییەکانت تاقیبکەیتەوە.")
 
 # --- خوێندنەوەی ڕێکخستنە بنەڕەتییەکان لە config.ini ---
-config = configparser.ConfigParser()
-config.read('config/config.ini', encoding='utf-8')
+# کۆپییەکی سەربەخۆ، چونکە داشبۆرد بەهاکانی تاقیکردنەوە دەگۆڕێت
+config = config_copy()
 
 # ==============================================================================
 # --- لای ڕاست (Sidebar) بۆ کۆنتڕۆڵکردن ---
@@ -27,15 +33,21 @@ config.read('config/config.ini', encoding='utf-8')
 st.sidebar.header("⚙️ ڕێکخستنەکان")
 
 # هەڵبژاردنی مۆد
-app_mode = st.sidebar.selectbox("مۆدی کارکردن هەڵبژێرە", ["Live Scan", "Backtest Strategy"])
+app_mode = st.sidebar.selectbox("مۆدی کارکردن هەڵبژێرە", ["Live Scan", "Backtest Strategy", "Parameter Sweep", "Results History"])
 
 # ڕێکخستنەکانی سکان
 st.sidebar.subheader("ڕێکخستنی سکان")
 exchange_id = st.sidebar.selectbox("ئیکسچەینج", ["binance", "kucoin", "okx"], index=0)
 timeframe = st.sidebar.selectbox("تایمفرەیم", ["1h", "4h", "1d", "1w"], index=2)
-default_symbols = [s.strip() for s in config.get('SCAN_SETTINGS', 'SYMBOLS').split(',')]
+default_symbols = [s.strip() for s in config.get('SCAN_SETTINGS', 'SYMBOLS', fallback='').split(',') if s.strip()]
 symbols_to_scan = st.sidebar.text_area("لیستی دراوەکان (بە کۆما جیاکراوەتەوە)", ", ".join(default_symbols), height=150)
 symbols_list = [s.strip().upper() for s in symbols_to_scan.split(',')]
+# مۆدی universe: دراوەکان لە هەموو بازاڕەکانی ئیکسچەینج هەڵدەبژێردرێن و لیستی سەرەوە تەنها بۆ backtest ـە
+use_universe = st.sidebar.checkbox("🌐 سکانی هەموو ئیکسچەینج (universe)", value=universe_enabled(config))
+if use_universe:
+    universe_top_k = st.sidebar.number_input("ژمارەی باشترین دراوەکان بۆ سکان (TOP_K)", min_value=1, max_value=1000,
+                                             value=config.getint('UNIVERSE', 'TOP_K', fallback=50))
+max_concurrency = st.sidebar.number_input("ژمارەی دراوە هاوکاتەکان لە سکاندا", min_value=1, max_value=64, value=config.getint('SCAN_SETTINGS', 'MAX_CONCURRENCY', fallback=8))
 
 # ڕێکخستنی کێشی خاڵەکان (بۆ شارەزایان)
 with st.sidebar.expander("⚖️ گۆڕینی کێشی خاڵەکان (Advanced)"):
@@ -44,12 +56,153 @@ with st.sidebar.expander("⚖️ گۆڕینی کێشی خاڵەکان (Advanced)
     w_fund = st.slider("کێشی بنەڕەتی", 0.0, 1.0, config.getfloat('SCORING_WEIGHTS', 'fundamental'), 0.05)
     w_corr = st.slider("کێشی پەیوەندی", 0.0, 1.0, config.getfloat('SCORING_WEIGHTS', 'correlation'), 0.05)
     # لێرەدا دەتوانیت کێشەکان نوێ بکەیتەوە
+weights = {'technical': w_tech, 'sentiment': w_sent, 'fundamental': w_fund, 'correlation': w_corr}
 
 # ڕێکخستنی تاقیکردنەوە (Backtest)
 st.sidebar.subheader("ڕێکخستنی تاقیکردنەوە")
 initial_capital = st.sidebar.number_input("سەرمایەی سەرەتایی ($)", value=config.getfloat('BACKTEST_SETTINGS', 'INITIAL_CAPITAL'))
 stop_loss = st.sidebar.slider("ڕێژەی ڕاگرتنی زیان (%)", 0.0, 20.0, config.getfloat('BACKTEST_SETTINGS', 'STOP_LOSS_PERCENT') * 100, 0.5) / 100
 
+# ==============================================================================
+# --- سەرچاوە هاوبەشەکان و کارە پاشبنەماکان ---
+# ==============================================================================
+
+@st.cache_resource(show_spinner=False)
+def get_scanner(exchange_id, timeframe):
+    """
+    یەک سکانەر (پەیوەندیی ئیکسچەینج، NewsAPI، CoinGecko) بۆ هەر ئیکسچەینج/تایمفرەیمێک
+    کە لە نێوان هەموو rerun و sessionەکاندا بەکاردێتەوە، لە جیاتی دروستکردنی لە هەر کلیکێکدا.
+    """
+    return CryptoScanner(exchange_id, timeframe)
+
+
+def job_running(key):
+    job = st.session_state.get(key)
+    return job is not None and job.running
+
+
+def start_job(key, name, target, *args, meta=None, **kwargs):
+    """کارێک لە threadی جیاواز دەستپێدەکات و لە session_state هەڵیدەگرێت."""
+    job = BackgroundJob(name, target, *args, **kwargs)
+    job.meta = meta or {}
+    st.session_state[key] = job.start()
+
+
+def scan_job(scanner, symbols, weights, concurrency, job, universe=None):
+    if universe is not None:
+        symbols = universe.select(report=job.log)
+    # سیگناڵەکان یەک بە یەک دەگەنە داشبۆرد، پێش تەواوبوونی هەموو سکانەکە
+    def on_result(symbol, signal):
+        if signal:
+            job.add_result(signal)
+
+    return scanner.scan_symbols(symbols, ui_logger=JobLogger(job), concurrency=concurrency,
+                                scorer=QuantitativeScorer(weights=weights), on_result=on_result)
+
+
+def backtest_job(backtester, job):
+    return backtester.run(ui_logger=JobLogger(job))
+
+
+def sweep_job(sweep, grid, symbols, job):
+    return sweep.run(grid, symbols=symbols, ui_logger=JobLogger(job))
+
+
+def show_job(key, render):
+    """
+    دۆخی کارێک پیشان دەدات. تا کارەکە کار دەکات تەنها ئەم fragmentە هەموو چرکەیەک نوێ دەکرێتەوە
+    (نەک هەموو پەڕەکە)؛ کاتێک تەواو بوو، یەک rerunی تەواو دەکرێت بۆ وەستاندنی نوێکردنەوەکە.
+    """
+    job = st.session_state.get(key)
+    if job is None:
+        return
+    was_running = job.running
+
+    @st.fragment(run_every=1.0 if was_running else None)
+    def job_view():
+        if was_running and not job.running:
+            st.rerun()
+        if job.running:
+            st.progress(min(job.progress, 1.0), text=f"⏳ {job.name}... ({job.elapsed:.0f} چرکە)")
+        elif job.error:
+            st.error(f"❌ {job.name} شکستی هێنا: {job.error.splitlines()[0]}")
+        render(job)
+
+    job_view()
+
+
+def render_scan(job):
+    signals = job.result if not job.running and job.result is not None else job.snapshot_results()
+    if not job.running and not job.error:
+        st.success(f"سکانکردن تەواو بوو! ({job.elapsed:.1f} چرکە)")
+
+    with st.expander("📜 لۆگی سکان", expanded=False):
+        st.code("\n".join(job.logs[-300:]) or "...")
+
+    if not signals:
+        if not job.running:
+            st.warning("هیچ سیگناڵێکی بەهێز نەدۆزرایەوە.")
+        return
+
+    st.subheader("📈 ئەنجامی سکان")
+    sorted_signals = sorted(signals, key=lambda x: x['total_score'], reverse=True)
+
+    for item in sorted_signals:
+        with st.expander(f"💎 {item['symbol']} | {item['strength']} | کۆی خاڵ: {item['total_score']:.2f}", expanded=True):
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("خاڵی تەکنیکی", f"{item['scores']['technical']:.0f}/100")
+            col2.metric("خاڵی هەست و سۆز", f"{item['scores']['sentiment']:.0f}/100")
+            col3.metric("خاڵی بنەڕەتی", f"{item['scores']['fundamental']:.0f}/100")
+            col4.metric("خاڵی پەیوەندی", f"{item['scores']['correlation']:.0f}/100")
+
+
+def render_backtest(job):
+    log_text = job.log_text()
+    if log_text:
+        st.text_area("لۆگی تاقیکردنەوە", log_text, height=300)
+    if job.running or job.error:
+        return
+
+    historical_data, trades, final_results = job.result
+    if not final_results:
+        st.error("نەتوانرا تاقیکردنەوە ئەنجام بدرێت.")
+        return
+
+    st.success(f"تاقیکردنەوە تەواو بوو! ({job.elapsed:.1f} چرکە)")
+
+    st.subheader("📊 ئەنجامی کۆتایی تاقیکردنەوە")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("قازانج/زیانی ستراتیژی", f"{final_results['profit_loss_percent']:.2f}%")
+    col2.metric("قازانجی 'کڕین و هێشتنەوە'", f"{final_results['buy_and_hold_profit_percent']:.2f}%")
+    col3.metric("کۆی مامەڵەکان", len(trades))
+
+    if job.meta['portfolio_mode']:
+        # historical_data لێرەدا هێڵی equityی هەر دراوێک و هی هەموو پۆرتفۆلیۆکەیە
+        st.subheader("📈 هێڵی بەهای پۆرتفۆلیۆ")
+        st.line_chart(historical_data['portfolio'])
+        st.subheader("📈 قازانج/زیانی هەر دراوێک")
+        st.line_chart(historical_data.drop(columns=['portfolio']))
+        st.dataframe(pd.DataFrame(final_results['per_symbol']).T, use_container_width=True)
+    elif trades:
+        st.subheader("📈 چارتی بینراوی مامەڵەکان")
+        fig = plot_backtest_results(historical_data, trades, job.meta['symbol'], final_results['profit_loss_percent'])
+        st.plotly_chart(fig, use_container_width=True)
+
+
+def render_sweep(job):
+    with st.expander("📜 لۆگی Sweep", expanded=job.running):
+        st.code("\n".join(job.logs[-300:]) or "...")
+    if job.running or job.error:
+        return
+
+    results = job.result
+    if results.empty:
+        st.warning("هیچ ئەنجامێک نییە.")
+    else:
+        st.subheader(f"🏆 ئەنجامی ڕیزبەندکراو ({job.elapsed:.1f} چرکە)")
+        st.dataframe(results, use_container_width=True)
+
+
 # ==============================================================================
 # --- بەشی سەرەکی داشبۆرد ---
 # ==============================================================================
@@ -57,63 +210,93 @@ stop_loss = st.sidebar.slider("ڕێژەی ڕاگرتنی زیان (%)", 0.0, 20.
 if app_mode == "Live Scan":
     st.header("🔍 سکانی ڕاستەوخۆی بازاڕ")
 
-    if st.button("🚀 دەستپێکردنی سکان", type="primary"):
-        # دروستکردنی سکانەر
-        scanner = CryptoScanner(exchange_id, timeframe)
-        # لێرەدا دەتوانین کێشە نوێیەکان بدەین بە scorer
-        scanner.scorer.WEIGHTS = {'technical': w_tech, 'sentiment': w_sent, 'fundamental': w_fund, 'correlation': w_corr}
-        
-        # لۆگەر بۆ پیشاندانی پرۆسەکە
-        log_placeholder = st.empty()
-        
-        with st.spinner("...خەریکی سکانکردنم"):
-            found_signals = scanner.scan_symbols(symbols_list, ui_logger=log_placeholder)
-        
-        log_placeholder.success("سکانکردن تەواو بوو!")
-        
-        if not found_signals:
-            st.warning("هیچ سیگناڵێکی بەهێز نەدۆزرایەوە.")
-        else:
-            st.subheader("📈 ئەنجامی سکان")
-            sorted_signals = sorted(found_signals, key=lambda x: x['total_score'], reverse=True)
-            
-            for item in sorted_signals:
-                with st.expander(f"💎 {item['symbol']} | {item['strength']} | کۆی خاڵ: {item['total_score']:.2f}", expanded=True):
-                    col1, col2, col3, col4 = st.columns(4)
-                    col1.metric("خاڵی تەکنیکی", f"{item['scores']['technical']:.0f}/100")
-                    col2.metric("خاڵی هەست و سۆز", f"{item['scores']['sentiment']:.0f}/100")
-                    col3.metric("خاڵی بنەڕەتی", f"{item['scores']['fundamental']:.0f}/100")
-                    col4.metric("خاڵی پەیوەندی", f"{item['scores']['correlation']:.0f}/100")
+    if st.button("🚀 دەستپێکردنی سکان", type="primary", disabled=job_running('scan_job')):
+        # سکانەری هاوبەش؛ کێشەکانی ئەم سکانە لە scorerی جیادا دەدرێن
+        scanner = get_scanner(exchange_id, timeframe)
+        universe = None
+        if use_universe:
+            universe = UniverseSelector(scanner.exchange_handler, config)
+            universe.top_k = int(universe_top_k)
+        start_job('scan_job', "سکانکردن", scan_job, scanner, symbols_list, dict(weights), int(max_concurrency),
+                  universe=universe)
+
+    show_job('scan_job', render_scan)
 
 elif app_mode == "Backtest Strategy":
     st.header("🔬 تاقیکردنەوەی ستراتیژی (Backtest)")
-    st.info("تاقیکردنەوە تەنها لەسەر یەکەم دراوی لیستەکە ئەنجام دەدرێت.")
+    portfolio_mode = st.checkbox("تاقیکردنەوەی پۆرتفۆلیۆ (هەموو دراوەکانی لیست بە سەرمایەی هاوبەش)", value=False)
+    if not portfolio_mode:
+        st.info("تاقیکردنەوە تەنها لەسەر یەکەم دراوی لیستەکە ئەنجام دەدرێت.")
 
-    if st.button("🏁 دەستپێکردنی تاقیکردنەوە", type="primary"):
+    if st.button("🏁 دەستپێکردنی تاقیکردنەوە", type="primary", disabled=job_running('backtest_job')):
         # نوێکردنەوەی config بەپێی هەڵبژاردنەکانی بەکارهێنەر
         config.set('BACKTEST_SETTINGS', 'INITIAL_CAPITAL', str(initial_capital))
         config.set('BACKTEST_SETTINGS', 'STOP_LOSS_PERCENT', str(stop_loss))
-        
-        backtester = Backtester(config)
+
+        scanner = get_scanner(config.get('SCAN_SETTINGS', 'EXCHANGE_ID'), config.get('SCAN_SETTINGS', 'TIMEFRAME'))
+        backtester = PortfolioBacktester(config, scanner) if portfolio_mode else Backtester(config, scanner)
+        backtester.symbols = symbols_list
         # نوێکردنەوەی کێشەکان
-        backtester.scorer.WEIGHTS = {'technical': w_tech, 'sentiment': w_sent, 'fundamental': w_fund, 'correlation': w_corr}
-
-        log_placeholder = st.text_area("لۆگی تاقیکردنەوە", height=200)
-        
-        with st.spinner("...خەریکی تاقیکردنەوەی ستراتیژییەکەم لەسەر داتای مێژوویی"):
-            # تێبینی: لێرەدا پێویستە backtester.run بگۆڕین بۆ ئەوەی لۆگ بگەڕێنێتەوە
-            # بۆ سادەیی، ئێستا وازی لێدەهێنین و ئەنجامی کۆتایی پیشان دەدەین
-            historical_data, trades, final_results = backtester.run() # وا دادەنێین run ئەم سێ شتە دەگەڕێنێتەوە
-
-        st.success("تاقیکردنەوە تەواو بوو!")
-        
-        st.subheader("📊 ئەنجامی کۆتایی تاقیکردنەوە")
-        col1, col2, col3 = st.columns(3)
-        col1.metric("قازانج/زیانی ستراتیژی", f"{final_results['profit_loss_percent']:.2f}%")
-        col2.metric("قازانجی 'کڕین و هێشتنەوە'", f"{final_results['buy_and_hold_profit_percent']:.2f}%")
-        col3.metric("کۆی مامەڵەکان", len(trades))
-        
-        if trades:
-            st.subheader("📈 چارتی بینراوی مامەڵەکان")
-            fig = plot_backtest_results(historical_data, trades, symbols_list[0], final_results['profit_loss_percent'])
-            st.plotly_chart(fig, use_container_width=True)
\ No newline at end of file
+        backtester.scorer.WEIGHTS = dict(weights)
+
+        start_job('backtest_job', "تاقیکردنەوە", backtest_job, backtester,
+                  meta={'portfolio_mode': portfolio_mode, 'symbol': symbols_list[0]})
+
+    show_job('backtest_job', render_backtest)
+
+elif app_mode == "Parameter Sweep":
+    st.header("🧪 گەڕان بەدوای باشترین پارامێتەرەکان (Sweep)")
+    st.info("بۆ هەر پارامێتەرێک لیستێک (0.3, 0.4) یان مەودایەک (start:stop:step) بنووسە.")
+
+    col1, col2 = st.columns(2)
+    grid_text = {
+        'technical': col1.text_input("کێشی تەکنیکی", f"{w_tech}"),
+        'sentiment': col1.text_input("کێشی هەست و سۆز", f"{w_sent}"),
+        'fundamental': col1.text_input("کێشی بنەڕەتی", f"{w_fund}"),
+        'correlation': col1.text_input("کێشی پەیوەندی", f"{w_corr}"),
+        'stop_loss_percent': col2.text_input("ڕێژەی ڕاگرتنی زیان", "0.02:0.10:0.01"),
+        'trading_fee': col2.text_input("کرێی مامەڵە", config.get('BACKTEST_SETTINGS', 'TRADING_FEE_PERCENT')),
+        'trade_amount_percent': col2.text_input("ڕێژەی سەرمایە بۆ هەر مامەڵەیەک", config.get('BACKTEST_SETTINGS', 'TRADE_AMOUNT_PERCENT')),
+        'buy_threshold': col2.text_input("سنووری خاڵی کڕین", "55, 60, 65"),
+        'sell_rsi': col2.text_input("سنووری RSI بۆ فرۆشتن", "70"),
+    }
+
+    if st.button("🧪 دەستپێکردنی Sweep", type="primary", disabled=job_running('sweep_job')):
+        grid = {key: parse_grid_values(value) for key, value in grid_text.items()}
+        config.set('BACKTEST_SETTINGS', 'INITIAL_CAPITAL', str(initial_capital))
+        scanner = get_scanner(config.get('SCAN_SETTINGS', 'EXCHANGE_ID'), config.get('SCAN_SETTINGS', 'TIMEFRAME'))
+        sweep = ParameterSweep(config, Backtester(config, scanner))
+        start_job('sweep_job', "Sweep", sweep_job, sweep, grid, symbols_list)
+
+    show_job('sweep_job', render_sweep)
+
+elif app_mode == "Results History":
+    st.header("🗂️ مێژووی ئەنجامەکان")
+    # تەنها خوێندنەوە لە SQLite؛ هیچ شتێک دووبارە حیساب ناکرێتەوە
+    store = get_results_store()
+    if store is None:
+        st.warning("کۆگای ئەنجامەکان کوژاوەتەوە ([RESULTS_STORE] ENABLED).")
+    else:
+        col1, col2 = st.columns(2)
+        history_symbol = col1.text_input("دراو (بەتاڵ = هەموو دراوەکان)", symbols_list[0]).strip().upper()
+        history_days = col2.number_input("ماوە (ڕۆژ)", min_value=1, max_value=3650, value=30)
+        since = pd.Timestamp.now(tz='UTC') - pd.Timedelta(days=int(history_days))
+
+        signal_history = store.signal_history(history_symbol or None, since=since)
+        st.subheader(f"📈 سیگناڵەکان ({len(signal_history)})")
+        if signal_history.empty:
+            st.info("هیچ سیگناڵێک لەم ماوەیەدا هەڵنەگیراوە.")
+        else:
+            if history_symbol:
+                st.line_chart(signal_history.set_index('created_at')['total_score'])
+            st.dataframe(signal_history, use_container_width=True)
+
+        st.subheader("🔬 تاقیکردنەوە هەڵگیراوەکان")
+        backtest_history = store.backtest_history(history_symbol or None, since=since)
+        if backtest_history.empty:
+            st.info("هیچ تاقیکردنەوەیەک لەم ماوەیەدا هەڵنەگیراوە.")
+        else:
+            st.dataframe(backtest_history.drop(columns=['settings']), use_container_width=True)
+
+        st.subheader("🔎 دوایین سکانەکان")
+        st.dataframe(store.scan_history(since=since, limit=100), use_container_width=True)
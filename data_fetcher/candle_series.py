@@ -0,0 +1,134 @@
+# data_fetcher/candle_series.py
+"""
+کۆگای بچووکی مۆمەکانی یەک دراو لە بیرگەدا: timestamp وەک int64ی میلی چرکە و OHLCV وەک
+arrayی NumPy ی float64 (یان float32). DataFrame تەنها کاتێک دروست دەکرێت کە پێویست بێت،
+ئەویش بەبێ کۆپیکردنی نرخەکان.
+"""
+import numpy as np
+import pandas as pd
+
+COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+
+class CandleSeries:
+    """
+    بافەرێکی بازنەیی بە تواناییەکی جێگیر (capacity): کاتێک پڕ دەبێت کۆنترین مۆمەکان لادەبرێن.
+
+    بافەرەکە `capacity + headroom` شوێنی هەیە و مۆمە نوێیەکان لە کۆتاییدا زیاد دەکرێن؛ تەنها
+    کاتێک کۆتایی بافەر پڕ دەبێت، دوایین مۆمەکان دەگوازرێنەوە بۆ سەرەتا. بۆیە timestamps و
+    هەر ستوونێکی values هەمیشە بەشێکی یەکگرتوون (contiguous) و بەبێ کۆپی دەگەڕێنرێنەوە.
+    """
+
+    def __init__(self, capacity=200, dtype=np.float64, headroom=None):
+        if capacity < 1:
+            raise ValueError("capacity دەبێت لانیکەم 1 بێت")
+        self.capacity = int(capacity)
+        self.dtype = np.dtype(dtype)
+        size = self.capacity + (self.capacity if headroom is None else int(headroom))
+        self._timestamps = np.empty(size, dtype=np.int64)
+        # ستوون بە ستوون (5, size)، بۆ ئەوەی close و هاوشێوەکانی یەکگرتوو بن
+        self._values = np.empty((len(COLUMNS), size), dtype=self.dtype)
+        self._start = 0
+        self._end = 0
+
+    @classmethod
+    def from_rows(cls, rows, capacity=None, dtype=np.float64, headroom=0):
+        """
+        زنجیرەیەک لە لیستی خاوی ccxt یان arrayی (n, 6) دروست دەکات.
+        بە شێوەی بنەڕەت capacity بە ئەندازەی rows و بێ شوێنی زیادە (بۆ DataFrameی یەکجاری).
+        """
+        rows = np.asarray(rows, dtype=np.float64).reshape(-1, 6)
+        series = cls(capacity or max(len(rows), 1), dtype=dtype, headroom=headroom)
+        series.extend(rows)
+        return series
+
+    def __len__(self):
+        return self._end - self._start
+
+    @property
+    def timestamps(self):
+        """timestampی مۆمەکان (int64، میلی چرکە) بەبێ کۆپی."""
+        return self._timestamps[self._start:self._end]
+
+    @property
+    def values(self):
+        """arrayی (5, n) ی open، high، low، close، volume بەبێ کۆپی."""
+        return self._values[:, self._start:self._end]
+
+    def column(self, name):
+        return self._values[COLUMNS.index(name), self._start:self._end]
+
+    @property
+    def close(self):
+        return self.column('close')
+
+    @property
+    def last_timestamp(self):
+        return int(self._timestamps[self._end - 1]) if len(self) else None
+
+    @property
+    def nbytes(self):
+        return self._timestamps.nbytes + self._values.nbytes
+
+    def extend(self, rows):
+        """
+        مۆمەکان (بە ڕیزبەندی کات) زیاد دەکات. مۆمێک کە timestampی وەک دوایین مۆم بێت جێگەی دەگرێتەوە
+        (مۆمی هێشتا نەداخراو) و مۆمی کۆنتر لە دوایین مۆم پشتگوێ دەخرێت.
+
+        ئاگاداری: DataFrame ـە بێ کۆپییەکانی to_frame دوای extend لەوانەیە بگۆڕێن.
+
+        :return: ژمارەی مۆمە نوێیەکان (بەبێ نوێکردنەوەی دوایین مۆم).
+        """
+        rows = np.asarray(rows, dtype=np.float64).reshape(-1, 6)
+        timestamps = rows[:, 0].astype(np.int64)
+        last = self.last_timestamp
+        if last is not None and len(rows):
+            newer = timestamps >= last
+            rows, timestamps = rows[newer], timestamps[newer]
+            if len(rows) and timestamps[0] == last:
+                self._values[:, self._end - 1] = rows[0, 1:]
+                rows, timestamps = rows[1:], timestamps[1:]
+
+        count = len(rows)
+        if not count:
+            return 0
+        if count >= self.capacity:
+            rows, timestamps = rows[-self.capacity:], timestamps[-self.capacity:]
+            self._start = self._end = 0
+        elif self._end + count > len(self._timestamps):
+            # گواستنەوەی دوایین مۆمەکان بۆ سەرەتای بافەر؛ تێچووەکەی بەسەر headroom دا دابەش دەبێت
+            keep = min(len(self), self.capacity - count)
+            self._timestamps[:keep] = self._timestamps[self._end - keep:self._end]
+            self._values[:, :keep] = self._values[:, self._end - keep:self._end]
+            self._start, self._end = 0, keep
+
+        end = self._end + len(rows)
+        self._timestamps[self._end:end] = timestamps
+        self._values[:, self._end:end] = rows[:, 1:].T
+        self._end = end
+        self._start = max(self._start, end - self.capacity)
+        return count
+
+    def rows(self):
+        """کۆپییەکی (n, 6) ی float64 بە هەمان فۆرماتی CandleStore و resampler."""
+        return np.column_stack((self.timestamps, self.values.T.astype(np.float64)))
+
+    def to_frame(self, copy=False, until=None):
+        """
+        DataFrame بە هەمان ستوونەکانی ExchangeHandler (timestamp بە UTC). ستوونەکانی نرخ
+        viewن بۆ ناو بافەر مەگەر copy=True بێت؛ تەنها ستوونی timestamp دروست دەکرێت.
+
+        :param until: تەنها مۆمەکان تا ئەم timestampە (بۆ نموونە دوایین مۆمی داخراو).
+        """
+        timestamps, values = self.timestamps, self.values.T
+        if until is not None:
+            count = int(np.searchsorted(timestamps, until, side='right'))
+            timestamps, values = timestamps[:count], values[:count]
+        df = pd.DataFrame(values.copy() if copy else values, columns=list(COLUMNS), copy=False)
+        df.insert(0, 'timestamp', pd.to_datetime(timestamps, unit='ms', utc=True))
+        return df
+
+
+def rows_to_frame(rows):
+    """لیستی خاوی ccxt یان arrayی (n, 6) بۆ DataFrame، بەبێ گواستنەوەی ڕیز بە ڕیزی pandas."""
+    return CandleSeries.from_rows(rows).to_frame()
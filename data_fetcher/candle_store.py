@@ -0,0 +1,125 @@
+# data_fetcher/candle_store.py
+import os
+import threading
+from collections import defaultdict
+
+import numpy as np
+
+from utils.atomic_file import atomic_write
+
+# ڕیزبەندی ستوونەکان لە هەر فایلێکدا: timestamp (میلی چرکە)، open، high، low، close، volume
+COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+# قفڵێک بۆ هەر فایلێک (لە هەموو CandleStore ـەکانی پرۆسەکەدا)، بۆ ئەوەی دوو merge ی هاوکات
+# مۆمەکانی یەکتر ون نەکەن (خوێندنەوە + نووسین)
+_path_locks = defaultdict(threading.Lock)
+_path_locks_guard = threading.Lock()
+
+
+def _path_lock(path):
+    with _path_locks_guard:
+        return _path_locks[path]
+
+
+class CandleStore:
+    """
+    کۆگای ناوخۆیی مۆمەکان لەسەر دیسک، بە کلیلی (exchange, symbol, timeframe).
+    هەر زنجیرەیەک وەک arrayی float64 ی (n, 6) لە فایلێکی .npy پاشەکەوت دەکرێت
+    و بە memory-map دەخوێنرێتەوە، بۆیە خوێندنەوە پێویستی بە هێنانی هەموو فایلەکە نییە.
+    """
+
+    def __init__(self, root_dir):
+        self.root_dir = root_dir
+        os.makedirs(root_dir, exist_ok=True)
+
+    def _path(self, exchange_id, symbol, timeframe):
+        safe_symbol = symbol.replace('/', '-').replace(':', '_')
+        return os.path.join(self.root_dir, exchange_id, safe_symbol, f"{timeframe}.npy")
+
+    def load(self, exchange_id, symbol, timeframe):
+        """
+        مۆمە هەڵگیراوەکان دەگەڕێنێتەوە (read-only memmap) یان None ئەگەر هیچ نەبێت.
+        """
+        path = self._path(exchange_id, symbol, timeframe)
+        if not os.path.exists(path):
+            return None
+        try:
+            return np.load(path, mmap_mode='r')
+        except (OSError, ValueError) as e:
+            print(f"⚠️ فایلی مۆمەکان تێکچووە ({path}): {e}")
+            return None
+
+    def merge(self, exchange_id, symbol, timeframe, rows):
+        """
+        مۆمە نوێیەکان تێکەڵ بە داتای هەڵگیراو دەکات، دووبارەکان لادەبات (نوێترین وەشان دەمێنێتەوە)
+        و بە ڕیزبەندی کات پاشەکەوتی دەکات.
+
+        :param rows: لیستی [timestamp, open, high, low, close, volume] وەک ccxt.
+        :return: هەموو زنجیرەکە وەک arrayی (n, 6).
+        """
+        with _path_lock(self._path(exchange_id, symbol, timeframe)):
+            return self._merge(exchange_id, symbol, timeframe, rows)
+
+    def _merge(self, exchange_id, symbol, timeframe, rows):
+        stored = self.load(exchange_id, symbol, timeframe)
+        if not rows:
+            return stored if stored is not None else np.empty((0, len(COLUMNS)))
+
+        new_rows = np.asarray(rows, dtype=np.float64).reshape(-1, len(COLUMNS))
+        combined = new_rows if stored is None else np.concatenate([np.asarray(stored), new_rows])
+
+        # np.unique یەکەم دەرکەوتن هەڵدەگرێت، بۆیە arrayەکە پێچەوانە دەکەینەوە تا نوێترین بمێنێتەوە
+        reversed_rows = combined[::-1]
+        _, first_index = np.unique(reversed_rows[:, 0], return_index=True)
+        merged = reversed_rows[first_index]
+
+        # فایلی کاتیی ناوازە، بۆیە چەند threadێک (سکانی هاوکات) هەمان فایل تێکنادەن
+        with atomic_write(self._path(exchange_id, symbol, timeframe), binary=True) as f:
+            np.save(f, merged)
+        return merged
+
+    @staticmethod
+    def find_gaps(candles, timeframe_ms, since=None):
+        """
+        بۆشاییەکانی نێو زنجیرەکە دەدۆزێتەوە.
+        :return: لیستی (کاتی یەکەم مۆمی ونبوو، کاتی مۆمی دواتری بەردەست).
+        """
+        if candles is None or len(candles) < 2:
+            return []
+        timestamps = np.asarray(candles[:, 0], dtype=np.int64)
+        if since is not None:
+            timestamps = timestamps[timestamps >= since]
+        gap_index = np.nonzero(np.diff(timestamps) > timeframe_ms)[0]
+        return [(int(timestamps[i]) + timeframe_ms, int(timestamps[i + 1])) for i in gap_index]
+
+    def missing_ranges(self, candles, timeframe_ms, limit, now_ms):
+        """
+        ئەو بەشانەی دوایین `limit` مۆم کە هێشتا ونن.
+        :return: setی ('head', یەکەم کات) بۆ مێژووی کورت و ('gap', سەرەتای بۆشایی) بۆ بۆشاییەکان.
+        """
+        window_start = (now_ms // timeframe_ms - (limit - 1)) * timeframe_ms
+        if candles is None or len(candles) == 0:
+            return {('head', None)}
+
+        missing = set()
+        if int(candles[0, 0]) > window_start:
+            missing.add(('head', int(candles[0, 0])))
+        for gap_start, _ in self.find_gaps(candles, timeframe_ms, since=window_start):
+            missing.add(('gap', gap_start))
+        return missing
+
+    def plan_top_up(self, candles, timeframe_ms, limit, now_ms, known_missing=()):
+        """
+        دیاری دەکات لە چ کاتێکەوە پێویستە داتا لە ئیکسچەینج بهێنرێت بۆ ئەوەی دوایین `limit` مۆم تەواو بن.
+        دوایین مۆمی هەڵگیراو هەمیشە دووبارە دەهێنرێتەوە چونکە لەوانەیە هێشتا دانەخرابێت.
+
+        :param known_missing: ئەو بەشانەی پێشتر داواکراون و ئیکسچەینج داتای بۆیان نییە.
+        """
+        window_start = (now_ms // timeframe_ms - (limit - 1)) * timeframe_ms
+        if candles is None or len(candles) == 0:
+            return window_start
+
+        since = int(candles[-1, 0])
+        for kind, timestamp in self.missing_ranges(candles, timeframe_ms, limit, now_ms) - set(known_missing):
+            since = min(since, window_start if kind == 'head' else timestamp)
+        return since
@@ -1,34 +1,418 @@
 # data_fetcher/exchange_handler.py
-import ccxt
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
+from .candle_series import rows_to_frame
+from .candle_store import CandleStore
+from utils.atomic_file import atomic_write
+from utils.config_loader import load_config
+from utils.metrics import get_metrics
+
+# زۆرترین ژمارەی مۆم لە یەک داواکاریدا کاتێک لە `since`ەوە پەڕە بە پەڕە دەهێنین
+PAGE_LIMIT = 1000
+# ئەو methodانەی ccxt کە وەک داواکاری API دەژمێردرێن (بڕوانە utils/metrics.py)
+EXCHANGE_API_METHODS = ('fetch_', 'load_markets')
 
 class ExchangeHandler:
-    def __init__(self, exchange_id):
+    # live: ڕاستەوخۆ لە ئیکسچەینج؛ record/replay بڕوانە data_fetcher/replay_handler.py
+    mode = 'live'
+
+    def __init__(self, exchange_id, candle_store_dir=None):
+        self.exchange_id = exchange_id
+        # کلاینتی async بۆ هەر event loopێک جیایە (هەر سکانێکی هاوکات loopی خۆی هەیە)
+        self._async_exchanges = {}
+        # کلاینتی ccxt تەنها لە یەکەم داواکاریدا دروست دەکرێت (بڕوانە exchange)
+        self._exchange = None
+        self._exchange_lock = threading.Lock()
+        self.metrics = get_metrics()
+        # دڵنیابوونەوە لەوەی ئیکسچەینجەکە پشتگیری دەکرێت
+        self.supported = exchange_id in ['binance', 'kucoin', 'okx']
+        if not self.supported:
+            print(f"❌ هەڵە لە بەستنەوە بە ئیکسچەینج: ئیکسچەینجی {exchange_id} پشتگیری ناکرێت.")
+
+        # کۆگای ناوخۆیی مۆمەکان (ئەگەر لە config دیاری کرابێت)
+        if candle_store_dir is None:
+            candle_store_dir = load_config().get('DATA_STORE', 'CANDLE_STORE_DIR', fallback='')
+        self.candle_store = CandleStore(candle_store_dir) if candle_store_dir else None
+        # ئەو بەشانەی کە داواکراون بەڵام ئیکسچەینج داتای بۆیان نییە، بۆ ئەوەی دووبارە داوا نەکرێنەوە
+        self._known_missing = {}
+        # بۆ ڕێزگرتن لە سنووری داواکاری کاتێک چەند thread بە هاوکاتی داوا دەنێرن
+        self._throttle_lock = threading.Lock()
+        self._last_request_time = 0.0
+
+    def _to_dataframe(self, ohlcv):
+        # گۆڕینی داتا بۆ Pandas DataFrame (بڕوانە data_fetcher/candle_series.py)
+        return rows_to_frame(ohlcv)
+
+    @property
+    def exchange(self):
+        """
+        کلاینتی ccxt. import ی ccxt و دروستکردنی کلاینت تا یەکەم بەکارهێنان دوادەخرێت،
+        بۆیە دروستکردنی ExchangeHandler (و سکانەر) خێرایە.
+        """
+        if self._exchange is None and self.supported:
+            with self._exchange_lock:
+                if self._exchange is None and self.supported:
+                    try:
+                        self._exchange = self.metrics.instrument(self._create_client(), 'exchange', EXCHANGE_API_METHODS)
+                        print(f"✅ بە سەرکەوتوویی بەسترایەوە بە {self._exchange.name}")
+                    except Exception as e:
+                        print(f"❌ هەڵە لە بەستنەوە بە ئیکسچەینج: {e}")
+                        self.supported = False
+        return self._exchange
+
+    @exchange.setter
+    def exchange(self, client):
+        self._exchange = client
+
+    def _create_client(self, asynchronous=False):
+        """کلاینتی ccxt (sync یان async) دروست دەکات. handlerە جێگرەوەکان (record/replay) ئەمە دەگۆڕن."""
+        if asynchronous:
+            import ccxt.async_support as ccxt_async
+            return getattr(ccxt_async, self.exchange_id)({'enableRateLimit': True})
+        import ccxt
+        return getattr(ccxt, self.exchange_id)()
+
+    def _timeframe_ms(self, timeframe):
+        import ccxt
+        return ccxt.Exchange.parse_timeframe(timeframe) * 1000
+
+    def _plan_top_up(self, symbol, timeframe, limit):
+        """مۆمە هەڵگیراوەکان و ئەو کاتەی کە پێویستە لێیەوە داتای نوێ بهێنرێت دەگەڕێنێتەوە."""
+        key = (symbol, timeframe)
+        stored = self.candle_store.load(self.exchange_id, symbol, timeframe)
+        since = self.candle_store.plan_top_up(
+            stored, self._timeframe_ms(timeframe), limit, self.exchange.milliseconds(),
+            self._known_missing.get(key, ()),
+        )
+        return since
+
+    def _store_top_up(self, symbol, timeframe, limit, rows):
+        """مۆمە نوێیەکان پاشەکەوت دەکات و دوایین `limit` مۆم وەک arrayی (n, 6) دەگەڕێنێتەوە."""
+        merged = self.candle_store.merge(self.exchange_id, symbol, timeframe, rows)
+        # hit = ئەو مۆمانەی لە کۆگاوە هاتن، miss = ئەوانەی لە ئیکسچەینج هێنران
+        self.metrics.cache('candle_store', hits=max(0, min(limit, len(merged)) - len(rows)), misses=len(rows))
+        if len(merged) == 0:
+            print(f"⚠️ هیچ داتایەک بۆ {symbol} لە {timeframe} نەدۆزرایەوە.")
+            return None
+        # هەر شتێک دوای هێنان هێشتا ون بێت، لە ئیکسچەینجیشدا بوونی نییە
+        missing = self.candle_store.missing_ranges(merged, self._timeframe_ms(timeframe), limit, self.exchange.milliseconds())
+        self._known_missing.setdefault((symbol, timeframe), set()).update(missing)
+        return merged[-limit:]
+
+    @property
+    def async_exchange(self):
+        """کلاینتی async ی event loopی ئێستا؛ لە یەکەم بەکارهێناندا دروست دەکرێت."""
+        loop = asyncio.get_running_loop()
+        if loop not in self._async_exchanges:
+            self._async_exchanges[loop] = self.metrics.instrument(
+                self._create_client(asynchronous=True), 'exchange', EXCHANGE_API_METHODS
+            )
+        return self._async_exchanges[loop]
+
+    def _is_caught_up(self, rows, timeframe):
+        return not rows or rows[-1][0] + self._timeframe_ms(timeframe) > self.exchange.milliseconds()
+
+    def fetch_ohlcv_since(self, symbol, timeframe, since):
+        """هەموو مۆمەکان لە `since`ەوە تا ئێستا پەڕە بە پەڕە دەهێنێت (لیستی خاوی ccxt)."""
+        rows = []
+        while True:
+            page = self.exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=PAGE_LIMIT)
+            rows.extend(page)
+            since = self._next_page_since(page, timeframe, since)
+            if since is None:
+                return rows
+
+    async def fetch_ohlcv_since_async(self, symbol, timeframe, since):
+        """وەشانی async ی fetch_ohlcv_since."""
+        rows = []
+        while True:
+            page = await self.async_exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=PAGE_LIMIT)
+            rows.extend(page)
+            since = self._next_page_since(page, timeframe, since)
+            if since is None:
+                return rows
+
+    def _next_page_since(self, page, timeframe, since):
+        """
+        `since` ی پەڕەی داهاتوو، یان None کاتێک پەڕەکە بەتاڵە، گەیشتووەتە ئێستا یان timestamp
+        پێشناکەوێت. پەڕەی کورت بەس نییە بۆ وەستان: زۆر ئیکسچەینج کەمتر لە PAGE_LIMIT دەگەڕێننەوە.
+        """
+        if not page or self._is_caught_up(page, timeframe):
+            return None
+        next_since = page[-1][0] + self._timeframe_ms(timeframe)
+        return next_since if next_since > since else None
+
+    def _throttle(self):
+        """دڵنیادەبێتەوە لەوەی نێوان دوو داواکاری لە rateLimitی ئیکسچەینج کەمتر نییە."""
+        interval = getattr(self.exchange, 'rateLimit', 0) / 1000
+        with self._throttle_lock:
+            wait = self._last_request_time + interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._last_request_time = time.monotonic()
+
+    def _fetch_page(self, symbol, timeframe, page_start, page_end):
+        """
+        هەموو مۆمەکانی [page_start, page_end) دەهێنێت. ئەگەر ئیکسچەینج کەمتر لە داواکراو بگەڕێنێتەوە
+        (بۆ نموونە سنووری 300 مۆم)، لە هەمان پەڕەدا بەردەوام دەبێت.
+        """
+        timeframe_ms = self._timeframe_ms(timeframe)
+        rows, since = [], page_start
+        while since < page_end:
+            self._throttle()
+            limit = min(PAGE_LIMIT, (page_end - since) // timeframe_ms)
+            # limit=0 لای هەندێک ئیکسچەینج واتە «بنەڕەت»، نەک هیچ
+            if limit <= 0:
+                break
+            page = self.exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=limit)
+            page = [row for row in page if since <= row[0] < page_end]
+            if not page:
+                break
+            rows.extend(page)
+            since = page[-1][0] + timeframe_ms
+        return rows
+
+    def _backfill_checkpoint_path(self, symbol, timeframe):
+        if self.candle_store is None:
+            return None
+        safe_symbol = symbol.replace('/', '-').replace(':', '_')
+        return os.path.join(self.candle_store.root_dir, '_backfill', f"{self.exchange_id}_{safe_symbol}_{timeframe}.json")
+
+    def backfill_ohlcv(self, symbol, timeframe, since, until=None, max_parallel=4, checkpoint_path=None):
+        """
+        مێژووی مۆمەکان لە `since`ەوە تا `until` (یان ئێستا) پەڕە بە پەڕە دەهێنێت و
+        هەر پەڕەیەک وەک DataFrameێک yield دەکات، بە ڕیزبەندی کات.
+
+        پەڕەکان بە هاوکاتی (تا max_parallel) دەهێنرێن بەڵام داواکارییەکان بە rateLimitی ئیکسچەینج
+        سنووردار دەکرێن. پێشکەوتن لە checkpoint_path پاشەکەوت دەکرێت (بە شێوەی بنەڕەت لەناو
+        کۆگای مۆمەکان) بۆ ئەوەی backfillی پچڕاو لە هەمان شوێنەوە بەردەوام بێت.
+
+        :param since: datetime، دەقی ISO یان میلی چرکە.
+        """
+        if not self.exchange:
+            return
+
+        timeframe_ms = self._timeframe_ms(timeframe)
+        since_ms = self._to_millis(since)
+        until_ms = self._to_millis(until) if until is not None else self.exchange.milliseconds()
+        checkpoint_path = checkpoint_path or self._backfill_checkpoint_path(symbol, timeframe)
+        page_span = PAGE_LIMIT * timeframe_ms
+
+        next_since = since_ms
+        checkpoint = self._read_checkpoint(checkpoint_path)
+        if checkpoint and checkpoint.get('symbol') == symbol and checkpoint.get('timeframe') == timeframe \
+                and checkpoint.get('since') == since_ms:
+            next_since = checkpoint['next_since']
+            print(f"↩️ بەردەوامبوونی backfill بۆ {symbol} لە {self._to_datetime(next_since)}")
+            # بەشی پێشتر هێنراو لە کۆگای ناوخۆییەوە دەخوێنرێتەوە
+            if self.candle_store is not None and next_since > since_ms:
+                stored = self.candle_store.load(self.exchange_id, symbol, timeframe)
+                if stored is not None:
+                    stored = stored[(stored[:, 0] >= since_ms) & (stored[:, 0] < next_since)]
+                    if len(stored):
+                        yield self._to_dataframe(stored)
+
+        page_starts = list(range(next_since, until_ms + 1, page_span))
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=max(1, max_parallel)) as executor:
+            for page_start in page_starts:
+                pending.append((page_start, executor.submit(self._fetch_page, symbol, timeframe, page_start, page_start + page_span)))
+                # تەنها چەند پەڕەیەکی کەم لە پێشەوە دەهێنرێن بۆ ئەوەی بیرگە سنووردار بێت
+                if len(pending) < max_parallel * 2:
+                    continue
+                yield from self._drain_backfill_page(pending.popleft(), symbol, timeframe, since_ms, checkpoint_path)
+            while pending:
+                yield from self._drain_backfill_page(pending.popleft(), symbol, timeframe, since_ms, checkpoint_path)
+
+        # backfill تەواو بوو، checkpoint پێویست نییە
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+
+    def fetch_history(self, symbol, timeframe, since, until=None, max_parallel=4):
+        """
+        هەموو مێژووی backfill_ohlcv وەک یەک DataFrame (بە ڕیزبەندی کات و بێ مۆمی دووبارە).
+        وەک fetch_ohlcv_data هەڵە تۆمار دەکات و None دەگەڕێنێتەوە؛ پەڕە هێنراوەکان لە checkpoint
+        دەمێننەوە، بۆیە هەوڵی داهاتوو لەوێوە بەردەوام دەبێت.
+        :return: DataFrame یان None.
+        """
         try:
-            # دڵنیابوونەوە لەوەی ئیکسچەینجەکە پشتگیری دەکرێت
-            if exchange_id not in ['binance', 'kucoin', 'okx']:
-                raise ValueError(f"ئیکسچەینجی {exchange_id} پشتگیری ناکرێت.")
-            
-            self.exchange = getattr(ccxt, exchange_id)()
-            print(f"✅ بە سەرکەوتوویی بەسترایەوە بە {self.exchange.name}")
+            chunks = [chunk for chunk in self.backfill_ohlcv(symbol, timeframe, since, until, max_parallel=max_parallel)
+                      if not chunk.empty]
         except Exception as e:
-            print(f"❌ هەڵە لە بەستنەوە بە ئیکسچەینج: {e}")
-            self.exchange = None
+            print(f"❌ هەڵە لە کاتی هێنانی مێژووی {symbol}: {e}")
+            return None
+        if not chunks:
+            return None
+        history = pd.concat(chunks, ignore_index=True)
+        return history.drop_duplicates('timestamp', keep='last').sort_values('timestamp', ignore_index=True)
 
-    def fetch_ohlcv_data(self, symbol, timeframe='4h', limit=200):
+    def _drain_backfill_page(self, pending_page, symbol, timeframe, since_ms, checkpoint_path):
+        page_start, future = pending_page
+        try:
+            rows = future.result()
+        except Exception as e:
+            print(f"❌ هەڵە لە backfillی {symbol} لە {self._to_datetime(page_start)}: {e}")
+            raise
+
+        if rows:
+            if self.candle_store is not None:
+                self.candle_store.merge(self.exchange_id, symbol, timeframe, rows)
+            yield self._to_dataframe(rows)
+
+        page_end = page_start + PAGE_LIMIT * self._timeframe_ms(timeframe)
+        self._write_checkpoint(checkpoint_path, {'symbol': symbol, 'timeframe': timeframe, 'since': since_ms, 'next_since': page_end})
+
+    def _read_checkpoint(self, path):
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_checkpoint(self, path, checkpoint):
+        if not path:
+            return
+        with atomic_write(path) as f:
+            json.dump(checkpoint, f)
+
+    @staticmethod
+    def _to_millis(value):
+        if isinstance(value, (int, float)):
+            return int(value)
+        timestamp = pd.Timestamp(value)
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.tz_localize('UTC')
+        return int(timestamp.value // 1_000_000)
+
+    @staticmethod
+    def _to_datetime(millis):
+        return pd.to_datetime(millis, unit='ms', utc=True)
+
+    def fetch_ohlcv_rows(self, symbol, timeframe='4h', limit=200):
+        """
+        دوایین `limit` مۆم وەک مۆمی خاو (لیستی ccxt یان arrayی (n, 6)) بەبێ دروستکردنی DataFrame.
+        :return: مۆمەکان یان None.
+        """
         if not self.exchange:
             return None
         try:
+            if self.candle_store is not None:
+                # تەنها ئەو مۆمانە دەهێنین کە لە کۆگای ناوخۆییدا نین
+                since = self._plan_top_up(symbol, timeframe, limit)
+                rows = self.fetch_ohlcv_since(symbol, timeframe, since)
+                return self._store_top_up(symbol, timeframe, limit, rows)
+
             # هێنانی داتای مێژوویی
             ohlcv = self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
             if not ohlcv:
                 print(f"⚠️ هیچ داتایەک بۆ {symbol} لە {timeframe} نەدۆزرایەوە.")
                 return None
-            
-            # گۆڕینی داتا بۆ Pandas DataFrame
-            df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms', utc=True)
-            return df
+
+            return ohlcv
+        except Exception as e:
+            print(f"❌ هەڵە لە کاتی هێنانی داتا بۆ {symbol}: {e}")
+            return None
+
+    async def fetch_ohlcv_rows_async(self, symbol, timeframe='4h', limit=200):
+        """وەشانی async ی fetch_ohlcv_rows بە بەکارهێنانی ccxt.async_support."""
+        if not self.exchange:
+            return None
+        try:
+            if self.candle_store is not None:
+                since = self._plan_top_up(symbol, timeframe, limit)
+                rows = await self.fetch_ohlcv_since_async(symbol, timeframe, since)
+                return self._store_top_up(symbol, timeframe, limit, rows)
+
+            ohlcv = await self.async_exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+            if not ohlcv:
+                print(f"⚠️ هیچ داتایەک بۆ {symbol} لە {timeframe} نەدۆزرایەوە.")
+                return None
+
+            return ohlcv
+        except Exception as e:
+            print(f"❌ هەڵە لە کاتی هێنانی داتا بۆ {symbol}: {e}")
+            return None
+
+    def fetch_ohlcv_data(self, symbol, timeframe='4h', limit=200):
+        rows = self.fetch_ohlcv_rows(symbol, timeframe, limit)
+        return self._to_dataframe(rows) if rows is not None else None
+
+    async def fetch_ohlcv_data_async(self, symbol, timeframe='4h', limit=200):
+        """
+        وەشانی async ی fetch_ohlcv_data بە بەکارهێنانی ccxt.async_support.
+        هەمان شێوازی گەڕاندنەوە (DataFrame یان None) بەکاردەهێنێت.
+        """
+        rows = await self.fetch_ohlcv_rows_async(symbol, timeframe, limit)
+        return self._to_dataframe(rows) if rows is not None else None
+
+    async def update_series_async(self, symbol, timeframe, series):
+        """
+        CandleSeriesێک نوێ دەکاتەوە: یەکەم جار (یان دوای بۆشایی درێژتر لە capacity) دوایین
+        capacity مۆم دەهێنرێت، دواتر تەنها لە دوایین مۆمی هەڵگیراوەوە تا ئێستا.
+
+        :return: ژمارەی مۆمە نوێیەکان، یان None ئەگەر هێنان سەرکەوتوو نەبێت.
+        """
+        if not self.exchange:
+            return None
+        last = series.last_timestamp
+        try:
+            timeframe_ms = self._timeframe_ms(timeframe)
+            if last is None or self.candle_store is not None \
+                    or self.exchange.milliseconds() - last > series.capacity * timeframe_ms:
+                rows = await self.fetch_ohlcv_rows_async(symbol, timeframe, series.capacity)
+            else:
+                rows = await self.fetch_ohlcv_since_async(symbol, timeframe, last)
         except Exception as e:
             print(f"❌ هەڵە لە کاتی هێنانی داتا بۆ {symbol}: {e}")
-            return None
\ No newline at end of file
+            return None
+        if rows is None or len(rows) == 0:
+            return None
+        return series.extend(rows)
+
+    def fetch_ticker(self, symbol):
+        """دوایین نرخ و قەبارەی 24 کاتژمێری دراوێک (dictی ccxt) یان None."""
+        if not self.exchange:
+            return None
+        try:
+            return self.exchange.fetch_ticker(symbol)
+        except Exception as e:
+            print(f"❌ هەڵە لە هێنانی ticker بۆ {symbol}: {e}")
+            return None
+
+    def fetch_tickers(self, symbols=None):
+        """tickerی چەند دراوێک (یان هەموو بازاڕ) بە یەک داواکاری؛ dictی {symbol: ticker}."""
+        if not self.exchange:
+            return {}
+        try:
+            return self.exchange.fetch_tickers(symbols)
+        except Exception as e:
+            print(f"❌ هەڵە لە هێنانی tickerەکان: {e}")
+            return {}
+
+    def load_markets(self):
+        """هەموو بازاڕەکانی ئیکسچەینج (dictی {symbol: market} ی ccxt)؛ ccxt ئەنجامەکە کاش دەکات."""
+        if not self.exchange:
+            return {}
+        try:
+            return self.exchange.load_markets()
+        except Exception as e:
+            print(f"❌ هەڵە لە هێنانی لیستی بازاڕەکان: {e}")
+            return {}
+
+    def close(self):
+        """لە کۆتایی سکاندا بانگ دەکرێت؛ handlerە جێگرەوەکان (record) فایلەکانیان لێرە دادەخەن."""
+
+    async def close_async(self):
+        """کلاینتی async دادەخات. پێویستە لە کۆتایی هەمان event loop بانگ بکرێت."""
+        async_exchange = self._async_exchanges.pop(asyncio.get_running_loop(), None)
+        if async_exchange is not None:
+            await async_exchange.close()
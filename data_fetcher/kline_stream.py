@@ -0,0 +1,179 @@
+# data_fetcher/kline_stream.py
+"""
+وەرگرتنی مۆمەکان بە websocket (kline stream) لە جیاتی poll کردنی REST. مۆمەکان ڕاستەوخۆ دەخرێنە
+سەر CandleSeries ـی هەر دراوێک و کاتێک مۆمێک دادەخرێت on_close بانگ دەکرێت. REST تەنها بۆ
+پڕکردنەوەی سەرەتا و بۆشاییەکان (دوای پچڕانی پەیوەندی یان مۆمی ون) بەکاردێت.
+
+ئێستا تەنها فۆرماتی Binance پشتگیری دەکرێت؛ بۆ تاقیکردنەوە بڕوانە benchmarks/kline_server.py.
+"""
+import asyncio
+import json
+
+from .candle_series import CandleSeries
+
+STREAM_URLS = {
+    'binance': 'wss://stream.binance.com:9443/stream',
+}
+# Binance تا 1024 stream لە یەک پەیوەندیدا ڕێگە دەدات
+STREAMS_PER_CONNECTION = 200
+MAX_RECONNECT_DELAY = 30
+
+
+def stream_supported(exchange_id):
+    return exchange_id in STREAM_URLS
+
+
+def stream_id(symbol):
+    """'BTC/USDT' -> 'BTCUSDT' (هەمان ناوی k.s لە پەیامەکانی Binance)."""
+    return symbol.replace('/', '').upper()
+
+
+def parse_kline(message):
+    """
+    پەیامی kline ی Binance (combined stream یان stream ی تاک) دەخوێنێتەوە.
+    :return: Tuple(stream_id, row, closed) یان None ئەگەر پەیامەکە kline نەبێت.
+    """
+    data = message.get('data', message)
+    kline = data.get('k') if isinstance(data, dict) else None
+    if not kline:
+        return None
+    row = [int(kline['t']), float(kline['o']), float(kline['h']), float(kline['l']), float(kline['c']), float(kline['v'])]
+    return kline['s'], row, bool(kline['x'])
+
+
+class KlineStream:
+    """
+    پەیوەندی websocket بۆ klineی دراوەکان. هەر STREAMS_PER_CONNECTION دراوێک پەیوەندییەکی جیایان
+    هەیە و هەر پەیوەندییەک بە شێوەی سەربەخۆ دووبارە دەبەستێتەوە (بە دواخستنی زیادبوو تا 30 چرکە).
+    """
+
+    def __init__(self, exchange_handler, symbols, timeframe, on_close=None, series=None, url=None,
+                 capacity=200, dtype='float64', streams_per_connection=STREAMS_PER_CONNECTION, concurrency=8):
+        self.exchange_handler = exchange_handler
+        self.symbols = list(symbols)
+        self.timeframe = timeframe
+        self.timeframe_ms = exchange_handler._timeframe_ms(timeframe)
+        self.on_close = on_close
+        self.url = url or STREAM_URLS.get(exchange_handler.exchange_id)
+        self.streams_per_connection = streams_per_connection
+        self.concurrency = concurrency
+        # هەمان dict ی series ـی daemon، بۆیە هەردووکیان هەمان بافەرەکان دەبینن
+        self.series = series if series is not None else {}
+        for symbol in self.symbols:
+            if symbol not in self.series:
+                self.series[symbol] = CandleSeries(capacity, dtype=dtype)
+        self._symbols_by_id = {stream_id(symbol): symbol for symbol in self.symbols}
+        self.last_closed = {}   # symbol -> timestampی دوایین مۆمی داخراو
+        self._sockets = set()
+        self._stopping = False
+        self.stats = {'messages': 0, 'closes': 0, 'reconnects': 0, 'recoveries': 0}
+
+    def _connection_url(self, symbols):
+        streams = "/".join(f"{stream_id(symbol).lower()}@kline_{self.timeframe}" for symbol in symbols)
+        return f"{self.url}?streams={streams}"
+
+    async def recover(self, symbols):
+        """
+        مۆمە ونبووەکان بە REST دەهێنێت (update_series_async لە دوایین مۆمی هەڵگیراوەوە).
+        :return: ئەو دراوانەی کە مۆمێکی نوێیان لەم ماوەیەدا داخراوە.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def update(symbol):
+            async with semaphore:
+                return await self.exchange_handler.update_series_async(symbol, self.timeframe, self.series[symbol])
+
+        await asyncio.gather(*(update(symbol) for symbol in symbols))
+        self.stats['recoveries'] += 1
+
+        closed = []
+        for symbol in symbols:
+            timestamps = self.series[symbol].timestamps
+            # دوایین مۆمی REST هێشتا کراوەیە؛ ئەوەی پێش ئەو داخراوە
+            if len(timestamps) < 2:
+                continue
+            newest_closed = int(timestamps[-2])
+            previous = self.last_closed.get(symbol)
+            self.last_closed[symbol] = max(newest_closed, previous or newest_closed)
+            if previous is not None and newest_closed > previous:
+                closed.append(symbol)
+        return closed
+
+    def _notify(self, symbols):
+        self.stats['closes'] += len(symbols)
+        if self.on_close:
+            for symbol in symbols:
+                self.on_close(symbol, self.series[symbol])
+
+    async def handle_message(self, message):
+        parsed = parse_kline(message)
+        if parsed is None:
+            return
+        symbol = self._symbols_by_id.get(parsed[0])
+        if symbol is None:
+            return
+        _, row, closed = parsed
+        self.stats['messages'] += 1
+
+        series = self.series[symbol]
+        last = series.last_timestamp
+        # مۆمێک یان زیاتر لە نێوان دوایین مۆمی هەڵگیراو و ئەم پەیامەدا ون بووە
+        if last is not None and row[0] > last + self.timeframe_ms:
+            print(f"🩹 بۆشایی لە streamی {symbol}؛ مۆمە ونبووەکان لە REST دەهێنرێن.")
+            self._notify(await self.recover([symbol]))
+        elif last is not None and row[0] > last and self.last_closed.get(symbol, last) < last:
+            # پەیامی x=true ی مۆمی پێشوو نەگەیشت، بەڵام مۆمی نوێ دەستیپێکردووە
+            self.last_closed[symbol] = last
+            self._notify([symbol])
+        series.extend([row])
+
+        if closed and row[0] > self.last_closed.get(symbol, -1):
+            self.last_closed[symbol] = row[0]
+            self._notify([symbol])
+
+    async def _run_connection(self, session, symbols):
+        import aiohttp
+
+        delay, connected_before = 1, False
+        while not self._stopping:
+            try:
+                async with session.ws_connect(self._connection_url(symbols), heartbeat=30) as ws:
+                    self._sockets.add(ws)
+                    try:
+                        if connected_before:
+                            # هەر شتێک لە ماوەی پچڕاندا داخرابێت لە REST دەهێنرێت
+                            self.stats['reconnects'] += 1
+                            self._notify(await self.recover(symbols))
+                        connected_before, delay = True, 1
+                        async for msg in ws:
+                            if msg.type == aiohttp.WSMsgType.TEXT:
+                                await self.handle_message(json.loads(msg.data))
+                            elif msg.type in (aiohttp.WSMsgType.ERROR, aiohttp.WSMsgType.CLOSED):
+                                break
+                    finally:
+                        self._sockets.discard(ws)
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+                print(f"❌ هەڵە لە پەیوەندی stream: {e}")
+            if self._stopping:
+                break
+            print(f"🔌 پەیوەندی stream پچڕا؛ دووبارە بەستنەوە دوای {delay} چرکە...")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    async def run(self):
+        """سەرەتا مۆمەکان بە REST پڕ دەکاتەوە، پاشان تا stop() گوێ لە streamەکان دەگرێت."""
+        import aiohttp
+
+        if not self.url:
+            raise ValueError(f"stream بۆ {self.exchange_handler.exchange_id} پشتگیری ناکرێت")
+        await self.recover(self.symbols)
+        chunks = [self.symbols[i:i + self.streams_per_connection]
+                  for i in range(0, len(self.symbols), self.streams_per_connection)]
+        print(f"📡 stream دەستیپێکرد | {len(self.symbols)} دراو | {len(chunks)} پەیوەندی")
+        async with aiohttp.ClientSession() as session:
+            await asyncio.gather(*(self._run_connection(session, chunk) for chunk in chunks))
+
+    async def stop(self):
+        self._stopping = True
+        for ws in list(self._sockets):
+            await ws.close()
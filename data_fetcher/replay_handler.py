@@ -0,0 +1,300 @@
+# data_fetcher/replay_handler.py
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+
+from .exchange_handler import ExchangeHandler
+from utils.config_loader import load_config
+
+# ئەو داواکارییانەی ccxt کە تۆمار دەکرێن؛ هەموو شتێکی تر ڕاستەوخۆ دەچێتە کلاینتی ڕاستەقینە
+RECORDED_METHODS = ('fetch_ohlcv', 'fetch_ticker', 'fetch_tickers', 'load_markets')
+
+
+class ReplayMissError(Exception):
+    """وەڵامێک بۆ ئەم داواکارییە لە tape دا تۆمار نەکراوە."""
+
+
+class RecordedExchangeError(Exception):
+    """هەڵەیەکی تۆمارکراو کە لە کاتی replay دا دووبارە دەکرێتەوە."""
+
+
+def _request_key(method, args, kwargs):
+    return json.dumps([method, list(args), sorted(kwargs.items())], default=str)
+
+
+class ExchangeTape:
+    """
+    فایلی JSON Lines ی داواکارییەکانی ئیکسچەینج. هەر دێڕێک یەک داواکارییە: ناوی method،
+    ئارگیومێنتەکان، کاتی ئیکسچەینج (now)، ماوە لە سەرەتای دانیشتنەوە (t) و وەڵام یان هەڵە.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+        self._started = None
+        # بۆ replay
+        self._queues = defaultdict(deque)
+        self._candles = defaultdict(dict)   # (symbol, timeframe) -> {timestamp: row}
+        self._tickers = {}
+        self.clock = None
+        self.replay_started = None
+
+    # --- تۆمارکردن ---
+
+    def record(self, method, args, kwargs, now, response=None, error=None):
+        entry = {'method': method, 'args': list(args), 'kwargs': kwargs, 'now': now}
+        if error is not None:
+            entry['error'] = f"{type(error).__name__}: {error}"
+        else:
+            entry['response'] = response
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                # هەر دانیشتنێکی record tapeێکی نوێ دەنووسێت؛ دوای close() (کۆتایی سکان) درێژە پێدەدرێت
+                self._file = open(self.path, 'w' if self._started is None else 'a', encoding='utf-8')
+                if self._started is None:
+                    self._started = time.monotonic()
+            entry['t'] = round(time.monotonic() - self._started, 4)
+            self._file.write(json.dumps(entry, default=str) + "\n")
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    # --- replay ---
+
+    def load(self):
+        """tape دەخوێنێتەوە؛ :return: ژمارەی داواکارییە تۆمارکراوەکان."""
+        count = 0
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                count += 1
+                self._queues[_request_key(entry['method'], entry['args'], entry['kwargs'])].append(entry)
+                if self.clock is None:
+                    self.clock = entry['now']
+                self._index(entry)
+        return count
+
+    def _index(self, entry):
+        """هەموو مۆم و tickerە تۆمارکراوەکان کۆدەکرێنەوە بۆ وەڵامدانەوەی داواکاری نەناسراو."""
+        response = entry.get('response')
+        if entry['method'] == 'fetch_ohlcv' and response:
+            symbol = entry['args'][0] if entry['args'] else entry['kwargs'].get('symbol')
+            timeframe = entry['args'][1] if len(entry['args']) > 1 else entry['kwargs'].get('timeframe', '1m')
+            self._candles[(symbol, timeframe)].update((row[0], row) for row in response)
+        elif entry['method'] == 'fetch_ticker' and response:
+            self._tickers[response.get('symbol')] = response
+        elif entry['method'] == 'fetch_tickers' and response:
+            self._tickers.update(response)
+
+    def next(self, method, args, kwargs, speed):
+        """
+        وەڵامی داهاتووی هەمان داواکاری و ماوەی چاوەڕوانی (بۆ خێرایی speed) دەگەڕێنێتەوە.
+        داواکاری دووبارە وەڵامە تۆمارکراوەکان بە ڕیزبەندی دەگەڕێنێتەوە.
+        """
+        with self._lock:
+            if self.replay_started is None:
+                self.replay_started = time.monotonic()
+            queue = self._queues.get(_request_key(method, args, kwargs))
+            if not queue:
+                return None, 0
+            entry = queue.popleft()
+            self.clock = max(self.clock or 0, entry['now'])
+            delay = 0
+            if speed:
+                delay = max(0, self.replay_started + entry['t'] / speed - time.monotonic())
+            return entry, delay
+
+    def remaining(self):
+        """ژمارەی ئەو داواکارییە تۆمارکراوانەی هێشتا replay نەکراون."""
+        with self._lock:
+            return sum(len(queue) for queue in self._queues.values())
+
+    def fallback(self, method, args, kwargs):
+        """
+        وەڵام بۆ داواکارییەک کە بە هەمان شێوە تۆمار نەکراوە: مۆمەکان لە کۆی هەموو مۆمە
+        تۆمارکراوەکانی هەمان دراو/تایمفرەیم (تا کاتی ئێستای replay)، و دوایین ticker.
+        """
+        if method == 'fetch_ohlcv':
+            call = dict(zip(('symbol', 'timeframe', 'since', 'limit'), args), **kwargs)
+            candles = self._candles.get((call['symbol'], call.get('timeframe', '1m')))
+            if not candles:
+                raise ReplayMissError(f"هیچ مۆمێک بۆ {call['symbol']} {call.get('timeframe')} تۆمار نەکراوە")
+            rows = [candles[ts] for ts in sorted(candles) if ts <= self.clock]
+            if call.get('since') is not None:
+                rows = [row for row in rows if row[0] >= int(call['since'])]
+                return rows[:call['limit']] if call.get('limit') else rows
+            return rows[-call['limit']:] if call.get('limit') else rows
+        if method == 'fetch_ticker':
+            symbol = args[0] if args else kwargs.get('symbol')
+            if symbol in self._tickers:
+                return self._tickers[symbol]
+        elif method == 'fetch_tickers' and self._tickers:
+            symbols = args[0] if args else kwargs.get('symbols')
+            return {s: t for s, t in self._tickers.items() if not symbols or s in symbols}
+        raise ReplayMissError(f"داواکاری {method}{tuple(args)} لە tape دا نییە")
+
+
+class RecordingClient:
+    """کلاینتی ccxt دەپێچێتەوە و وەڵامی RECORDED_METHODS لە tape دا دەنووسێت."""
+
+    def __init__(self, client, tape):
+        self._client = client
+        self._tape = tape
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if name not in RECORDED_METHODS:
+            return attr
+        tape, client = self._tape, self._client
+
+        if asyncio.iscoroutinefunction(attr):
+            async def recorded_async(*args, **kwargs):
+                now = client.milliseconds()
+                try:
+                    response = await attr(*args, **kwargs)
+                except Exception as e:
+                    tape.record(name, args, kwargs, now, error=e)
+                    raise
+                tape.record(name, args, kwargs, now, response=response)
+                return response
+            return recorded_async
+
+        def recorded(*args, **kwargs):
+            now = client.milliseconds()
+            try:
+                response = attr(*args, **kwargs)
+            except Exception as e:
+                tape.record(name, args, kwargs, now, error=e)
+                raise
+            tape.record(name, args, kwargs, now, response=response)
+            return response
+        return recorded
+
+
+class ReplayClient:
+    """جێگرەوەی کلاینتی ccxt کە وەڵامەکان لە tape دەخوێنێتەوە، بەبێ تۆڕ."""
+    rateLimit = 0
+
+    def __init__(self, tape, exchange_id, speed=0):
+        self._tape = tape
+        self.name = f"{exchange_id} (replay)"
+        self.speed = speed
+
+    def milliseconds(self):
+        # کاتی ئیکسچەینج لە کاتی تۆمارکردندا، نەک کاتی ئێستا
+        return self._tape.clock
+
+    def _result(self, entry, method, args, kwargs):
+        if entry is None:
+            return self._tape.fallback(method, args, kwargs)
+        if 'error' in entry:
+            raise RecordedExchangeError(entry['error'])
+        return entry['response']
+
+    def _call(self, method, *args, **kwargs):
+        entry, delay = self._tape.next(method, args, kwargs, self.speed)
+        if delay:
+            time.sleep(delay)
+        return self._result(entry, method, args, kwargs)
+
+    def fetch_ohlcv(self, *args, **kwargs):
+        return self._call('fetch_ohlcv', *args, **kwargs)
+
+    def fetch_ticker(self, *args, **kwargs):
+        return self._call('fetch_ticker', *args, **kwargs)
+
+    def fetch_tickers(self, *args, **kwargs):
+        return self._call('fetch_tickers', *args, **kwargs)
+
+    def load_markets(self, *args, **kwargs):
+        return self._call('load_markets', *args, **kwargs)
+
+
+class AsyncReplayClient(ReplayClient):
+    """وەشانی async ی ReplayClient؛ چاوەڕوانی کاتی تۆمارکراو بە asyncio.sleep دەکرێت."""
+
+    async def _call(self, method, *args, **kwargs):
+        entry, delay = self._tape.next(method, args, kwargs, self.speed)
+        if delay:
+            await asyncio.sleep(delay)
+        return self._result(entry, method, args, kwargs)
+
+    async def close(self):
+        pass
+
+
+class RecordingExchangeHandler(ExchangeHandler):
+    """
+    وەک ExchangeHandler کار دەکات بەڵام هەموو وەڵامەکانی OHLCV و ticker لە tape_path دا
+    تۆمار دەکات، بۆ ئەوەی دواتر بە ReplayExchangeHandler دووبارە بکرێنەوە.
+    """
+    mode = 'record'
+
+    def __init__(self, exchange_id, tape_path, candle_store_dir=None):
+        super().__init__(exchange_id, candle_store_dir)
+        self.tape = ExchangeTape(tape_path)
+        print(f"⏺️ داواکارییەکانی ئیکسچەینج تۆمار دەکرێن لە {tape_path}")
+
+    def _create_client(self, asynchronous=False):
+        return RecordingClient(super()._create_client(asynchronous), self.tape)
+
+    def close(self):
+        self.tape.close()
+
+
+class ReplayExchangeHandler(ExchangeHandler):
+    """
+    جێگرەوەی ExchangeHandler کە هیچ پەیوەندییەکی تۆڕی نییە: وەڵامەکان لە tapeێکی تۆمارکراو
+    دەخوێنێتەوە، هەمان گەڕاندنەوەی fetch_ohlcv_data (DataFrame یان None) بەکاردەهێنێت.
+
+    :param speed: 0 = بە خێرایی CPU؛ 1 = بە هەمان ماوەکانی کاتی تۆمارکردن؛ 10 = ده جار خێراتر.
+    """
+    mode = 'replay'
+
+    def __init__(self, exchange_id, tape_path, speed=0, candle_store_dir=None):
+        super().__init__(exchange_id, candle_store_dir)
+        self.speed = speed
+        self.tape = ExchangeTape(tape_path)
+        try:
+            count = self.tape.load()
+            print(f"⏯️ {count} داواکاری لە {tape_path} بارکران (خێرایی: {speed or 'بێ سنوور'})")
+        except (OSError, ValueError) as e:
+            print(f"❌ نەتوانرا tape بخوێنرێتەوە لە {tape_path}: {e}")
+            self.supported = False
+
+    def _create_client(self, asynchronous=False):
+        client_class = AsyncReplayClient if asynchronous else ReplayClient
+        return client_class(self.tape, self.exchange_id, self.speed)
+
+
+def create_exchange_handler(exchange_id, config=None, candle_store_dir=None):
+    """
+    ExchangeHandler بەپێی [EXCHANGE] MODE ی config دروست دەکات:
+    live (بنەڕەت)، record (تۆمارکردن لە TAPE_PATH) یان replay (دووبارەکردنەوە بە REPLAY_SPEED).
+    """
+    config = config or load_config()
+    mode = config.get('EXCHANGE', 'MODE', fallback='live').strip().lower()
+    if mode == 'live':
+        return ExchangeHandler(exchange_id, candle_store_dir)
+
+    cache_dir = config.get('DATA_STORE', 'CACHE_DIR', fallback='cache')
+    tape_path = config.get('EXCHANGE', 'TAPE_PATH', fallback=os.path.join(cache_dir, 'tapes', f"{exchange_id}.jsonl"))
+    if mode == 'record':
+        return RecordingExchangeHandler(exchange_id, tape_path, candle_store_dir)
+    if mode == 'replay':
+        speed = config.getfloat('EXCHANGE', 'REPLAY_SPEED', fallback=0)
+        return ReplayExchangeHandler(exchange_id, tape_path, speed, candle_store_dir)
+
+    print(f"⚠️ MODEی نەناسراو '{mode}' لە [EXCHANGE]؛ live بەکاردێت.")
+    return ExchangeHandler(exchange_id, candle_store_dir)
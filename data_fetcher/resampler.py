@@ -0,0 +1,90 @@
+# data_fetcher/resampler.py
+"""
+دروستکردنی تایمفرەیمی گەورەتر (4h، 1d، 1w) لە یەک زنجیرەی بنەڕەتی، بۆ ئەوەی بۆ هەر دراوێک
+تەنها یەک جار مۆم بهێنرێت هەرچەند تایمفرەیم بەکاربهێنرێت. زنجیرەی بنەڕەت دەتوانێت DataFrameێکی
+ناو بیرگە بێت یان arrayی (n, 6) ی CandleStore لەسەر دیسک.
+"""
+import numpy as np
+import pandas as pd
+
+TIMEFRAME_SECONDS = {'m': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+# مۆمی هەفتانەی ئیکسچەینجەکان دووشەممە دەستپێدەکات، بەڵام 1970-01-01 پێنجشەممە بوو
+WEEK_OFFSET_MS = 4 * 86400 * 1000
+
+
+def timeframe_ms(timeframe):
+    """ماوەی تایمفرەیم بە میلی چرکە؛ تایمفرەیمی مانگانە پشتگیری ناکرێت چونکە درێژییەکەی جێگیر نییە."""
+    unit = timeframe[-1]
+    if unit not in TIMEFRAME_SECONDS:
+        raise ValueError(f"تایمفرەیمی {timeframe} بۆ resample پشتگیری ناکرێت")
+    return int(timeframe[:-1]) * TIMEFRAME_SECONDS[unit] * 1000
+
+
+def can_resample(base_timeframe, timeframe):
+    try:
+        base, target = timeframe_ms(base_timeframe), timeframe_ms(timeframe)
+    except (ValueError, IndexError):
+        return False
+    return target >= base and target % base == 0
+
+
+def resample_rows(rows, base_timeframe, timeframe, include_partial=True):
+    """
+    مۆمەکانی base_timeframe کۆدەکاتەوە بۆ timeframe.
+
+    - یەکەم مۆم ئەگەر ناتەواو بێت (زنجیرەکە لە ناوەڕاستی ماوەکەدا دەستپێدەکات) لادەبرێت،
+      چونکە open و high/low ـەکەی هەڵەن.
+    - دوایین مۆم ئەگەر هێشتا تەواو نەبووبێت وەک مۆمی کراوەی ئیکسچەینج دەمێنێتەوە (close = دوایین
+      نرخ)، مەگەر include_partial=False بێت.
+    - بۆشایی لە ناوەڕاستدا (مۆمی ون لە ئیکسچەینج) تەنها بە مۆمە هەبووەکان کۆدەکرێتەوە.
+
+    :param rows: arrayی (n, 6): timestamp (ms)، open، high، low، close، volume بە ڕیزبەندی کات.
+    :return: arrayی (m, 6) بە هەمان ستوونەکان.
+    """
+    rows = np.asarray(rows, dtype=np.float64).reshape(-1, 6)
+    base_ms, target_ms = timeframe_ms(base_timeframe), timeframe_ms(timeframe)
+    if len(rows) == 0 or base_ms == target_ms:
+        return rows.copy()
+    if target_ms % base_ms:
+        raise ValueError(f"{timeframe} لێکدراوی {base_timeframe} نییە")
+
+    offset = WEEK_OFFSET_MS if timeframe.endswith('w') else 0
+    timestamps = rows[:, 0].astype(np.int64)
+    buckets = (timestamps - offset) // target_ms * target_ms + offset
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(rows)]
+
+    result = np.column_stack((
+        buckets[starts],
+        rows[starts, 1],
+        np.maximum.reduceat(rows[:, 2], starts),
+        np.minimum.reduceat(rows[:, 3], starts),
+        rows[ends - 1, 4],
+        np.add.reduceat(rows[:, 5], starts),
+    ))
+
+    keep = np.ones(len(result), dtype=bool)
+    # یەکەم مۆم ناتەواوە ئەگەر یەکەم مۆمی بنەڕەت لە سەرەتای ماوەکەدا نەبێت
+    keep[0] = timestamps[0] == buckets[0]
+    if not include_partial:
+        keep[-1] &= timestamps[-1] + base_ms >= buckets[-1] + target_ms
+    return result[keep]
+
+
+def resample_ohlcv(df, base_timeframe, timeframe, include_partial=True):
+    """
+    وەشانی DataFrame ی resample_rows (هەمان ستوونەکانی ExchangeHandler: timestamp بە UTC).
+    :return: DataFrame یان None ئەگەر df بەتاڵ بێت.
+    """
+    if df is None or df.empty:
+        return None
+    if base_timeframe == timeframe:
+        return df
+    columns = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+    rows = np.column_stack([
+        df['timestamp'].dt.as_unit('ms').astype('int64').to_numpy(),
+        df[columns[1:]].to_numpy(dtype=np.float64),
+    ])
+    resampled = pd.DataFrame(resample_rows(rows, base_timeframe, timeframe, include_partial), columns=columns)
+    resampled['timestamp'] = pd.to_datetime(resampled['timestamp'].astype('int64'), unit='ms', utc=True)
+    return resampled
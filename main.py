@@ -1,19 +1,30 @@
 # main.py
+import time
+
+# کاتی دەستپێکردنی پرۆسە، بۆ پیوانی ماوەی startup
+STARTED_AT = time.perf_counter()
+
 import sys
-import configparser
-from core.scanner import CryptoScanner
-from core.backtester import Backtester
-# ئەم دوو دێڕە زیاد بکە بۆ ئەوەی لە کاتی سکانکردندا کاربکات
-from analysis.quantitative_scorer import QuantitativeScorer 
+from utils.config_loader import load_config
+
+# مۆدیولە قورسەکان (ccxt، pandas_ta، plotly، ...) تەنها لەناو ئەو مۆدەدا import دەکرێن کە پێویستیان پێیەتی
+
+
+def report_startup(stage):
+    """ماوەی نێوان دەستپێکردنی پرۆسە و ئامادەبوونی مۆدەکە چاپ دەکات."""
+    print(f"⏱️ ماوەی دەستپێکردن ({stage}): {(time.perf_counter() - STARTED_AT) * 1000:.0f} ms")
+
 
 def run_bot():
-    config = configparser.ConfigParser()
-    config.read('config/config.ini', encoding='utf-8') 
+    # config تەنها یەکجار دەخوێنرێتەوە و هەموو کلاسەکان هەمان ئۆبجێکت بەکاردەهێنن
+    config = load_config()
 
     # خوێندنەوەی ڕێکخستنەکان لە config
     exchange_id = config.get('SCAN_SETTINGS', 'EXCHANGE_ID')
     timeframe = config.get('SCAN_SETTINGS', 'TIMEFRAME')
-    symbols = [s.strip() for s in config.get('SCAN_SETTINGS', 'SYMBOLS').split(',')]
+    symbols = [s.strip() for s in config.get('SCAN_SETTINGS', 'SYMBOLS', fallback='').split(',') if s.strip()]
+    # ژمارەی ئەو دراوانەی بە هاوکاتی سکان دەکرێن (1 = یەک لە دوای یەک)
+    max_concurrency = config.getint('SCAN_SETTINGS', 'MAX_CONCURRENCY', fallback=8)
 
     print("==============================================")
     print(f"🤖 بۆتی شیکاری کریپتۆ - وەشانی کۆتایی")
@@ -23,12 +34,18 @@ def run_bot():
     if len(sys.argv) > 1:
         mode = sys.argv[1].lower()
     else:
-        mode = input("تکایە شێوازی کارکردن هەڵبژێرە (scan یان backtest): ").lower()
+        mode = input("تکایە شێوازی کارکردن هەڵبژێرە (scan، daemon، stream، backtest، portfolio، sweep، robustness یان startup): ").lower()
 
     if mode == 'scan':
         print(f"\nโหมด: سکانی ڕاستەوخۆ | ئیکسچەینج: {exchange_id.upper()} | تایمفرەیم: {timeframe}")
+        from core.scanner import CryptoScanner
+        from core.universe import UniverseSelector, universe_enabled
         scanner = CryptoScanner(exchange_id, timeframe)
-        found_signals = scanner.scan_symbols(symbols)
+        report_startup("scan")
+        # مۆدی universe: لە جیاتی SYMBOLS، باشترین دراوەکانی هەموو ئیکسچەینج هەڵدەبژێردرێن
+        if universe_enabled(config):
+            symbols = UniverseSelector(scanner.exchange_handler, config).select()
+        found_signals = scanner.scan_symbols(symbols, concurrency=max_concurrency)
         
         # --- ئەم بەشە بە تەواوی گواسترایەوە بۆ ئێرە ---
         print("\n----- 📈 ئەنجامی کۆتایی سکان -----")
@@ -38,6 +55,7 @@ def run_bot():
             sorted_signals = sorted(found_signals, key=lambda x: x['total_score'], reverse=True)
             
             print(f"ژمارەی سیگناڵە دۆزراوەکان: {len(sorted_signals)}")
+            scorer_weights = scanner.scorer.WEIGHTS
             for item in sorted_signals:
                 symbol = item['symbol']
                 
@@ -46,7 +64,6 @@ def run_bot():
                 print(f"   - 🎯 هێزی سیگناڵ: {item['strength']}")
                 print(f"   - 💯 کۆی خاڵ: {item['total_score']:.2f} / 100")
                 print("   --- وردەکاری خاڵەکان ---")
-                scorer_weights = QuantitativeScorer().WEIGHTS
                 print(f"     - تەکنیکی:    {item['scores']['technical']:.0f} (کێش: {scorer_weights['technical']*100:.0f}%)")
                 print(f"     - هەست و سۆز: {item['scores']['sentiment']:.0f} (کێش: {scorer_weights['sentiment']*100:.0f}%)")
                 print(f"     - بنەڕەتی:     {item['scores']['fundamental']:.0f} (کێش: {scorer_weights['fundamental']*100:.0f}%)")
@@ -54,12 +71,66 @@ def run_bot():
                 print("=========================================")
         # --- کۆتایی بەشی گواستراوە ---
 
+    elif mode == 'daemon':
+        print(f"\nمۆد: سکانی بەردەوام لە کۆتایی هەر مۆمێک | ئیکسچەینج: {exchange_id.upper()} | تایمفرەیم: {timeframe}")
+        from core.daemon import ScanDaemon
+        daemon = ScanDaemon(config)
+        report_startup("daemon")
+        daemon.run()
+
+    elif mode == 'stream':
+        print(f"\nمۆد: سکانی ڕاستەوخۆ بە websocket کاتی داخستنی مۆم | ئیکسچەینج: {exchange_id.upper()} | تایمفرەیم: {timeframe}")
+        from core.daemon import ScanDaemon
+        daemon = ScanDaemon(config)
+        report_startup("stream")
+        daemon.run_streaming()
+
     elif mode == 'backtest':
+        from core.backtester import Backtester
         backtester = Backtester(config)
+        report_startup("backtest")
         backtester.run()
 
+    elif mode == 'portfolio':
+        from core.portfolio import PortfolioBacktester
+        backtester = PortfolioBacktester(config)
+        report_startup("portfolio")
+        backtester.run()
+
+    elif mode == 'sweep':
+        from core.optimizer import ParameterSweep, grid_from_config
+        sweep = ParameterSweep(config)
+        report_startup("sweep")
+        results = sweep.run(grid_from_config(config))
+        print("\n----- 🏆 باشترین تێکەڵەکانی پارامێتەر -----")
+        if results.empty:
+            print("هیچ ئەنجامێک نییە.")
+        else:
+            print(results.head(10).to_string(index=False))
+
+    elif mode == 'robustness':
+        from core.robustness import RobustnessAnalyzer
+        analyzer = RobustnessAnalyzer(config)
+        report_startup("robustness")
+        results = analyzer.run()
+        print("\n----- 🚶 پەنجەرەکانی walk-forward -----")
+        if results['windows'].empty:
+            print("هیچ ئەنجامێک نییە.")
+        else:
+            print(results['windows'].to_string(index=False))
+            print("\n----- 🎲 دابەشبوونی Monte Carlo -----")
+            print(results['summary'].T.to_string(header=False))
+
+    elif mode == 'startup':
+        # تەنها پیوانی ماوەی دەستپێکردن: import و دروستکردنی سکانەر بەبێ هیچ داواکارییەکی تۆڕ
+        report_startup("config")
+        from core.scanner import CryptoScanner
+        report_startup("imports")
+        CryptoScanner(exchange_id, timeframe)
+        report_startup("scanner")
+
     else:
-        print("هەڵبژاردنێکی نادروست. تکایە 'scan' یان 'backtest' بنووسە.")
+        print("هەڵبژاردنێکی نادروست. تکایە 'scan'، 'daemon'، 'stream'، 'backtest'، 'portfolio'، 'sweep'، 'robustness' یان 'startup' بنووسە.")
 
 if __name__ == "__main__":
     run_bot()
\ No newline at end of file
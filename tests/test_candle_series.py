@@ -0,0 +1,82 @@
+# tests/test_candle_series.py
+import numpy as np
+import pytest
+
+from data_fetcher.candle_series import CandleSeries
+
+HOUR_MS = 3600 * 1000
+
+
+def make_rows(start, count, offset=0.0):
+    """ڕیزی ccxt: [timestamp, open, high, low, close, volume] بە کاتژمێرێک جیاوازی."""
+    index = np.arange(start, start + count, dtype=float)
+    return np.column_stack((index * HOUR_MS, index + offset, index + offset + 1, index + offset - 1,
+                            index + offset, np.ones(count)))
+
+
+def test_extend_appends_and_counts_new_rows():
+    series = CandleSeries(capacity=10)
+    assert series.extend(make_rows(0, 4)) == 4
+    assert series.extend(make_rows(4, 3)) == 3
+    assert len(series) == 7
+    assert series.timestamps.tolist() == [i * HOUR_MS for i in range(7)]
+    assert series.close.tolist() == list(range(7))
+
+
+def test_extend_overwrites_last_candle_with_same_timestamp():
+    series = CandleSeries(capacity=10)
+    series.extend(make_rows(0, 5))
+    # دوایین مۆم (هێشتا نەداخراو) نوێ دەکرێتەوە و بە مۆمی نوێ ناژمێردرێت
+    assert series.extend(make_rows(4, 1, offset=0.5)) == 0
+    assert len(series) == 5
+    assert series.close[-1] == 4.5
+    assert series.extend(make_rows(4, 2, offset=0.25)) == 1
+    assert series.close.tolist() == [0, 1, 2, 3, 4.25, 5.25]
+
+
+def test_extend_ignores_rows_older_than_last():
+    series = CandleSeries(capacity=10)
+    series.extend(make_rows(0, 5))
+    assert series.extend(make_rows(1, 2, offset=100)) == 0
+    assert series.close.tolist() == [0, 1, 2, 3, 4]
+    assert series.extend(make_rows(2, 5, offset=0.5)) == 2
+    assert series.timestamps.tolist() == [i * HOUR_MS for i in range(7)]
+    assert series.close.tolist() == [0, 1, 2, 3, 4.5, 5.5, 6.5]
+
+
+def test_extend_keeps_latest_capacity_rows_across_compaction():
+    series = CandleSeries(capacity=5, headroom=3)
+    expected = []
+    start = 0
+    for count in (3, 2, 4, 1, 3, 2, 5, 1):
+        series.extend(make_rows(start, count))
+        expected = (expected + list(range(start, start + count)))[-5:]
+        start += count
+        assert series.close.tolist() == expected
+        assert series.timestamps.tolist() == [i * HOUR_MS for i in expected]
+        # ستوونەکان viewی یەکگرتوون نەک کۆپی
+        assert series.close.flags['C_CONTIGUOUS']
+        assert np.shares_memory(series.close, series._values)
+
+
+def test_extend_truncates_batches_larger_than_capacity():
+    series = CandleSeries(capacity=4)
+    series.extend(make_rows(0, 2))
+    assert series.extend(make_rows(2, 10)) == 10
+    assert len(series) == 4
+    assert series.close.tolist() == [8, 9, 10, 11]
+    assert series.last_timestamp == 11 * HOUR_MS
+
+
+def test_from_rows_round_trips_to_frame():
+    rows = make_rows(0, 6)
+    series = CandleSeries.from_rows(rows)
+    np.testing.assert_array_equal(series.rows(), rows)
+    df = series.to_frame(until=3 * HOUR_MS)
+    assert df['close'].tolist() == [0, 1, 2, 3]
+    assert str(df['timestamp'].dt.tz) == 'UTC'
+
+
+def test_capacity_must_be_positive():
+    with pytest.raises(ValueError):
+        CandleSeries(capacity=0)
@@ -0,0 +1,83 @@
+# tests/test_fundamental_analyzer.py
+import threading
+import time
+
+import pytest
+
+from analysis import fundamental_analyzer
+from analysis.fundamental_analyzer import FundamentalAnalyzer, build_symbol_index
+
+COINS = [{'id': 'bitcoin', 'symbol': 'btc'}, {'id': 'ethereum', 'symbol': 'eth'}, {'id': 'solana', 'symbol': 'sol'}]
+
+
+class SlowCoinGecko:
+    """هەر داواکارییەکی get_coin_by_id تا release دەوەستێت."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.calls = []
+
+    def get_coins_markets(self, vs_currency, ids, per_page):
+        self.calls.append(('markets', tuple(ids)))
+        return [{'id': coin_id, 'market_cap_rank': rank} for rank, coin_id in enumerate(ids, 1)]
+
+    def get_coin_by_id(self, id, **kwargs):
+        self.calls.append(('coin', id))
+        self.started.set()
+        assert self.release.wait(5)
+        return {'developer_score': 70, 'developer_data': {'stars': 10}}
+
+
+@pytest.fixture
+def analyzer(tmp_path, monkeypatch):
+    monkeypatch.setitem(fundamental_analyzer._shared_cache, 'coin_list', COINS)
+    monkeypatch.setitem(fundamental_analyzer._shared_cache, 'symbol_index', build_symbol_index(COINS))
+    monkeypatch.setitem(fundamental_analyzer._shared_cache, 'loaded_at', time.time())
+    monkeypatch.setitem(fundamental_analyzer._shared_cache, 'coins', {})
+    analyzer = FundamentalAnalyzer()
+    analyzer.coin_data_path = str(tmp_path / 'coingecko_fundamentals.json')
+    analyzer.cg = SlowCoinGecko()
+    return analyzer
+
+
+def run_in_thread(target, *args):
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(value=target(*args)))
+    thread.start()
+    return thread, result
+
+
+def test_lookups_are_not_blocked_by_a_refresh(analyzer):
+    thread, result = run_in_thread(analyzer.get_fundamental_data_batch, ['BTC'])
+    assert analyzer.cg.started.wait(5)
+
+    # لە کاتی هێنانی BTC دا گەڕانی symbol→id و خوێندنەوەی کاش دەبێت ڕانەوەستن
+    lookup, found = run_in_thread(analyzer._get_coingecko_id, 'ETH')
+    lookup.join(1)
+    assert found == {'value': 'ethereum'}
+    cache, _ = run_in_thread(analyzer._coin_cache)
+    cache.join(1)
+    assert not cache.is_alive()
+
+    analyzer.cg.release.set()
+    thread.join(5)
+    assert result['value'] == {'BTC': {'market_cap_rank': 1, 'developer_score': 70, 'github_stars': 10}}
+
+
+def test_concurrent_batches_fetch_each_coin_once(analyzer):
+    first, first_result = run_in_thread(analyzer.get_fundamental_data_batch, ['BTC', 'ETH'])
+    assert analyzer.cg.started.wait(5)
+    second, second_result = run_in_thread(analyzer.get_fundamental_data_batch, ['ETH', 'SOL'])
+    time.sleep(0.05)
+    analyzer.cg.release.set()
+    first.join(5)
+    second.join(5)
+
+    coin_calls = [call[1] for call in analyzer.cg.calls if call[0] == 'coin']
+    assert sorted(coin_calls) == ['bitcoin', 'ethereum', 'solana']
+    # دووەم batch چاوەڕێی ETHی یەکەم دەکات نەک None بگەڕێنێتەوە
+    assert second_result['value']['ETH']['developer_score'] == 70
+    assert second_result['value']['SOL']['developer_score'] == 70
+    assert set(first_result['value']) == {'BTC', 'ETH'}
+    assert fundamental_analyzer._in_flight == {'market': set(), 'developer': set()}
@@ -0,0 +1,51 @@
+# tests/test_incremental_indicators.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis.incremental_indicators import IncrementalIndicators
+from analysis.technical_analyzer import INDICATOR_COLUMNS, analyze_data
+
+pytest.importorskip('pandas_ta')
+
+
+def make_candles():
+    """مۆمی ٤ کاتژمێری: ماوەیەکی درێژی نرخی نەگۆڕاو، پاشان جووڵە و دووبارە ماوەیەکی نەگۆڕاو."""
+    rng = np.random.default_rng(7)
+    flat_start = np.full(230, 100.0)
+    moving = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 60)))
+    flat_end = np.full(15, moving[-1])
+    close = np.concatenate((flat_start, moving, flat_end))
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=len(close), freq='4h', tz='UTC'),
+        'close': close,
+    })
+
+
+def test_to_frame_matches_analyze_data_including_flat_stretch():
+    df = make_candles()
+    engine = IncrementalIndicators('BTC/USDT', '4h')
+    compared = 0
+    for i, (timestamp, close) in enumerate(zip(df['timestamp'], df['close'])):
+        engine.update(timestamp, close)
+        frame = engine.to_frame()
+        expected = analyze_data(df.iloc[:i + 1].copy())
+        # ڕیزێک کە analyze_data فڕێی دەدات (NaN) بەراورد ناکرێت
+        if expected is None or expected.empty or expected['timestamp'].iloc[-1] != timestamp:
+            continue
+        assert frame is not None, i
+        actual = frame.iloc[-1]
+        for column in INDICATOR_COLUMNS:
+            assert actual[column] == pytest.approx(expected[column].iloc[-1], rel=1e-9, abs=1e-9), (i, column)
+        compared += 1
+    assert compared >= 60
+
+
+def test_rsi_on_flat_series_is_zero():
+    df = make_candles().iloc[:230]
+    engine = IncrementalIndicators('BTC/USDT', '4h')
+    engine.warm_up(df)
+    assert engine.is_ready
+    assert engine.values['RSI_14'] == 0.0
+    assert engine.values['MACD_12_26_9'] == 0.0
+    assert engine.values['EMA_200'] == pytest.approx(100.0)
@@ -0,0 +1,78 @@
+# tests/test_notifier.py
+import threading
+import time
+
+from utils.notifier import TelegramNotifier, TokenBucket
+
+
+class FakeBot:
+    def __init__(self):
+        self.sent = []
+        self.initialized = 0
+        self.shut_down = 0
+
+    async def initialize(self):
+        self.initialized += 1
+
+    async def send_message(self, chat_id, text, parse_mode=None):
+        self.sent.append(text)
+
+    async def shutdown(self):
+        self.shut_down += 1
+
+
+class SlowStartNotifier(TelegramNotifier):
+    """دەستپێکردنی worker دوادەخات تا بانگکەرەکانی تر پێش دروستبوونی _queue بگەن."""
+
+    def _run_loop(self, ready):
+        time.sleep(0.05)
+        super()._run_loop(ready)
+
+
+def make_notifier(cls=TelegramNotifier):
+    notifier = cls()
+    notifier.token, notifier.chat_id = 'token', 'chat'
+    notifier.bot = FakeBot()
+    notifier.digest_window = 0.05
+    notifier.bucket = TokenBucket(1000, 1000)
+    return notifier
+
+
+def test_concurrent_first_sends_on_fresh_notifier():
+    for _ in range(3):
+        notifier = make_notifier(SlowStartNotifier)
+        bot = notifier._bot
+        messages = [f"پەیام {k}" for k in range(8)]
+        barrier = threading.Barrier(len(messages))
+        results, errors = [], []
+
+        def send(text):
+            barrier.wait()
+            try:
+                results.append(notifier.send_message(text))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=send, args=(text,)) for text in messages]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert results == [True] * len(messages)
+        assert notifier.flush(timeout=5)
+        notifier.close()
+
+        delivered = "\n\n".join(bot.sent)
+        assert all(text in delivered for text in messages)
+        assert bot.initialized == 1 and bot.shut_down == 1
+
+
+def test_duplicate_messages_are_dropped():
+    notifier = make_notifier()
+    assert notifier.send_message("یەک") is True
+    assert notifier.send_message("یەک") is False
+    assert notifier.flush(timeout=5)
+    notifier.close()
+    assert notifier._bot.sent == ["یەک"]
@@ -0,0 +1,86 @@
+# tests/test_quantitative_scorer.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis.quantitative_scorer import QuantitativeScorer
+
+WEIGHTS = {'technical': 0.40, 'sentiment': 0.20, 'fundamental': 0.25, 'correlation': 0.15}
+FUNDAMENTALS = {'market_cap_rank': 10, 'developer_score': 80}
+
+
+def make_indicators(bars, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 + rng.normal(0, 5, bars).cumsum()
+    return pd.DataFrame({
+        'close': close,
+        'RSI_14': rng.uniform(20, 60, bars),
+        'MACD_12_26_9': rng.normal(0, 1, bars),
+        'MACDs_12_26_9': rng.normal(0, 1, bars),
+        'EMA_50': close + rng.normal(0, 3, bars),
+        'EMA_200': close + rng.normal(0, 3, bars),
+    })
+
+
+def stack(frames):
+    return pd.concat([frame.assign(entry=k) for k, frame in enumerate(frames)], ignore_index=True)
+
+
+def test_score_frame_matches_calculate_scores_per_group():
+    scorer = QuantitativeScorer(WEIGHTS)
+    frames = [make_indicators(6, seed) for seed in range(3)]
+    sentiments = {0: 0.4, 1: None, 2: -0.2}
+    fundamentals = {0: FUNDAMENTALS, 1: None, 2: {'market_cap_rank': 80, 'developer_score': 55}}
+    correlations = {0: 0.7, 1: 0.9, 2: None}
+
+    scored = scorer.score_frame(stack(frames), group_column='entry', sentiment_by_group=sentiments,
+                                fundamental_by_group=fundamentals, correlation_by_group=correlations)
+
+    last = scored.groupby(stack(frames)['entry']).tail(1)
+    for k, frame in enumerate(frames):
+        expected = scorer.calculate_scores(frame, sentiments[k], fundamentals[k], correlations[k])
+        row = last.iloc[k]
+        for key in ('technical', 'sentiment', 'fundamental', 'correlation', 'total'):
+            assert row[key] == expected[key], (k, key)
+        assert row['signal'] == scorer.get_signal_strength(expected['total'])
+
+
+def test_single_fundamental_dict_applies_to_every_group():
+    scorer = QuantitativeScorer(WEIGHTS)
+    stacked = stack([make_indicators(4, 0), make_indicators(4, 1)])
+
+    scored = scorer.score_frame(stacked, 0.3, FUNDAMENTALS, 0.7, group_column='entry')
+
+    assert (scored['fundamental'] == 100).all()
+    assert (scored['sentiment'] == scorer._calculate_sentiment_score(0.3)).all()
+
+
+def test_groups_missing_from_mapping_use_shared_value():
+    scorer = QuantitativeScorer(WEIGHTS)
+    stacked = stack([make_indicators(3, 0), make_indicators(3, 1)])
+
+    scored = scorer.score_frame(stacked, correlation_value=0.9, group_column='entry',
+                                correlation_by_group={0: 0.7})
+
+    assert scored.loc[stacked['entry'] == 0, 'correlation'].eq(100).all()
+    assert scored.loc[stacked['entry'] == 1, 'correlation'].eq(60).all()
+
+
+def test_technical_score_does_not_cross_group_boundary():
+    scorer = QuantitativeScorer(WEIGHTS)
+    frames = [make_indicators(5, 3), make_indicators(5, 4)]
+    stacked = stack(frames)
+
+    scored = scorer.score_frame(stacked, group_column='entry')
+
+    # یەکەم ڕیزی هەر گرووپێک ڕیزی پێشووی نییە
+    assert scored['technical'].iloc[0] == 0
+    assert scored['technical'].iloc[5] == 0
+    for k, frame in enumerate(frames):
+        assert scored['technical'].iloc[5 * k + 4] == scorer._calculate_technical_score(frame)
+
+
+def test_per_group_values_require_group_column():
+    scorer = QuantitativeScorer(WEIGHTS)
+    with pytest.raises(ValueError):
+        scorer.score_frame(make_indicators(3, 0), sentiment_by_group={0: 0.5})
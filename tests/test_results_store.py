@@ -0,0 +1,100 @@
+# tests/test_results_store.py
+import os
+import shutil
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+
+from utils.results_store import ResultsStore, backtest_cache_key
+
+SETTINGS = {'symbol': 'BTC/USDT', 'timeframe': '4h', 'start_date': '2024-01-01', 'buy_threshold': 70}
+RESULTS = {'final_portfolio_value': 1100.0, 'profit_loss': 100.0, 'profit_loss_percent': 10.0,
+           'buy_and_hold_profit_percent': 5.0, 'total_trades': 2}
+
+
+def make_history(bars=50):
+    close = 100 + np.arange(bars, dtype=float)
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=bars, freq='4h', tz='UTC'),
+        'open': close, 'high': close + 1, 'low': close - 1, 'close': close, 'volume': 1.0,
+    })
+
+
+def make_trades():
+    return [
+        {'date': pd.Timestamp('2024-01-02', tz='UTC'), 'type': 'buy', 'price': 105.0, 'amount': 9.5},
+        {'date': pd.Timestamp('2024-01-05', tz='UTC'), 'type': 'sell', 'price': 116.0, 'amount': 9.5},
+    ]
+
+
+def make_signal(symbol, total=75.0):
+    return {'symbol': symbol, 'strength': 'strong', 'total_score': total,
+            'scores': {'technical': 80.0, 'sentiment': 60.0, 'fundamental': None, 'correlation': 50.0}}
+
+
+def test_cache_key_changes_with_settings_and_data():
+    history = make_history()
+    key = backtest_cache_key(history, SETTINGS)
+
+    assert backtest_cache_key(history.copy(), dict(SETTINGS)) == key
+    assert backtest_cache_key(history, {**SETTINGS, 'buy_threshold': 65}) != key
+
+    changed = history.copy()
+    changed.loc[10, 'close'] += 0.5
+    assert backtest_cache_key(changed, SETTINGS) != key
+    assert backtest_cache_key(history.iloc[:-1], SETTINGS) != key
+
+
+def test_backtest_round_trip(tmp_path):
+    store = ResultsStore(str(tmp_path / 'results.sqlite'))
+    history = make_history()
+    key = backtest_cache_key(history, SETTINGS)
+
+    assert store.load_backtest(key) is None
+    store.save_backtest(key, 'BTC/USDT', '4h', SETTINGS, len(history), make_trades(), RESULTS)
+    # هەمان کلیل جێگەی دەگرێتەوە نەک ڕیزی دووەم زیاد بکات
+    store.save_backtest(key, 'BTC/USDT', '4h', SETTINGS, len(history), make_trades(), RESULTS)
+
+    trades, final_results = store.load_backtest(key)
+    assert final_results == RESULTS
+    assert [trade['type'] for trade in trades] == ['buy', 'sell']
+    assert trades[0]['date'] == make_trades()[0]['date']
+    assert len(store.backtest_history(symbol='BTC/USDT')) == 1
+    assert store.load_backtest(backtest_cache_key(history, {**SETTINGS, 'buy_threshold': 65})) is None
+
+
+def test_signal_history_pivots_components(tmp_path):
+    store = ResultsStore(str(tmp_path / 'results.sqlite'))
+    store.record_scan('binance', '4h', 2, [make_signal('BTC/USDT'), make_signal('ETH/USDT', 65.0)])
+
+    history = store.signal_history(symbol='ETH/USDT')
+    assert len(history) == 1
+    row = history.iloc[0]
+    assert row['total_score'] == 65.0
+    assert row['technical'] == 80.0
+    assert pd.isna(row['fundamental'])
+
+
+def test_store_recovers_after_file_is_deleted(tmp_path):
+    cache_dir = tmp_path / 'cache'
+    store = ResultsStore(str(cache_dir / 'results.sqlite'))
+    store.record_scan('binance', '4h', 1, [make_signal('BTC/USDT')])
+
+    shutil.rmtree(cache_dir)
+
+    store.record_scan('binance', '4h', 1, [make_signal('SOL/USDT')])
+    assert os.path.exists(cache_dir / 'results.sqlite')
+    assert store.signal_history()['symbol'].tolist() == ['SOL/USDT']
+
+
+def test_retention_prunes_old_scans(tmp_path):
+    store = ResultsStore(str(tmp_path / 'results.sqlite'), retention_days=7)
+    now = pd.Timestamp('2024-06-01', tz='UTC')
+    store.record_scan('binance', '4h', 1, [make_signal('OLD/USDT')], created_at=now - pd.Timedelta(days=10))
+    store.record_scan('binance', '4h', 1, [make_signal('NEW/USDT')], created_at=now)
+
+    assert store.signal_history()['symbol'].tolist() == ['NEW/USDT']
+    assert len(store.scan_history()) == 1
+    with closing(store._connect()) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM signal_scores").fetchone()[0] == 3
@@ -0,0 +1,97 @@
+# tests/test_robustness.py
+import configparser
+
+import numpy as np
+import pandas as pd
+
+from analysis.quantitative_scorer import QuantitativeScorer
+from core.robustness import RobustnessAnalyzer
+
+
+def make_history(bars, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, bars)))
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=bars, freq='4h', tz='UTC'),
+        'open': close, 'high': close * 1.01, 'low': close * 0.99, 'close': close, 'volume': 1.0,
+    })
+
+
+class FakeHandler:
+    def _timeframe_ms(self, timeframe):
+        return 4 * 3600 * 1000
+
+
+class FakeScanner:
+    exchange_handler = FakeHandler()
+
+
+class FakeBacktester:
+    """تەنها ئەو بەشانەی Backtester کە ParameterSweep و RobustnessAnalyzer بەکاریان دەهێنن."""
+
+    def __init__(self, histories):
+        self.histories = histories
+        self.symbols = list(histories)
+        self.initial_capital = 1000.0
+        self.start_date = pd.Timestamp('2024-01-01', tz='UTC')
+        self.timeframe = '4h'
+        self.scorer = QuantitativeScorer()
+        self.scanner = FakeScanner()
+
+    def _load_history(self, symbol):
+        return self.histories[symbol]
+
+
+def make_config(**robustness):
+    config = configparser.ConfigParser()
+    config.read_dict({
+        'BACKTEST_SETTINGS': {'STOP_LOSS_PERCENT': '0.03', 'TRADING_FEE_PERCENT': '0.001', 'TRADE_AMOUNT_PERCENT': '0.5'},
+        'ROBUSTNESS': {'TRAIN_BARS': '500', 'TEST_BARS': '100', 'SIMULATIONS': '200', 'MAX_WORKERS': '1',
+                       **robustness},
+    })
+    return config
+
+
+def test_windows_are_contiguous_and_start_after_warmup():
+    analyzer = RobustnessAnalyzer(make_config(), FakeBacktester({'A/USDT': make_history(10, 0)}))
+    windows = analyzer.windows(1000)
+    assert windows[0] == ((199, 699), (699, 799))
+    assert all(prev[1][0] + 100 == cur[1][0] for prev, cur in zip(windows, windows[1:]))
+    assert windows[-1][1][1] <= 1000
+    assert analyzer.windows(400) == []
+
+
+def test_symbol_without_windows_is_skipped():
+    histories = {'LONG/USDT': make_history(1200, 1), 'SHORT/USDT': make_history(400, 2)}
+    analyzer = RobustnessAnalyzer(make_config(), FakeBacktester(histories))
+
+    results = analyzer.run(symbols=list(histories))
+
+    assert set(results['windows']['symbol']) == {'LONG/USDT'}
+    assert results['summary']['symbol'].tolist() == ['LONG/USDT']
+    assert results['summary'].loc[0, 'simulations'] == 200
+
+
+def test_no_symbol_with_windows_returns_empty_results():
+    analyzer = RobustnessAnalyzer(make_config(), FakeBacktester({'SHORT/USDT': make_history(400, 3)}))
+
+    results = analyzer.run(symbols=['SHORT/USDT'])
+
+    assert results['windows'].empty and results['summary'].empty
+
+
+def test_monte_carlo_is_independent_of_worker_count():
+    histories = {'LONG/USDT': make_history(1200, 4)}
+    serial = RobustnessAnalyzer(make_config(), FakeBacktester(histories)).run(symbols=list(histories))
+    parallel = RobustnessAnalyzer(make_config(), FakeBacktester(histories)).run(symbols=list(histories), max_workers=2)
+
+    pd.testing.assert_frame_equal(serial['summary'], parallel['summary'])
+
+
+def test_datasets_default_to_all_configured_symbols():
+    histories = {'A/USDT': make_history(300, 5), 'B/USDT': make_history(300, 6), 'C/USDT': make_history(300, 7)}
+    analyzer = RobustnessAnalyzer(make_config(), FakeBacktester(histories))
+
+    datasets = analyzer.sweep.load_datasets()
+
+    assert list(datasets['symbols']) == list(histories)
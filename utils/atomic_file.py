@@ -0,0 +1,30 @@
+# utils/atomic_file.py
+import os
+import tempfile
+from contextlib import contextmanager
+
+
+@contextmanager
+def atomic_write(path, binary=False):
+    """
+    فایلێک بە شێوەی atomic دەنووسێت: ناوەڕۆک لە فایلێکی کاتیی ناوازە لە هەمان دایرێکتۆریدا
+    دەنووسرێت و پاشان بە os.replace جێگەی path دەگرێتەوە. چەند thread/پرۆسەیەک دەتوانن بە
+    هاوکاتی هەمان path بنووسن بەبێ تێکدانی فایلی یەکتر (دوایین نووسەر دەمێنێتەوە).
+
+    :param binary: True بۆ فایلی دووانەیی (بۆ نموونە np.save)، بە بنەڕەت دەقی UTF-8.
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    temp = tempfile.NamedTemporaryFile('wb' if binary else 'w', encoding=None if binary else 'utf-8',
+                                       dir=directory, prefix=f"{os.path.basename(path)}.", suffix='.tmp',
+                                       delete=False)
+    try:
+        with temp:
+            yield temp
+        os.replace(temp.name, path)
+    except BaseException:
+        try:
+            os.remove(temp.name)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,23 @@
+# utils/config_loader.py
+import configparser
+from functools import lru_cache
+
+CONFIG_PATH = 'config/config.ini'
+
+
+@lru_cache(maxsize=None)
+def load_config(path=CONFIG_PATH):
+    """
+    config.ini تەنها یەکجار بۆ هەموو پرۆسەکە دەخوێنرێتەوە و هەموو کلاسەکان هەمان ئۆبجێکت بەکاردەهێنن.
+    ئەم ئۆبجێکتە هاوبەشە؛ ئەگەر پێویستت بە گۆڕینی بەهاکان هەیە، config_copy بەکاربهێنە.
+    """
+    config = configparser.ConfigParser()
+    config.read(path, encoding='utf-8')
+    return config
+
+
+def config_copy(path=CONFIG_PATH):
+    """کۆپییەکی سەربەخۆی config بۆ ئەو شوێنانەی بەهاکان دەگۆڕن (بۆ نموونە داشبۆرد)."""
+    config = configparser.ConfigParser()
+    config.read_dict(load_config(path))
+    return config
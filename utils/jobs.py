@@ -0,0 +1,100 @@
+# utils/jobs.py
+import threading
+import time
+import traceback
+
+
+class BackgroundJob:
+    """
+    کارێکی درێژ (سکان، تاقیکردنەوە) لە threadی جیاواز جێبەجێ دەکات بۆ ئەوەی داشبۆرد چاوەڕێ نەکات.
+    ئەنجامە بەشەکییەکان، لۆگ و پێشکەوتن لێرە کۆدەکرێنەوە و داشبۆرد لە هەر rerunێکدا دەیانخوێنێتەوە.
+    """
+
+    def __init__(self, name, target, *args, **kwargs):
+        self.name = name
+        self._target = target
+        self._args = args
+        self._kwargs = kwargs
+        self._lock = threading.Lock()
+        self._thread = None
+
+        self.results = []   # ئەنجامە بەشەکییەکان (بۆ نموونە سیگناڵی هەر دراوێک)
+        self.logs = []
+        self.progress = 0.0
+        self.result = None  # ئەنجامی کۆتایی target
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+        self.meta = {}      # زانیاری زیادە بۆ پیشاندان (بۆ نموونە ناوی دراو)
+
+    def start(self):
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name=f"job-{self.name}", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            self.result = self._target(*self._args, job=self, **self._kwargs)
+        except Exception as e:
+            self.error = f"{e}\n{traceback.format_exc()}"
+            print(f"❌ هەڵە لە کاری {self.name}: {e}")
+        finally:
+            self.progress = 1.0 if self.error is None else self.progress
+            self.finished_at = time.time()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    def add_result(self, item):
+        with self._lock:
+            self.results.append(item)
+
+    def snapshot_results(self):
+        with self._lock:
+            return list(self.results)
+
+    def log(self, message):
+        with self._lock:
+            self.logs.append(str(message))
+
+    def set_log_text(self, text):
+        with self._lock:
+            self.logs = str(text).split("\n")
+
+    def log_text(self):
+        with self._lock:
+            return "\n".join(self.logs)
+
+
+class JobLogger:
+    """
+    هەمان ڕووکاری ui_loggerی Streamlit (info، text، progress، ...) کە scan_symbols و Backtester.run
+    بەکاری دەهێنن، بەڵام لە جیاتی نووسین لە پەڕەکە، لە BackgroundJob هەڵیدەگرێت.
+    """
+
+    def __init__(self, job):
+        self.job = job
+
+    def _log(self, message, *args, **kwargs):
+        self.job.log(message)
+
+    info = text = markdown = success = warning = error = _log
+
+    def progress(self, value, *args, **kwargs):
+        self.job.progress = float(value)
+        return self
+
+    def text_area(self, label, value="", *args, **kwargs):
+        self.job.set_log_text(value)
+
+    def code(self, body, *args, **kwargs):
+        # LogSink هەموو لۆگەکە بە یەکجار دەنێرێت
+        self.job.set_log_text(body)
@@ -0,0 +1,92 @@
+# utils/log_sink.py
+import os
+import time
+from collections import deque
+from datetime import datetime
+
+from utils.config_loader import load_config
+
+
+class LogSink:
+    """
+    کۆکەرەوەی لۆگ بۆ تاقیکردنەوە و سکان:
+    - تەنها دوایین max_lines پەیام لە بیرگەدا دەمێنێتەوە (ring buffer)، بۆیە لۆگی درێژ بیرگە پڕ ناکات.
+    - داشبۆرد لە هەر flush_interval_ms جارێک زیاتر نوێ ناکرێتەوە، و هەمیشە هەمان widget (ui_logger.code) بەکاردێت.
+    - ئەگەر LOG_DIR دیاری کرابێت، هەموو پەیامەکان (بێ سنوور) لە فایلێکیشدا دەنووسرێن.
+
+    ڕێکخستنەکان لە بەشی [LOGGING] ی config.ini دەخوێنرێنەوە مەگەر ڕاستەوخۆ بدرێن.
+    """
+
+    def __init__(self, name, ui_logger=None, max_lines=None, flush_interval_ms=None, log_dir=None, echo=False):
+        config = load_config()
+        if max_lines is None:
+            max_lines = config.getint('LOGGING', 'MAX_LINES', fallback=500)
+        if flush_interval_ms is None:
+            flush_interval_ms = config.getint('LOGGING', 'FLUSH_INTERVAL_MS', fallback=250)
+        if log_dir is None:
+            log_dir = config.get('LOGGING', 'LOG_DIR', fallback='')
+
+        self.name = name
+        self.ui_logger = ui_logger
+        self.echo = echo
+        self.flush_interval = flush_interval_ms / 1000
+        self._lines = deque(maxlen=max(1, max_lines))
+        self._dropped = 0
+        self._dirty = False
+        self._last_flush = 0.0
+        self._file = None
+
+        if log_dir:
+            try:
+                os.makedirs(log_dir, exist_ok=True)
+                stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+                self.log_path = os.path.join(log_dir, f"{name}_{stamp}.log")
+                self._file = open(self.log_path, 'a', encoding='utf-8')
+            except OSError as e:
+                print(f"⚠️ نەتوانرا فایلی لۆگ بکرێتەوە لە {log_dir}: {e}")
+
+    def append(self, message):
+        """پەیامێک زیاد دەکات و ئەگەر کاتی هاتبێت داشبۆرد نوێ دەکاتەوە."""
+        message = str(message)
+        if len(self._lines) == self._lines.maxlen:
+            self._dropped += 1
+        self._lines.append(message)
+        self._dirty = True
+        if self._file:
+            self._file.write(message + "\n")
+        if self.echo:
+            print(message)
+        self.flush()
+
+    def extend(self, messages):
+        for message in messages:
+            self.append(message)
+
+    def text(self):
+        lines = list(self._lines)
+        if self._dropped:
+            lines.insert(0, f"... {self._dropped} پەیامی کۆنتر لێرە پیشان نادرێن")
+        return "\n".join(lines)
+
+    def flush(self, force=False):
+        """داشبۆرد نوێ دەکاتەوە، بەڵام لە هەر flush_interval جارێک زیاتر نا (مەگەر force بێت)."""
+        if not self.ui_logger or not self._dirty:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_flush < self.flush_interval:
+            return
+        self.ui_logger.code(self.text(), language=None)
+        self._last_flush = now
+        self._dirty = False
+
+    def close(self):
+        self.flush(force=True)
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,326 @@
+# utils/metrics.py
+import asyncio
+import json
+import os
+import threading
+import time
+import weakref
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache
+
+from utils.atomic_file import atomic_write
+from utils.config_loader import load_config
+
+# ڕیزبەندی قۆناغەکان لە خشتەی کۆتایی سکاندا
+STAGES = ['ohlcv_fetch', 'indicators', 'sentiment', 'fundamentals', 'correlation', 'scoring']
+
+
+def _is_rate_limited(error):
+    name = type(error).__name__
+    # NewsAPIException کۆدی هەڵەکە لە get_code() دا دەگەڕێنێتەوە، نەک لە ناو یان دەقی هەڵەکە
+    code = getattr(error, 'get_code', lambda: None)()
+    return '429' in str(error) or 'RateLimit' in name or 'DDoS' in name or name == 'RetryAfter' \
+        or code == 'rateLimited'
+
+
+class Metrics:
+    """
+    پێوانی ناوخۆیی سکان: کاتی هەر قۆناغێک، ژمارەی داواکاری/هەڵە/429 بۆ هەر APIیەکی دەرەکی
+    و ڕێژەی hitی کاشەکان. یەک ئۆبجێکت بۆ هەموو پرۆسەکە (get_metrics) و thread-safe ـە.
+
+    کاتی قۆناغەکان wall-timeن؛ لە سکانی هاوکاتدا قۆناغەکان دەتوانن یەکتر بگرنەوە.
+
+    ژمێرەرەکان هەرگیز لە کاتی سکاندا سفر ناکرێنەوە (سکانی هاوکاتی داشبۆرد ژمارەکانی یەکتر
+    ناسڕنەوە): هەر سکانێک mark() ێک وەردەگرێت و report(since=...) تەنها جیاوازییەکەی پیشان
+    دەدات. Prometheus هەمیشە کۆی گشتی پرۆسەکە دەنووسێت.
+    """
+    enabled = True
+
+    def __init__(self, json_path=None, prometheus_path=None):
+        self.json_path = json_path
+        self.prometheus_path = prometheus_path
+        self._lock = threading.Lock()
+        # زۆرترین کاتی هەر قۆناغێک بۆ هەر mark ێکی کراوە؛ کاتێک سکانەکە markەکەی فڕێدا لادەبرێت
+        self._scopes = weakref.WeakSet()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.stages = {}   # name -> {'calls', 'seconds', 'max'}
+            self.apis = {}     # name -> {'calls', 'errors', 'rate_limited', 'seconds'}
+            self.caches = {}   # name -> {'hits', 'misses'}
+            self.started_at = time.time()
+            self.last_scan_seconds = None
+
+    # --- تۆمارکردن ---
+
+    def _add_stage(self, name, seconds):
+        with self._lock:
+            stage = self.stages.setdefault(name, {'calls': 0, 'seconds': 0.0, 'max': 0.0})
+            stage['calls'] += 1
+            stage['seconds'] += seconds
+            stage['max'] = max(stage['max'], seconds)
+            for scope in self._scopes:
+                scope.stage_max[name] = max(scope.stage_max.get(name, 0.0), seconds)
+
+    @contextmanager
+    def stage(self, name):
+        """کاتی بلۆکێک بۆ قۆناغی name زیاد دەکات."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add_stage(name, time.perf_counter() - started)
+
+    async def timed(self, name, awaitable):
+        """وەشانی async ی stage بۆ taskێک کە دەبێت لە پاڵ کارەکانی تردا بڕوات."""
+        with self.stage(name):
+            return await awaitable
+
+    def _add_api(self, name, seconds, error=None):
+        with self._lock:
+            api = self.apis.setdefault(name, {'calls': 0, 'errors': 0, 'rate_limited': 0, 'seconds': 0.0})
+            api['calls'] += 1
+            api['seconds'] += seconds
+            if error is not None:
+                api['errors'] += 1
+                if _is_rate_limited(error):
+                    api['rate_limited'] += 1
+
+    @contextmanager
+    def api_call(self, name):
+        """یەک داواکاری بۆ APIی name دەژمێرێت؛ هەڵەکان (و 429) دەژمێردرێن و دووبارە raise دەکرێنەوە."""
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self._add_api(name, time.perf_counter() - started, e)
+            raise
+        self._add_api(name, time.perf_counter() - started)
+
+    def instrument(self, client, api, methods):
+        """
+        کلاینتێک دەپێچێتەوە بۆ ئەوەی هەموو بانگکردنی ئەو methodانەی بە یەکێک لە methods
+        دەستپێدەکەن وەک داواکاری APIی api بژمێردرێن.
+        """
+        if client is None:
+            return None
+        return InstrumentedClient(client, self, api, tuple(methods))
+
+    def cache(self, name, hits=0, misses=0):
+        if not hits and not misses:
+            return
+        with self._lock:
+            cache = self.caches.setdefault(name, {'hits': 0, 'misses': 0})
+            cache['hits'] += hits
+            cache['misses'] += misses
+
+    # --- دەرچوون ---
+
+    def snapshot(self):
+        with self._lock:
+            caches = {
+                name: dict(values, hit_rate=values['hits'] / (values['hits'] + values['misses']))
+                for name, values in self.caches.items()
+            }
+            now = time.time()
+            return {
+                'started_at': self.started_at,
+                'taken_at': now,
+                'elapsed_seconds': now - self.started_at,
+                'stages': {name: dict(values) for name, values in self.stages.items()},
+                'apis': {name: dict(values) for name, values in self.apis.items()},
+                'caches': caches,
+            }
+
+    def mark(self):
+        """نیشانەی سەرەتای سکانێک (snapshot + زۆرترینی قۆناغەکان لەم کاتەوە) بۆ report(since=...)."""
+        scope = _Scope()
+        with self._lock:
+            self._scopes.add(scope)
+        return dict(self.snapshot(), scope=scope)
+
+    @staticmethod
+    def _since(data, mark):
+        """جیاوازی snapshot ێک لەگەڵ mark: تەنها ئەوەی دوای mark تۆمار کراوە."""
+        def subtract(current, previous, fields):
+            result = {}
+            for name, values in current.items():
+                before = previous.get(name, {})
+                delta = dict(values, **{field: values[field] - before.get(field, 0) for field in fields})
+                if any(delta[field] for field in fields):
+                    result[name] = delta
+            return result
+
+        stages = subtract(data['stages'], mark['stages'], ('calls', 'seconds'))
+        scope = mark.get('scope')
+        for name, values in stages.items():
+            values['max'] = scope.stage_max.get(name, 0.0) if scope is not None else values['max']
+        caches = subtract(data['caches'], mark['caches'], ('hits', 'misses'))
+        for values in caches.values():
+            values['hit_rate'] = values['hits'] / (values['hits'] + values['misses'])
+        return {
+            'started_at': mark['taken_at'],
+            'taken_at': data['taken_at'],
+            'elapsed_seconds': data['taken_at'] - mark['taken_at'],
+            'stages': stages,
+            'apis': subtract(data['apis'], mark['apis'], ('calls', 'errors', 'rate_limited', 'seconds')),
+            'caches': caches,
+        }
+
+    def to_prometheus(self):
+        """ئەنجامەکان بە فۆرماتی دەقی Prometheus (بۆ node_exporter textfile collector)."""
+        data = self.snapshot()
+        metrics = [
+            ('scanner_stage_seconds_total', 'counter', 'stages', 'stage', 'seconds'),
+            ('scanner_stage_calls_total', 'counter', 'stages', 'stage', 'calls'),
+            ('scanner_api_calls_total', 'counter', 'apis', 'api', 'calls'),
+            ('scanner_api_errors_total', 'counter', 'apis', 'api', 'errors'),
+            ('scanner_api_rate_limited_total', 'counter', 'apis', 'api', 'rate_limited'),
+            ('scanner_api_seconds_total', 'counter', 'apis', 'api', 'seconds'),
+            ('scanner_cache_hits_total', 'counter', 'caches', 'cache', 'hits'),
+            ('scanner_cache_misses_total', 'counter', 'caches', 'cache', 'misses'),
+        ]
+        lines = []
+        for metric, kind, group, label, field in metrics:
+            lines.append(f"# TYPE {metric} {kind}")
+            for name, values in sorted(data[group].items()):
+                lines.append(f'{metric}{{{label}="{name}"}} {values[field]}')
+        lines.append("# TYPE scanner_scan_duration_seconds gauge")
+        duration = self.last_scan_seconds if self.last_scan_seconds is not None else data['elapsed_seconds']
+        lines.append(f"scanner_scan_duration_seconds {duration:.6f}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self, since=None):
+        """خشتەیەکی کورت بۆ کۆتایی سکان. :param since: mark() ی سەرەتای سکان (بەتاڵ = هەموو پرۆسەکە)."""
+        data = self.snapshot()
+        if since is not None:
+            data = self._since(data, since)
+        lines = [f"----- ⏱️ پێوانی سکان ({data['elapsed_seconds']:.2f} چرکە) -----",
+                 f"{'قۆناغ':<14}{'بانگ':>7}{'کۆ (s)':>10}{'زۆرترین (s)':>13}"]
+        stage_names = [s for s in STAGES if s in data['stages']] + sorted(set(data['stages']) - set(STAGES))
+        for name in stage_names:
+            stage = data['stages'][name]
+            lines.append(f"{name:<14}{stage['calls']:>7}{stage['seconds']:>10.3f}{stage['max']:>13.3f}")
+        if data['apis']:
+            lines.append(f"{'API':<14}{'داواکاری':>9}{'هەڵە':>7}{'429':>6}{'کۆ (s)':>10}")
+            for name, api in sorted(data['apis'].items()):
+                lines.append(f"{name:<14}{api['calls']:>9}{api['errors']:>7}{api['rate_limited']:>6}{api['seconds']:>10.3f}")
+        if data['caches']:
+            lines.append(f"{'کاش':<22}{'hit':>7}{'miss':>7}{'ڕێژە':>8}")
+            for name, cache in sorted(data['caches'].items()):
+                lines.append(f"{name:<22}{cache['hits']:>7}{cache['misses']:>7}{cache['hit_rate']:>8.0%}")
+        return "\n".join(lines)
+
+    def write(self, since=None):
+        """
+        ئەنجامەکان لە JSON_PATH (ئەم سکانە، ئەگەر since درابێت) و PROMETHEUS_PATH (کۆی گشتی)
+        دەنووسێت (ئەگەر دیاری کرابن).
+        """
+        def render_json():
+            data = self.snapshot()
+            return json.dumps(self._since(data, since) if since is not None else data, indent=2)
+
+        outputs = [(self.json_path, render_json),
+                   (self.prometheus_path, self.to_prometheus)]
+        for path, render in outputs:
+            if not path:
+                continue
+            try:
+                with atomic_write(path) as f:
+                    f.write(render())
+            except OSError as e:
+                print(f"⚠️ نەتوانرا پێوانەکان بنووسرێن لە {path}: {e}")
+
+    def report(self, log=None, since=None):
+        """
+        لە کۆتایی سکاندا: خشتەکە لە لۆگ (یان چاپ) پیشان دەدات و فایلەکان دەنووسێت.
+        :param since: mark() ی سەرەتای سکان؛ تەنها ئەوەی لەو کاتەوە تۆمار کراوە پیشان دەدرێت.
+        """
+        if since is not None:
+            self.last_scan_seconds = time.time() - since['taken_at']
+        summary = self.summary(since)
+        if log is not None:
+            log.append(summary)
+        # لە CLI دا لۆگی سکان پیشان نادرێت، بۆیە خشتەکە چاپ دەکرێت
+        if log is None or not (log.ui_logger or log.echo):
+            print(summary)
+        self.write(since)
+
+
+class _Scope:
+    def __init__(self):
+        self.stage_max = {}
+
+
+class InstrumentedClient:
+    """کلاینتێکی دەرەکی (ccxt، NewsAPI، CoinGecko) کە هەموو داواکارییەکانی دەژمێردرێن."""
+
+    def __init__(self, client, metrics, api, methods):
+        self._client = client
+        self._metrics = metrics
+        self._api = api
+        self._methods = methods
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not name.startswith(self._methods) or not callable(attr):
+            return attr
+        metrics, api = self._metrics, self._api
+
+        if asyncio.iscoroutinefunction(attr):
+            async def counted_async(*args, **kwargs):
+                with metrics.api_call(api):
+                    return await attr(*args, **kwargs)
+            return counted_async
+
+        def counted(*args, **kwargs):
+            with metrics.api_call(api):
+                return attr(*args, **kwargs)
+        return counted
+
+
+class NullMetrics:
+    """کاتێک پێوان کوژاوەتەوە: هەموو methodەکان هیچ ناکەن و کلاینتەکان ناپێچرێنەوە."""
+    enabled = False
+    _null = nullcontext()
+
+    def reset(self):
+        pass
+
+    def mark(self):
+        return None
+
+    def stage(self, name):
+        return self._null
+
+    async def timed(self, name, awaitable):
+        return await awaitable
+
+    def api_call(self, name):
+        return self._null
+
+    def instrument(self, client, api, methods):
+        return client
+
+    def cache(self, name, hits=0, misses=0):
+        pass
+
+    def report(self, log=None, since=None):
+        pass
+
+
+@lru_cache(maxsize=None)
+def get_metrics():
+    """
+    ئۆبجێکتی پێوانی هاوبەشی پرۆسەکە بەپێی بەشی [METRICS] ی config.ini:
+    ENABLED (بنەڕەت false)، JSON_PATH (بنەڕەت CACHE_DIR/metrics.json) و PROMETHEUS_PATH (بەتاڵ = نانووسرێت).
+    """
+    config = load_config()
+    if not config.getboolean('METRICS', 'ENABLED', fallback=False):
+        return NullMetrics()
+    cache_dir = config.get('DATA_STORE', 'CACHE_DIR', fallback='cache')
+    return Metrics(
+        json_path=config.get('METRICS', 'JSON_PATH', fallback=os.path.join(cache_dir, 'metrics.json')),
+        prometheus_path=config.get('METRICS', 'PROMETHEUS_PATH', fallback=''),
+    )
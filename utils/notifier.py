@@ -1,25 +1,226 @@
 # utils/notifier.py
-import telegram
+import asyncio
+import atexit
 import configparser
+import threading
+import time
+
+from utils.config_loader import load_config
+from utils.metrics import get_metrics
+
+MAX_MESSAGE_LENGTH = 4096 # سنووری تێلیگرام بۆ یەک پەیام
+
+
+class TokenBucket:
+    """سنووردارکردنی خێرایی: لە هەر چرکەیەکدا rate پەیام، و تا capacity پەیام بە یەکجار."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
 
 class TelegramNotifier:
+    """
+    ناردنی پەیام بۆ تێلیگرام بەبێ ڕاگرتنی سکانەر: send_message تەنها پەیامەکە دەخاتە ڕیزەوە و
+    workerێک لە threadی جیاواز (بە event loopی خۆی) دەینێرێت. پەیامەکانی یەک ماوەی کورت
+    لە یەک پەیامی کۆکراوە (digest) دا دەنێردرێن، پەیامی دووبارە لە ماوەی DEDUPE_WINDOW دا
+    فەرامۆش دەکرێت، خێرایی ناردن سنووردار دەکرێت و هەڵەکان چەند جارێک دووبارە دەکرێنەوە.
+    """
+
     def __init__(self):
-        config = configparser.ConfigParser()
-        config.read('config/config.ini', encoding='utf-8')
+        config = load_config()
         try:
-            token = config.get('TELEGRAM', 'BOT_TOKEN')
+            self.token = config.get('TELEGRAM', 'BOT_TOKEN')
             self.chat_id = config.get('TELEGRAM', 'CHAT_ID')
-            self.bot = telegram.Bot(token=token)
         except (configparser.NoSectionError, configparser.NoOptionError):
             print("⚠️ زانیاری تێلیگرام لە config.ini نەدۆزرایەوە. ئاگادارکردنەوە کار ناکات.")
-            self.bot = None
+            self.token = self.chat_id = None
+        self._bot = None
+        # Bot.shutdown() تەنها دوای initialize() کلاینتی HTTP دادەخات، بۆیە هەردووکیان جووتن
+        self._bot_initialized = False
+
+        # پەیامەکانی ئەم ماوەیە پێکەوە دەنێردرێن
+        self.digest_window = config.getfloat('TELEGRAM', 'DIGEST_WINDOW_SECONDS', fallback=2)
+        self.dedupe_window = config.getfloat('TELEGRAM', 'DEDUPE_WINDOW_MINUTES', fallback=60) * 60
+        # تێلیگرام بۆ یەک چات نزیکەی یەک پەیام لە چرکەیەکدا ڕێگە دەدات
+        rate = config.getfloat('TELEGRAM', 'MESSAGES_PER_SECOND', fallback=1)
+        self.bucket = TokenBucket(rate, config.getint('TELEGRAM', 'BURST', fallback=3))
+        self.max_retries = config.getint('TELEGRAM', 'MAX_RETRIES', fallback=5)
+
+        self._recent = {}   # dedupe key -> کاتی دوایین ناردن
+        self._lock = threading.Lock()
+        self._loop = None
+        self._queue = None
+        self._thread = None
+        self._ready = None
+        self._pending = 0
+        self._idle = threading.Condition(self._lock)
+
+    @property
+    def bot(self):
+        # python-telegram-bot تەنها لە یەکەم ناردندا import دەکرێت
+        if self._bot is None and self.token:
+            import telegram
+            self._bot = get_metrics().instrument(telegram.Bot(token=self.token), 'telegram', ('send_',))
+        return self._bot
+
+    @bot.setter
+    def bot(self, bot):
+        self._bot = bot
+        self._bot_initialized = False
+
+    def send_message(self, message, dedupe_key=None):
+        """
+        پەیامێک دەخاتە ڕیزی ناردنەوە و دەستبەجێ دەگەڕێتەوە.
+        :param dedupe_key: ناسنامەی پەیام بۆ لابردنی دووبارە (بە بنەڕەت دەقی پەیامەکە).
+        :return: True ئەگەر خرابێتە ڕیزەوە، False ئەگەر بۆت نەبێت یان پەیامەکە دووبارە بێت.
+        """
+        # بۆت خۆی لە threadی worker دروست دەکرێت، بۆیە لێرە تەنها زانیارییەکان پشکنین دەکرێن
+        if not self.chat_id or (self._bot is None and not self.token):
+            return False
+
+        key = dedupe_key or message
+        now = time.monotonic()
+        with self._lock:
+            self._recent = {k: t for k, t in self._recent.items() if now - t < self.dedupe_window}
+            if key in self._recent:
+                return False
+            self._recent[key] = now
+            self._pending += 1
+
+        self._ensure_worker()
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, message)
+        return True
+
+    def flush(self, timeout=30):
+        """چاوەڕێ دەکات تا هەموو پەیامە ڕیزکراوەکان نێردرابن (یان timeout)."""
+        deadline = time.monotonic() + timeout
+        with self._idle:
+            while self._pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    def close(self, timeout=30):
+        if self._thread is None:
+            return
+        self.flush(timeout)
+        loop, thread, self._thread = self._loop, self._thread, None
+        asyncio.run_coroutine_threadsafe(self._shutdown(), loop).result(timeout=5)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+        loop.close()
+
+    async def _shutdown(self):
+        self._worker_task.cancel()
+        if self._bot is not None and self._bot_initialized:
+            self._bot_initialized = False
+            await self._bot.shutdown()
+
+    # --- worker ---
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None:
+                self._loop = asyncio.new_event_loop()
+                self._ready = threading.Event()
+                self._thread = threading.Thread(target=self._run_loop, args=(self._ready,),
+                                                name="telegram-notifier", daemon=True)
+                self._thread.start()
+                # پەیامە ماوەکان پێش داخستنی پرۆسە دەنێردرێن
+                atexit.register(self.close)
+            ready = self._ready
+        # هەموو بانگکەرێک (نەک تەنها ئەوەی thread دەستپێدەکات) چاوەڕێی دروستبوونی _queue دەکات
+        ready.wait()
+
+    def _run_loop(self, ready):
+        asyncio.set_event_loop(self._loop)
+        self._queue = asyncio.Queue()
+        self._worker_task = self._loop.create_task(self._worker())
+        self._loop.call_soon(ready.set)
+        self._loop.run_forever()
+
+    async def _worker(self):
+        while True:
+            messages = [await self._queue.get()]
+            # کۆکردنەوەی ئەو پەیامانەی لە ماوەی digest_window دا دێن
+            deadline = time.monotonic() + self.digest_window
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    messages.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            for text in self._build_digests(messages):
+                await self._deliver(text)
+
+            with self._idle:
+                self._pending -= len(messages)
+                self._idle.notify_all()
+
+    @staticmethod
+    def _build_digests(messages):
+        """پەیامەکان بە جیاکەرەوە پێکەوە دەلکێنێت بەبێ تێپەڕاندنی سنووری درێژی تێلیگرام."""
+        digests, current = [], ""
+        for message in messages:
+            message = message[:MAX_MESSAGE_LENGTH]
+            candidate = f"{current}\n\n{message}" if current else message
+            if len(candidate) > MAX_MESSAGE_LENGTH:
+                digests.append(current)
+                candidate = message
+            current = candidate
+        if current:
+            digests.append(current)
+        return digests
+
+    async def _deliver(self, text):
+        from telegram.constants import ParseMode
+        from telegram.error import BadRequest, NetworkError, RetryAfter, TimedOut
 
-    def send_message(self, message):
-        if self.bot and self.chat_id:
+        parse_mode = ParseMode.MARKDOWN
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire()
             try:
-                self.bot.send_message(chat_id=self.chat_id, text=message, parse_mode=telegram.ParseMode.MARKDOWN)
+                if not self._bot_initialized:
+                    await self.bot.initialize()
+                    self._bot_initialized = True
+                await self.bot.send_message(chat_id=self.chat_id, text=text, parse_mode=parse_mode)
                 return True
+            except RetryAfter as e:
+                # تێلیگرام خۆی دەڵێت چەند چاوەڕێ بکەین (flood control)
+                retry_after = e.retry_after.total_seconds() if hasattr(e.retry_after, 'total_seconds') else e.retry_after
+                print(f"⚠️ سنووری ناردنی تێلیگرام؛ {retry_after:.0f} چرکە چاوەڕێ دەکرێت.")
+                await asyncio.sleep(retry_after)
+            except (TimedOut, NetworkError) as e:
+                if isinstance(e, BadRequest):
+                    if parse_mode is None:
+                        print(f"❌ هەڵە لە ناردنی پەیامی تێلیگرام: {e}")
+                        return False
+                    # Markdownی نادروست؛ وەک دەقی ئاسایی دووبارە دەنێردرێتەوە
+                    parse_mode = None
+                    continue
+                delay = min(60, 2 ** attempt)
+                print(f"⚠️ هەڵە لە ناردنی پەیامی تێلیگرام ({e})؛ دووبارە هەوڵ دەدرێتەوە دوای {delay} چرکە.")
+                await asyncio.sleep(delay)
             except Exception as e:
                 print(f"❌ هەڵە لە ناردنی پەیامی تێلیگرام: {e}")
                 return False
-        return False
\ No newline at end of file
+        print("❌ پەیامی تێلیگرام دوای چەند هەوڵێک نەنێردرا.")
+        return False
@@ -0,0 +1,298 @@
+# utils/results_store.py
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from utils.config_loader import load_config
+
+# بەشەکانی خاڵ کە لە signal_scores هەڵدەگیرێن (total لە خودی خشتەی signals دایە)
+SCORE_COMPONENTS = ('technical', 'sentiment', 'fundamental', 'correlation')
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    id INTEGER PRIMARY KEY,
+    created_at INTEGER NOT NULL,
+    exchange_id TEXT,
+    timeframe TEXT,
+    symbol_count INTEGER,
+    signal_count INTEGER,
+    duration_ms REAL
+);
+CREATE INDEX IF NOT EXISTS idx_scans_created_at ON scans (created_at);
+
+CREATE TABLE IF NOT EXISTS signals (
+    id INTEGER PRIMARY KEY,
+    scan_id INTEGER NOT NULL REFERENCES scans (id) ON DELETE CASCADE,
+    created_at INTEGER NOT NULL,
+    symbol TEXT NOT NULL,
+    timeframe TEXT,
+    strength TEXT,
+    total_score REAL
+);
+CREATE INDEX IF NOT EXISTS idx_signals_symbol_created_at ON signals (symbol, created_at);
+CREATE INDEX IF NOT EXISTS idx_signals_created_at ON signals (created_at);
+CREATE INDEX IF NOT EXISTS idx_signals_scan_id ON signals (scan_id);
+
+CREATE TABLE IF NOT EXISTS signal_scores (
+    signal_id INTEGER NOT NULL REFERENCES signals (id) ON DELETE CASCADE,
+    component TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (signal_id, component)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS backtests (
+    id INTEGER PRIMARY KEY,
+    cache_key TEXT NOT NULL UNIQUE,
+    created_at INTEGER NOT NULL,
+    symbol TEXT NOT NULL,
+    timeframe TEXT,
+    start_date TEXT,
+    candle_count INTEGER,
+    final_portfolio_value REAL,
+    profit_loss REAL,
+    profit_loss_percent REAL,
+    buy_and_hold_profit_percent REAL,
+    total_trades INTEGER,
+    settings TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_backtests_symbol_created_at ON backtests (symbol, created_at);
+
+CREATE TABLE IF NOT EXISTS trades (
+    backtest_id INTEGER NOT NULL REFERENCES backtests (id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    date INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    price REAL,
+    amount REAL,
+    PRIMARY KEY (backtest_id, seq)
+) WITHOUT ROWID;
+"""
+
+
+def _now_ms():
+    return int(time.time() * 1000)
+
+
+def _to_ms(value):
+    """Timestamp، datetime یان ژمارەی میلی چرکە بۆ int (میلی چرکە، UTC)."""
+    if value is None:
+        return None
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.tz_localize('UTC')
+    return int(timestamp.value // 1_000_000)
+
+
+def _ms_to_datetime(column):
+    return pd.to_datetime(column, unit='ms', utc=True)
+
+
+def backtest_cache_key(historical_data, settings):
+    """
+    hashی SHA-256 ی مۆمەکانی تاقیکردنەوە (timestamp و OHLCV) و ڕێکخستنەکانی (dictی JSON).
+    هەر گۆڕانێک لە داتا یان ڕێکخستن کلیلێکی نوێ دەدات.
+    """
+    digest = hashlib.sha256(json.dumps(settings, sort_keys=True, default=str).encode('utf-8'))
+    timestamps = historical_data['timestamp'].to_numpy(dtype='datetime64[ms]').astype(np.int64)
+    digest.update(np.ascontiguousarray(timestamps).tobytes())
+    digest.update(np.ascontiguousarray(historical_data[OHLCV_COLUMNS].to_numpy(dtype=np.float64)).tobytes())
+    return digest.hexdigest()
+
+
+class ResultsStore:
+    """
+    کۆگای SQLite بۆ ئەنجامی سکان و تاقیکردنەوەکان: scans، signals، signal_scores (بەشەکانی خاڵ)،
+    backtests و trades. هەموو کاتەکان وەک میلی چرکەی UTC هەڵدەگیرێن و خشتەکان بەپێی دراو و کات
+    index کراون، بۆیە داشبۆرد مێژوو بەبێ حیسابکردنەوە دەخوێنێتەوە.
+
+    هەر کردارێک پەیوەندیی SQLite ی خۆی دەکاتەوە، بۆیە لە threadی جیاواز (daemon، داشبۆرد) بەکاردێت.
+    """
+
+    def __init__(self, path, retention_days=90):
+        self.path = path
+        # سکان و سیگناڵی کۆنتر لەم ماوەیە لادەبرێن (0 = هەمیشە دەمێننەوە)؛ تاقیکردنەوەکان دەمێننەوە
+        self.retention_days = retention_days
+        self._connect().close()
+
+    def _connect(self):
+        # فایلەکە لەوانەیە لە کاتی کارکردندا سڕابێتەوە (بۆ نموونە پاککردنەوەی CACHE_DIR)، بۆیە
+        # دایرێکتۆری و خشتەکان لە هەر پەیوەندییەکدا دڵنیا دەکرێنەوە (CREATE ... IF NOT EXISTS)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        # WAL: خوێندنەوەی داشبۆرد لە کاتی نووسینی daemon دا ڕاناگیرێت
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.executescript(SCHEMA)
+        return conn
+
+    def _query(self, sql, params=()):
+        with closing(self._connect()) as conn:
+            return pd.read_sql_query(sql, conn, params=params)
+
+    # --- سکان ---
+
+    def record_scan(self, exchange_id, timeframe, symbol_count, signals, duration_ms=None, created_at=None):
+        """سکانێک و سیگناڵەکانی (لەگەڵ بەشەکانی خاڵ) لە یەک transaction دا هەڵدەگرێت. :return: idی سکان."""
+        created_at = _to_ms(created_at) if created_at is not None else _now_ms()
+        with closing(self._connect()) as conn, conn:
+            scan_id = conn.execute(
+                "INSERT INTO scans (created_at, exchange_id, timeframe, symbol_count, signal_count, duration_ms) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (created_at, exchange_id, timeframe, symbol_count, len(signals), duration_ms),
+            ).lastrowid
+            for signal in signals:
+                signal_id = conn.execute(
+                    "INSERT INTO signals (scan_id, created_at, symbol, timeframe, strength, total_score) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (scan_id, created_at, signal['symbol'], timeframe, signal['strength'], float(signal['total_score'])),
+                ).lastrowid
+                scores = signal.get('scores') or {}
+                conn.executemany(
+                    "INSERT INTO signal_scores (signal_id, component, value) VALUES (?, ?, ?)",
+                    [(signal_id, name, float(scores[name])) for name in SCORE_COMPONENTS
+                     if scores.get(name) is not None],
+                )
+            if self.retention_days:
+                self._prune(conn, created_at - int(self.retention_days * 86400 * 1000))
+        return scan_id
+
+    @staticmethod
+    def _prune(conn, cutoff_ms):
+        """سکانە کۆنەکان لادەبات؛ سیگناڵ و خاڵەکانیان بە ON DELETE CASCADE دەسڕێنەوە."""
+        conn.execute("DELETE FROM scans WHERE created_at < ?", (cutoff_ms,))
+
+    def signal_history(self, symbol=None, since=None, until=None, limit=None):
+        """
+        سیگناڵەکان (نوێترین لە سەرەوە) لەگەڵ بەشەکانی خاڵ وەک ستوون.
+
+        :param since: datetime/Timestamp یان میلی چرکە؛ بۆ نموونە now - 30 ڕۆژ.
+        """
+        components = ", ".join(
+            f"MAX(CASE WHEN c.component = '{name}' THEN c.value END) AS {name}" for name in SCORE_COMPONENTS
+        )
+        where, params = self._filters('s', symbol, since, until)
+        sql = (f"SELECT s.created_at, s.symbol, s.timeframe, s.strength, s.total_score, {components} "
+               f"FROM signals s LEFT JOIN signal_scores c ON c.signal_id = s.id {where} "
+               f"GROUP BY s.id ORDER BY s.created_at DESC")
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        history = self._query(sql, params)
+        history['created_at'] = _ms_to_datetime(history['created_at'])
+        return history
+
+    def scan_history(self, since=None, until=None, limit=None):
+        where, params = self._filters('scans', None, since, until)
+        sql = f"SELECT * FROM scans {where} ORDER BY created_at DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        history = self._query(sql, params)
+        history['created_at'] = _ms_to_datetime(history['created_at'])
+        return history
+
+    @staticmethod
+    def _filters(table, symbol, since, until):
+        clauses, params = [], []
+        if symbol:
+            clauses.append(f"{table}.symbol = ?")
+            params.append(symbol)
+        if since is not None:
+            clauses.append(f"{table}.created_at >= ?")
+            params.append(_to_ms(since))
+        if until is not None:
+            clauses.append(f"{table}.created_at < ?")
+            params.append(_to_ms(until))
+        return ("WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    # --- تاقیکردنەوە ---
+
+    def load_backtest(self, cache_key):
+        """
+        ئەنجامی هەڵگیراوی تاقیکردنەوەیەک بەپێی cache_key.
+        :return: Tuple(trades, final_results) بە هەمان فۆرماتی Backtester.run، یان None.
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT id, final_portfolio_value, profit_loss, profit_loss_percent, buy_and_hold_profit_percent, "
+                "total_trades FROM backtests WHERE cache_key = ?", (cache_key,)
+            ).fetchone()
+            if row is None:
+                return None
+            trade_rows = conn.execute(
+                "SELECT date, type, price, amount FROM trades WHERE backtest_id = ? ORDER BY seq", (row[0],)
+            ).fetchall()
+        trades = [{'date': pd.Timestamp(date, unit='ms', tz='UTC'), 'type': trade_type, 'price': price, 'amount': amount}
+                  for date, trade_type, price, amount in trade_rows]
+        final_results = dict(zip(
+            ('final_portfolio_value', 'profit_loss', 'profit_loss_percent', 'buy_and_hold_profit_percent', 'total_trades'),
+            row[1:],
+        ))
+        return trades, final_results
+
+    def save_backtest(self, cache_key, symbol, timeframe, settings, candle_count, trades, final_results):
+        """ئەنجامی تاقیکردنەوەیەک و مامەڵەکانی هەڵدەگرێت (ئەگەر هەمان cache_key هەبێت جێگەی دەگرێتەوە)."""
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM backtests WHERE cache_key = ?", (cache_key,))
+            backtest_id = conn.execute(
+                "INSERT INTO backtests (cache_key, created_at, symbol, timeframe, start_date, candle_count, "
+                "final_portfolio_value, profit_loss, profit_loss_percent, buy_and_hold_profit_percent, total_trades, settings) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (cache_key, _now_ms(), symbol, timeframe, str(settings.get('start_date')), candle_count,
+                 float(final_results['final_portfolio_value']), float(final_results['profit_loss']),
+                 float(final_results['profit_loss_percent']), float(final_results['buy_and_hold_profit_percent']),
+                 int(final_results['total_trades']), json.dumps(settings, sort_keys=True, default=str)),
+            ).lastrowid
+            conn.executemany(
+                "INSERT INTO trades (backtest_id, seq, date, type, price, amount) VALUES (?, ?, ?, ?, ?, ?)",
+                [(backtest_id, seq, _to_ms(trade['date']), trade['type'], float(trade['price']), float(trade['amount']))
+                 for seq, trade in enumerate(trades)],
+            )
+        return backtest_id
+
+    def backtest_history(self, symbol=None, since=None, until=None, limit=None):
+        where, params = self._filters('backtests', symbol, since, until)
+        sql = (f"SELECT id, created_at, symbol, timeframe, start_date, candle_count, final_portfolio_value, "
+               f"profit_loss_percent, buy_and_hold_profit_percent, total_trades, settings "
+               f"FROM backtests {where} ORDER BY created_at DESC")
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        history = self._query(sql, params)
+        history['created_at'] = _ms_to_datetime(history['created_at'])
+        return history
+
+    def backtest_trades(self, backtest_id):
+        trades = self._query("SELECT date, type, price, amount FROM trades WHERE backtest_id = ? ORDER BY seq",
+                             (int(backtest_id),))
+        trades['date'] = _ms_to_datetime(trades['date'])
+        return trades
+
+
+@lru_cache(maxsize=None)
+def get_results_store():
+    """
+    کۆگای هاوبەشی پرۆسەکە بەپێی بەشی [RESULTS_STORE] ی config.ini:
+    ENABLED (بنەڕەت true)، PATH (بنەڕەت CACHE_DIR/results.sqlite) و RETENTION_DAYS (بنەڕەت 90،
+    تەنها بۆ سکانەکان).
+    :return: ResultsStore یان None ئەگەر کوژاوە بێت یان نەکرێتەوە.
+    """
+    config = load_config()
+    if not config.getboolean('RESULTS_STORE', 'ENABLED', fallback=True):
+        return None
+    cache_dir = config.get('DATA_STORE', 'CACHE_DIR', fallback='cache')
+    path = config.get('RESULTS_STORE', 'PATH', fallback=os.path.join(cache_dir, 'results.sqlite'))
+    try:
+        return ResultsStore(path, config.getfloat('RESULTS_STORE', 'RETENTION_DAYS', fallback=90))
+    except (sqlite3.Error, OSError) as e:
+        print(f"⚠️ نەتوانرا کۆگای ئەنجامەکان بکرێتەوە لە {path}: {e}")
+        return None